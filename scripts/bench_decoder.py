@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Decode cost per poll: per-point interpretation vs the compiled decoder backends."""
+from __future__ import annotations
+
+import argparse
+import random
+import struct
+import timeit
+from functools import partial
+
+from ems.drivers.decoder import PlanDecoder, compile_plan, decode_point
+from ems.drivers.pointmap import load_point_map
+from ems.drivers.readplan import build_read_plan
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Point decoder micro-benchmark")
+    parser.add_argument("--point-map", default="pointmaps/rg20c_ems_format.yaml")
+    parser.add_argument("--polls", type=int, default=2000, help="Polls per measurement")
+    parser.add_argument("--max-gap", type=int, default=0, help="Read plan max_read_gap")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    points = load_point_map(args.point_map).points
+    plan = build_read_plan(points, max_gap=args.max_gap)
+    decoders = {
+        "compiled": compile_plan(plan, points, backend="python"),
+        "numpy": compile_plan(plan, points, backend="numpy"),
+    }
+    rng = random.Random(1)
+    blocks = []
+    for block in plan.blocks:
+        floats = [rng.uniform(0.0, 400.0) for _ in range(block.count // 2 + 1)]
+        data = struct.pack(f">{len(floats)}f", *floats)[: 2 * block.count]
+        blocks.append(list(struct.unpack(f">{block.count}H", data)))
+
+    def reference() -> None:
+        for block, registers in zip(plan.blocks, blocks):
+            for member in block.points:
+                regs = list(registers[member.offset : member.offset + member.count])
+                try:
+                    decode_point(points[member.index], regs)
+                except struct.error:
+                    pass
+
+    def compiled(decoder: PlanDecoder) -> None:
+        decoder.decode(blocks)
+
+    print(f"{args.point_map}: {len(points)} points in {plan.block_count} blocks")
+    runs = [("per-point", reference)]
+    runs += [(name, partial(compiled, decoder)) for name, decoder in decoders.items()]
+    baseline = None
+    for name, fn in runs:
+        seconds = min(timeit.repeat(fn, number=args.polls, repeat=5)) / args.polls
+        baseline = baseline or seconds
+        print(f"{name:>10}: {seconds * 1e6:.1f} us per poll ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare client CPU per 1,000 Modbus TCP reads: pymodbus vs the native codec."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import threading
+import time
+
+from ems.io.modbus import ModbusTCPClient
+from ems.io.pool import close_tcp_pools
+from ems.sim.server import ModbusSimulator, SimConfig, SimServerConfig
+
+POINT_MAP = "pointmaps/sunspec_inverter_common.yaml"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Modbus TCP codec benchmark")
+    parser.add_argument("--reads", type=int, default=5000, help="Reads per transport")
+    parser.add_argument("--count", type=int, default=50, help="Registers per read")
+    parser.add_argument("--concurrency", type=int, default=1, help="Reads kept in flight")
+    return parser.parse_args()
+
+
+def start_simulator() -> int:
+    """Run the simulator on its own loop and thread so its CPU is not billed to the client."""
+    ready = threading.Event()
+    ports: list[int] = []
+
+    async def serve() -> None:
+        config = SimConfig(
+            seed=1,
+            servers=[
+                SimServerConfig(port=0, units=[{"unit_ids": [1], "point_map": POINT_MAP}])
+            ],
+        )
+        simulator = ModbusSimulator(config)
+        await simulator.start()
+        ports.append(simulator.servers[0].config.port)
+        ready.set()
+        await asyncio.Event().wait()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
+    return ports[0]
+
+
+async def bench(port: int, transport: str, reads: int, count: int, concurrency: int) -> float:
+    client = ModbusTCPClient(
+        {
+            "host": "127.0.0.1",
+            "port": port,
+            "unit_id": 1,
+            "modbus_transport": transport,
+            "pipeline_depth": concurrency if transport == "native" else 1,
+            "max_connections_per_gateway": 1,
+        }
+    )
+    await client.read(3, 0, count)  # connect outside the measurement
+
+    async def worker(n: int) -> None:
+        for _ in range(n):
+            await client.read(3, 0, count)
+
+    started = time.thread_time()
+    await asyncio.gather(*(worker(reads // concurrency) for _ in range(concurrency)))
+    cpu = time.thread_time() - started
+    await client.close()
+    await close_tcp_pools()
+    return cpu * 1000.0 / reads
+
+
+def main() -> None:
+    args = parse_args()
+    port = start_simulator()
+    results = {}
+    for transport in ("pymodbus", "native"):
+        results[transport] = asyncio.run(
+            bench(port, transport, args.reads, args.count, args.concurrency)
+        )
+        print(f"{transport:>8}: {results[transport] * 1000:.1f} ms CPU per 1,000 reads")
+    print(f"speedup: {results['pymodbus'] / results['native']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
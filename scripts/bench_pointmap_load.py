@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Point-map load time at startup: legacy YAML parse + hash vs libyaml vs the compiled cache."""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+from ems.drivers import pointmap
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Point map startup benchmark")
+    parser.add_argument("--dir", default="pointmaps", help="Directory of point-map YAML files")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best kept)")
+    return parser.parse_args()
+
+
+def legacy(paths: list[Path]) -> None:
+    for path in paths:
+        payload = yaml.safe_load(path.read_text(encoding="utf-8"))
+        hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        pointmap.normalize_points(payload.get("points"), payload.get("modbus_settings"))
+
+
+def load_all(paths: list[Path]) -> None:
+    pointmap._pointmap_cache.clear()
+    for path in paths:
+        pointmap.load_point_map(path)
+
+
+def best(fn, paths: list[Path], repeat: int, before=None) -> float:
+    times = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        fn(paths)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    args = parse_args()
+    paths = sorted(Path(args.dir).glob("*.yaml"))
+    size = sum(p.stat().st_size for p in paths)
+    print(f"{len(paths)} point maps, {size / 1024:.0f} KiB, libyaml={yaml.__with_libyaml__}")
+    with tempfile.TemporaryDirectory() as cache:
+        os.environ["EMS_POINTMAP_CACHE_DIR"] = cache
+
+        def cold() -> None:
+            for entry in Path(cache).iterdir():
+                entry.unlink()
+
+        runs = [
+            ("legacy", best(legacy, paths, args.repeat)),
+            ("cold", best(load_all, paths, args.repeat, before=cold)),
+            ("warm", best(load_all, paths, args.repeat)),
+        ]
+    baseline = runs[0][1]
+    for name, seconds in runs:
+        print(f"{name:>7}: {seconds * 1e3:8.1f} ms ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
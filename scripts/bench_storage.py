@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Sample ingest throughput: Core executemany per device or per cycle vs the writer thread."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from ems.store.database import Database
+from ems.utils.models import QUALITY_CODES, MeasurementBatch, Quality
+
+GOOD = QUALITY_CODES[Quality.GOOD]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Storage ingest benchmark")
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--points", type=int, default=40, help="Points per device poll")
+    parser.add_argument("--cycles", type=int, default=5, help="Poll cycles per run")
+    parser.add_argument(
+        "--partition-span-s", type=int, default=None, help="Sample partition span (default: off)"
+    )
+    return parser.parse_args()
+
+
+def cycle(devices: int, points: int, timestamp: datetime) -> list[MeasurementBatch]:
+    metrics = tuple(f"P{i}" for i in range(points))
+    units = ("kW",) * points
+    batches = []
+    for device in range(devices):
+        batch = MeasurementBatch(timestamp, "plant", f"dev{device}", "bench", metrics, units)
+        for metric_id in range(points):
+            batch.append(metric_id, float(device + metric_id), GOOD, None)
+        batches.append(batch)
+    return batches
+
+
+async def per_device(db: Database, batches: list[MeasurementBatch]) -> None:
+    for batch in batches:
+        await db.insert_batch(batch)
+
+
+async def bulk(db: Database, batches: list[MeasurementBatch]) -> None:
+    await db.insert_batches(batches)
+
+
+async def run(
+    devices: int, points: int, cycles: int, span_s: int | None
+) -> list[tuple[str, float]]:
+    results = []
+    variants = (
+        ("core", per_device, "aiosqlite"),
+        ("bulk", bulk, "aiosqlite"),
+        ("thread", per_device, "thread"),
+        ("thread-bulk", bulk, "thread"),
+    )
+    for name, ingest, writer in variants:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(str(Path(tmp) / "bench.sqlite"), writer=writer, partition_span_s=span_s)
+            await db.connect()
+            start_ts = datetime.now(timezone.utc)
+            # Create the series up front; startup cost is not ingest cost.
+            await db.insert_batches(cycle(devices, points, start_ts))
+            elapsed = 0.0
+            for n in range(cycles):
+                batches = cycle(devices, points, start_ts + timedelta(seconds=30 * (n + 1)))
+                start = time.perf_counter()
+                await ingest(db, batches)
+                elapsed += time.perf_counter() - start
+            results.append((name, devices * points * cycles / elapsed))
+            await db.close()
+    return results
+
+
+def main() -> None:
+    args = parse_args()
+    print(f"{args.points} points per device, {args.cycles} poll cycles")
+    for devices in args.devices:
+        results = asyncio.run(run(devices, args.points, args.cycles, args.partition_span_s))
+        baseline = results[0][1]
+        summary = ", ".join(
+            f"{name} {rate:,.0f} rows/s ({rate / baseline:.1f}x)" for name, rate in results
+        )
+        print(f"{devices:>5} devices: {summary}")
+
+
+if __name__ == "__main__":
+    main()
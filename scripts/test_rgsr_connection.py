@@ -36,6 +36,7 @@ async def test_rgsr_connection():
     logger.info("Testing RGSR RG20C Reactive Power Relay connection...")
     logger.info(f"Connection config: {connection_config}")
     
+    client = None
     try:
         # Create modbus RTU client
         client = create_client("modbus_rtu", connection_config)
@@ -123,7 +124,6 @@ async def test_rgsr_connection():
             stage1_value = struct.unpack('>f', stage1_bytes)[0]
             logger.info(f"Stage 1 power: {stage1_value:.1f} VAr")
         
-        await client.close()
         logger.info("✅ RGSR connection test completed successfully!")
         
         return True
@@ -137,6 +137,11 @@ async def test_rgsr_connection():
         logger.info("4. pymodbus library is not installed")
         return False
 
+    finally:
+        # Stop the serial bus worker on the loop that started it
+        if client is not None:
+            await client.close()
+
 
 async def test_with_point_map():
     """Test RGSR using the point map"""
@@ -155,8 +160,8 @@ async def test_with_point_map():
         key_points = ["VL1n", "IL1", "Frequency", "P_Total", "Q_Total", "PF_Total"]
         logger.info("Key measurement points:")
         for point in point_map.points:
-            if point.get("name") in key_points:
-                logger.info(f"  {point['name']}: FC={point['fc']}, Addr={point['address']}, Unit={point.get('unit', 'N/A')}")
+            if point.name in key_points:
+                logger.info(f"  {point.name}: FC={point.fc}, Addr={point.address}, Unit={point.unit or 'N/A'}")
         
         return True
         
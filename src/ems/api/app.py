@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 
 from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
 from fastapi.responses import HTMLResponse
@@ -16,8 +16,14 @@ from fastapi.security import (
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
 
 from ..core.health import HealthRegistry
+from ..io.bus import serial_bus_stats
+from ..io.latency import rtt_stats
+from ..io.pool import tcp_pool_stats
+from ..store.buffer import write_buffer_stats
 from ..store.database import Database
 from ..utils.config import AppConfig
 from ..utils.models import ControlResult
@@ -41,6 +47,116 @@ registry = CollectorRegistry()
 requests_counter = Counter("ems_api_requests_total", "API Requests", registry=registry)
 
 
+class TransportCollector(Collector):
+    """Exposes field-bus transport statistics at scrape time."""
+
+    def collect(self) -> Iterator[Metric]:
+        utilization = GaugeMetricFamily(
+            "ems_serial_bus_utilization_ratio",
+            "Share of time the serial bus is busy",
+            labels=["port"],
+        )
+        depth = GaugeMetricFamily(
+            "ems_serial_bus_queue_depth", "Requests waiting for the serial bus", labels=["port"]
+        )
+        frames = CounterMetricFamily(
+            "ems_serial_bus_frames", "Transactions executed on the serial bus", labels=["port"]
+        )
+        errors = CounterMetricFamily(
+            "ems_serial_bus_errors", "Failed transactions on the serial bus", labels=["port"]
+        )
+        fps = GaugeMetricFamily(
+            "ems_serial_bus_frames_per_second", "Average transaction rate", labels=["port"]
+        )
+        crc_errors = CounterMetricFamily(
+            "ems_serial_bus_crc_errors", "Responses that failed the RTU CRC", labels=["port"]
+        )
+        for stats in serial_bus_stats():
+            labels = [stats["port"]]
+            utilization.add_metric(labels, stats["utilization"])
+            depth.add_metric(labels, stats["queue_depth"])
+            frames.add_metric(labels, stats["frames"])
+            errors.add_metric(labels, stats["errors"])
+            fps.add_metric(labels, stats["frames_per_s"])
+            crc_errors.add_metric(labels, stats["crc_errors"])
+        pool_labels = ["gateway", "transport"]
+        connections = GaugeMetricFamily(
+            "ems_tcp_pool_connections", "Open sockets per Modbus TCP gateway", labels=pool_labels
+        )
+        in_use = GaugeMetricFamily(
+            "ems_tcp_pool_in_use", "Sockets carrying a transaction", labels=pool_labels
+        )
+        waits = CounterMetricFamily(
+            "ems_tcp_pool_waits", "Requests that waited for a free socket", labels=pool_labels
+        )
+        for stats in tcp_pool_stats():
+            labels = [stats["gateway"], stats["transport"]]
+            connections.add_metric(labels, stats["connections"])
+            in_use.add_metric(labels, stats["in_use"])
+            waits.add_metric(labels, stats["waits"])
+        srtt = GaugeMetricFamily(
+            "ems_modbus_srtt_seconds", "Smoothed request round-trip time", labels=["endpoint"]
+        )
+        rttvar = GaugeMetricFamily(
+            "ems_modbus_rttvar_seconds", "Round-trip time variation", labels=["endpoint"]
+        )
+        timeout = GaugeMetricFamily(
+            "ems_modbus_timeout_seconds", "Effective adaptive request timeout", labels=["endpoint"]
+        )
+        timeouts = CounterMetricFamily(
+            "ems_modbus_timeouts", "Requests that hit the adaptive timeout", labels=["endpoint"]
+        )
+        for endpoint, stats in rtt_stats().items():
+            labels = [endpoint]
+            if stats["srtt_s"] is not None:
+                srtt.add_metric(labels, stats["srtt_s"])
+                rttvar.add_metric(labels, stats["rttvar_s"])
+            timeout.add_metric(labels, stats["timeout_s"])
+            timeouts.add_metric(labels, stats["timeouts"])
+        buffer_depth = GaugeMetricFamily(
+            "ems_write_buffer_queue_depth", "Rows waiting for a group commit", labels=["buffer"]
+        )
+        flush_latency = GaugeMetricFamily(
+            "ems_write_buffer_flush_latency_seconds",
+            "Duration of the last group commit",
+            labels=["buffer"],
+        )
+        flush_latency_max = GaugeMetricFamily(
+            "ems_write_buffer_flush_latency_max_seconds",
+            "Longest group commit so far",
+            labels=["buffer"],
+        )
+        flushes = CounterMetricFamily(
+            "ems_write_buffer_flushes", "Group commits executed", labels=["buffer"]
+        )
+        flushed_rows = CounterMetricFamily(
+            "ems_write_buffer_rows", "Rows committed by the write buffer", labels=["buffer"]
+        )
+        flush_errors = CounterMetricFamily(
+            "ems_write_buffer_errors", "Group commits that failed", labels=["buffer"]
+        )
+        blocked = CounterMetricFamily(
+            "ems_write_buffer_blocked_puts", "Polls that waited for buffer space", labels=["buffer"]
+        )
+        for stats in write_buffer_stats():
+            labels = [stats["name"]]
+            buffer_depth.add_metric(labels, stats["queue_depth"])
+            flush_latency.add_metric(labels, stats["last_flush_s"])
+            flush_latency_max.add_metric(labels, stats["max_flush_s"])
+            flushes.add_metric(labels, stats["flushes"])
+            flushed_rows.add_metric(labels, stats["rows_flushed"])
+            flush_errors.add_metric(labels, stats["errors"])
+            blocked.add_metric(labels, stats["blocked_puts"])
+        yield from (utilization, depth, frames, errors, fps, crc_errors)
+        yield from (connections, in_use, waits)
+        yield from (srtt, rttvar, timeout, timeouts)
+        yield from (buffer_depth, flush_latency, flush_latency_max, flushes, flushed_rows)
+        yield from (flush_errors, blocked)
+
+
+registry.register(TransportCollector())
+
+
 def create_app(context: APIContext) -> FastAPI:
     app = FastAPI(title="GES Solar EMS", version="0.1.0")
     static_dir = Path(__file__).resolve().parent.parent / "ui" / "static"
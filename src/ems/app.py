@@ -1,14 +1,22 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from functools import partial
 from typing import Any, Dict
 
 import uvicorn
 
 from .api.app import APIContext, create_app
+from .core.events import EventBus
 from .core.health import HealthRegistry
 from .core.scheduler import Scheduler
 from .drivers import create_driver
+from .drivers.bitfield import BIT_TRANSITION_TOPIC
+from .drivers.deadband import DeadbandFilter
+from .io.breaker import BreakerState
+from .io.bus import close_serial_buses
+from .io.pool import close_tcp_pools
+from .store.buffer import WriteBuffer
 from .store.database import Database
 # from .store.exporter import ParquetExporter  # Temporarily disabled due to pandas dependency
 from .uplink.publisher import UplinkPublisher
@@ -25,8 +33,33 @@ class EMSApp:
         self.scheduler = Scheduler(
             self.health, jitter_seconds=config.global_.scheduler.jitter_seconds
         )
-        self.db = Database(config.global_.storage.sqlite_path)
+        storage = config.global_.storage
+        raw_registers = storage.raw_registers
+        if config.global_.export.include_raw_registers:
+            raw_registers = "all"  # snapshots report raw registers for every metric
+        self.db = Database(
+            storage.sqlite_path,
+            raw_registers=raw_registers,
+            writer=storage.writer,
+            partition_span_s=storage.partition_span_s,
+        )
+        self.write_buffer = WriteBuffer(
+            self.db,
+            flush_interval_ms=storage.flush_interval_ms,
+            flush_rows=storage.flush_rows,
+            max_rows=storage.buffer_max_rows,
+        )
         self.devices = [create_driver(device) for device in config.devices]
+        self.events = EventBus()
+        for device in self.devices:
+            device.event_bus = self.events
+            device.raw_registers = self.db.raw_registers
+        self.deadbands: Dict[str, DeadbandFilter] = {}
+        for device in self.devices:
+            point_map = getattr(device, "point_map", None)
+            deadband = DeadbandFilter.for_points(point_map.points) if point_map else None
+            if deadband is not None:
+                self.deadbands[device.device_id] = deadband
         self.device_status: Dict[str, Dict[str, Any]] = {
             device.device_id: {
                 "device_id": device.device_id,
@@ -37,6 +70,10 @@ class EMSApp:
                 "healthy": True,
                 "message": None,
                 "last_poll_utc": None,
+                "read_plan": (
+                    device.read_plan.summary() if hasattr(device, "read_plan") else None
+                ),
+                "poll_classes": getattr(device, "poll_intervals", None) or None,
             }
             for device in self.devices
         }
@@ -48,19 +85,31 @@ class EMSApp:
         self.uplink = UplinkPublisher(self.db, config.global_.uplink)
         # self.parquet_exporter = ParquetExporter(self.db, config.global_.storage.export_parquet_dir)  # Temporarily disabled
         self._server: uvicorn.Server | None = None
+        self._last_maintenance: date | None = None
 
     async def start(self) -> None:
         await self.db.connect()
+        self.write_buffer.start()
         try:
             await self.export_service.push_register_maps()
         except Exception as exc:  # noqa: BLE001
             self.logger.warning("register_map_push_failed", error=str(exc))
         for device, device_config in zip(self.devices, self.config.devices):
-            self.scheduler.schedule_periodic(
-                name=f"poll-{device_config.id}",
-                interval=device_config.poll_interval_s,
-                coro_factory=lambda d=device: self._poll_device(d),
-            )
+            poll_intervals = getattr(device, "poll_intervals", None)
+            if not poll_intervals:
+                self.scheduler.schedule_periodic(
+                    name=f"poll-{device_config.id}",
+                    interval=device_config.poll_interval_s,
+                    coro_factory=partial(self._poll_device, device),
+                )
+                continue
+            for poll_class, interval in poll_intervals.items():
+                self.scheduler.schedule_periodic(
+                    name=f"poll-{device_config.id}-{poll_class}",
+                    interval=interval,
+                    coro_factory=partial(self._poll_device, device, poll_class),
+                )
+        self.scheduler.schedule_background("bit-transitions", self._log_bit_transitions())
         self.scheduler.schedule_periodic(
             name="uplink",
             interval=self.config.global_.uplink.batch_period_s,
@@ -68,10 +117,8 @@ class EMSApp:
         )
         self.scheduler.schedule_periodic(
             name="retention",
-            interval=86400,
-            coro_factory=lambda: self.db.purge_old_measurements(
-                self.config.global_.storage.retention_days
-            ),
+            interval=600,
+            coro_factory=self._storage_maintenance,
         )
         # self.scheduler.schedule_periodic(
         #     name="parquet_export",
@@ -98,12 +145,15 @@ class EMSApp:
         self._server = uvicorn.Server(config)
         await self._server.serve()
 
-    async def _poll_device(self, driver: Any) -> None:
+    async def _poll_device(self, driver: Any, poll_class: str | None = None) -> None:
         device_id = driver.device_id
         try:
-            measurements = await driver.read_points()
-            if measurements:
-                await self.db.insert_measurements(measurements)
+            batch = await driver.read_batch(poll_class)
+            deadband = self.deadbands.get(device_id)
+            if deadband is not None:
+                batch = deadband.filter_batch(batch)
+            if batch:
+                await self.write_buffer.put(batch)
             self.device_status[device_id].update(
                 {
                     "healthy": True,
@@ -111,6 +161,14 @@ class EMSApp:
                     "last_poll_utc": datetime.now(timezone.utc).isoformat(),
                 }
             )
+            if deadband is not None:
+                self.device_status[device_id]["deadband"] = deadband.stats()
+            block_cache = getattr(driver, "block_cache", None)
+            if block_cache is not None:
+                self.device_status[device_id]["block_cache"] = block_cache.stats()
+            bitfields = getattr(driver, "bitfields", None)
+            if bitfields:
+                self.device_status[device_id]["bit_states"] = bitfields.states()
         except Exception as exc:  # noqa: BLE001
             self.device_status[device_id].update(
                 {
@@ -120,11 +178,74 @@ class EMSApp:
                 }
             )
             raise
+        finally:
+            self._report_breaker(driver)
+
+    async def _storage_maintenance(self) -> None:
+        """Once a day, in the configured quiet hour: retention, incremental vacuum, checkpoint."""
+        storage = self.config.global_.storage
+        now = datetime.now(timezone.utc)
+        if now.hour != storage.maintenance_hour_utc or self._last_maintenance == now.date():
+            return
+        self._last_maintenance = now.date()
+        # Commit what the pollers have buffered so the checkpoint can cover it.
+        await self.write_buffer.flush()
+
+        def report(progress: Dict[str, Any]) -> None:
+            self.health.update(
+                "storage-maintenance", healthy=True, message=progress["state"], **progress
+            )
+
+        purge = await self.db.purge_old_measurements(
+            storage.retention_days, chunk_rows=storage.purge_chunk_rows, on_progress=report
+        )
+        stats = await self.db.vacuum(convert=storage.convert_auto_vacuum, on_progress=report)
+        # A file without incremental auto-vacuum still gets retention and the checkpoint.
+        self.health.update(
+            "storage-maintenance",
+            healthy=True,
+            message=(
+                f"freed {stats['pages_freed']} pages in {stats['vacuum_s']:.1f} s"
+                if stats["auto_vacuum"] == "incremental"
+                else "checkpointed; auto_vacuum is not incremental, free pages are reused"
+            ),
+            **stats,
+        )
+        self.logger.info("storage_maintenance", **purge, **stats)
+
+    async def _log_bit_transitions(self) -> None:
+        async for transition in self.events.subscribe(BIT_TRANSITION_TOPIC):
+            self.logger.info(
+                "bit_transition",
+                device_id=transition.device_id,
+                metric=transition.metric,
+                bit=transition.bit,
+                label=transition.label,
+                state=transition.state,
+            )
+
+    def _report_breaker(self, driver: Any) -> None:
+        breaker = getattr(getattr(driver, "client", None), "breaker", None)
+        if breaker is None:
+            return
+        stats = breaker.stats()
+        closed = breaker.state is BreakerState.CLOSED
+        self.health.update(
+            f"breaker-{driver.device_id}", healthy=closed, message=stats["state"], **stats
+        )
+        if not closed:
+            self.device_status[driver.device_id].update(
+                {"healthy": False, "message": f"circuit {stats['state']}"}
+            )
 
     async def shutdown(self) -> None:
         await self.scheduler.shutdown()
+        await self.write_buffer.close()
+        await self.db.close()
         await self.uplink.close()
         await self.export_service.close()
+        await close_serial_buses()
+        await close_tcp_pools()
 
 
 async def run_app(config: AppConfig) -> None:
@@ -4,7 +4,8 @@ import abc
 from datetime import datetime, timezone
 from typing import Any, List
 
-from ..utils.models import ControlResult, Measurement, Quality
+from ..core.events import EventBus
+from ..utils.models import ControlResult, Measurement, MeasurementBatch, Quality
 
 
 class DriverError(Exception):
@@ -21,11 +22,25 @@ class BaseDriver(abc.ABC):
         self.device_id = device_config.id
         self.plant_id = device_config.plant_id
         self.type = device_config.type
+        # Set by the application; drivers publish device events (e.g. alarm bits) on it.
+        self.event_bus: EventBus | None = None
+        # Which rows carry raw registers into storage; mirrors Database.raw_registers.
+        self.raw_registers = "non_good"
 
     @abc.abstractmethod
     async def read_points(self) -> List[Measurement]:
         raise NotImplementedError
 
+    async def read_batch(self, poll_class: str | None = None) -> MeasurementBatch:
+        """Poll the device into a columnar batch; the ingest path uses this entry point."""
+        return MeasurementBatch.from_measurements(
+            await self.read_points(),
+            datetime.now(timezone.utc),
+            self.plant_id,
+            self.device_id,
+            self.__class__.__name__,
+        )
+
     async def apply_control(self, command: str, value: Any | None = None) -> ControlResult:
         raise ControlNotAllowedError(f"Device {self.device_id} does not accept controls")
 
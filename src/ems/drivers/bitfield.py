@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+from .pointmap import PointDefinition
+
+BIT_TRANSITION_TOPIC = "bit_transitions"
+
+
+@dataclass(frozen=True, slots=True)
+class BitTransition:
+    """One named bit of a status/alarm register changing state."""
+
+    device_id: str
+    metric: str
+    bit: int
+    label: str
+    state: bool
+    timestamp_utc: datetime
+
+
+def bitfield_value(point: PointDefinition, registers: Sequence[int]) -> int:
+    """The raw bit pattern of a bitfield point, most significant register first."""
+    regs = list(registers[: point.count])
+    if len(regs) > 1 and point.word_order == "little":
+        regs.reverse()
+    value = 0
+    for register in regs:
+        value = (value << 16) | (register & 0xFFFF)
+    return value
+
+
+def bit_states(point: PointDefinition, value: int) -> Dict[str, bool]:
+    """Split a bitfield value into its named boolean states."""
+    return {label: bool(value >> bit & 1) for bit, label in point.decode}
+
+
+class BitfieldTracker:
+    """Remembers the last bit pattern of each labelled bitfield point and diffs new polls.
+
+    Only bits named in the point's ``decode`` section are reported. A point seen for the
+    first time is diffed against zero, so alarms already active at startup are reported
+    once as raised. :meth:`states` gives the current named states for device status.
+    """
+
+    def __init__(self, points: Sequence[PointDefinition]) -> None:
+        self._masks: Dict[int, int] = {}
+        self._points: Dict[int, PointDefinition] = {}
+        for index, point in enumerate(points):
+            if point.decode and point.type.startswith("bitfield"):
+                self._masks[index] = sum(1 << bit for bit, _ in point.decode)
+                self._points[index] = point
+        self._previous: Dict[int, int] = {}
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._masks
+
+    def __bool__(self) -> bool:
+        return bool(self._masks)
+
+    def update(self, index: int, point: PointDefinition, value: int) -> List[Tuple[int, str, bool]]:
+        """Record ``value`` for point ``index``; return ``(bit, label, state)`` per change."""
+        changed = (self._previous.get(index, 0) ^ value) & self._masks[index]
+        self._previous[index] = value
+        if not changed:
+            return []
+        return [
+            (bit, label, bool(value >> bit & 1))
+            for bit, label in point.decode
+            if changed >> bit & 1
+        ]
+
+    def states(self) -> Dict[str, Dict[str, bool]]:
+        """Named boolean states of every labelled point as of its last good poll."""
+        return {
+            self._points[index].name: bit_states(self._points[index], value)
+            for index, value in self._previous.items()
+        }
+
+
+__all__ = [
+    "BIT_TRANSITION_TOPIC",
+    "BitTransition",
+    "BitfieldTracker",
+    "bit_states",
+    "bitfield_value",
+]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Sequence, Tuple
+
+from ..io.mbap import REGISTER_STRUCTS
+from .readplan import BIT_FUNCTION_CODES
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class BlockUnchanged(Exception):
+    """Stands in for a block's registers so decoders skip it like a failed read."""
+
+
+UNCHANGED = BlockUnchanged("register block unchanged since the last stored poll")
+
+
+def block_bytes(fc: int, registers: Sequence[int]) -> bytes:
+    """Compact exact image of one block read: 2 bytes per register, 1 byte per bit."""
+    if fc in BIT_FUNCTION_CODES:
+        return bytes(registers)
+    return REGISTER_STRUCTS[len(registers)].pack(*registers)
+
+
+class BlockChangeCache:
+    """LRU of the last stored bytes of each register block.
+
+    ``unchanged()`` is true when a block returns exactly the bytes it returned when its
+    points were last stored, and fewer than ``keepalive_s`` seconds have passed since then.
+    At most ``max_entries`` blocks are remembered; evicted blocks are simply decoded again.
+    """
+
+    def __init__(self, keepalive_s: float, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.keepalive_s = keepalive_s
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Tuple[bytes, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def unchanged(self, key: Hashable, fc: int, registers: Sequence[int]) -> bool:
+        data = block_bytes(fc, registers)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == data and now - entry[1] < self.keepalive_s:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        self._entries[key] = (data, now)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return False
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "keepalive_s": self.keepalive_s,
+        }
+
+
+__all__ = ["UNCHANGED", "BlockChangeCache", "BlockUnchanged", "block_bytes"]
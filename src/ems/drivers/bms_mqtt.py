@@ -25,8 +25,8 @@ class MQTTBMSDriver(BaseDriver):
             "ALARM_COUNT": random.randint(0, 3),
         }
         for point in self.point_map.points:
-            metric = point["metric"]
-            unit = point.get("unit")
+            metric = point.metric or point.name
+            unit = point.unit
             value = float(values.get(metric, 0.0))
             measurements.append(self._measurement(metric=metric, value=value, unit=unit))
         self._last_payload = values
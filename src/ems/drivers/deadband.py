@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from ..utils.models import GOOD_CODE, QUALITY_CODES, Measurement, MeasurementBatch
+from .pointmap import PointDefinition
+
+
+@dataclass(frozen=True, slots=True)
+class Deadband:
+    """Report-by-exception thresholds for one metric."""
+
+    absolute: float = 0.0
+    percent: float = 0.0
+    max_silence_s: Optional[float] = None
+
+    def threshold(self, reference: float) -> float:
+        """The larger of the absolute band and ``percent`` of the last reported value."""
+        return max(self.absolute, abs(reference) * self.percent / 100.0)
+
+
+class _Last:
+    __slots__ = ("value", "quality", "timestamp")
+
+    def __init__(self, value: Optional[float], quality: int, timestamp: datetime) -> None:
+        self.value = value
+        self.quality = quality
+        self.timestamp = timestamp
+
+
+class DeadbandFilter:
+    """Drops measurements that stay within their point's deadband of the last reported value.
+
+    A sample is always reported when it is the first for its metric, its quality changes or
+    is not GOOD, it moves further than the band from the last *reported* value, or
+    ``max_silence_s`` has passed since that report. Comparing against the last report rather
+    than the previous poll stops slow drift from hiding, so holding each stored value until
+    the next row reconstructs the series to within the band, with at most ``max_silence_s``
+    between rows. Metrics without deadband settings pass through untouched.
+    """
+
+    def __init__(self, bands: Dict[str, Deadband]) -> None:
+        self.bands = bands
+        self._last: Dict[str, _Last] = {}
+        self.reported = 0
+        self.suppressed = 0
+
+    @classmethod
+    def for_points(cls, points: Iterable[PointDefinition]) -> Optional[DeadbandFilter]:
+        """Build a filter from point-map settings, or ``None`` when no point needs one."""
+        bands: Dict[str, Deadband] = {}
+        for point in points:
+            if point.deadband is None and point.deadband_pct is None:
+                if point.poll_class != "on_change":
+                    continue
+                # On-change points store a row only when the value differs at all.
+            band = Deadband(
+                absolute=point.deadband or 0.0,
+                percent=point.deadband_pct or 0.0,
+                max_silence_s=point.max_silence_s,
+            )
+            # Drivers label measurements with either the point name or its metric.
+            bands[point.name] = band
+            if point.metric:
+                bands[point.metric] = band
+        return cls(bands) if bands else None
+
+    def _report(
+        self,
+        metric: str,
+        value: Optional[float],
+        quality: int,
+        timestamp: datetime,
+        band: Deadband,
+    ) -> bool:
+        last = self._last.get(metric)
+        if last is None or quality != GOOD_CODE or quality != last.quality:
+            return True
+        if value is None or last.value is None:
+            return value is not last.value
+        if math.isnan(value) or math.isnan(last.value):
+            return not (math.isnan(value) and math.isnan(last.value))
+        if abs(value - last.value) > band.threshold(last.value):
+            return True
+        if band.max_silence_s is not None:
+            return (timestamp - last.timestamp).total_seconds() >= band.max_silence_s
+        return False
+
+    def _keep(self, metric: str, value: Optional[float], quality: int, timestamp: datetime) -> bool:
+        band = self.bands.get(metric)
+        if band is None:
+            return True
+        if self._report(metric, value, quality, timestamp, band):
+            self._last[metric] = _Last(value, quality, timestamp)
+            self.reported += 1
+            return True
+        self.suppressed += 1
+        return False
+
+    def filter(self, measurements: Sequence[Measurement]) -> List[Measurement]:
+        return [
+            m
+            for m in measurements
+            if self._keep(m.metric, m.value, QUALITY_CODES[m.quality], m.timestamp_utc)
+        ]
+
+    def filter_batch(self, batch: MeasurementBatch) -> MeasurementBatch:
+        metrics, ids, values, qualities = batch.metrics, batch.ids, batch.values, batch.qualities
+        timestamp = batch.timestamp_utc
+        keep = [
+            position
+            for position in range(len(ids))
+            if self._keep(metrics[ids[position]], values[position], qualities[position], timestamp)
+        ]
+        return batch if len(keep) == len(ids) else batch.take(keep)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.reported + self.suppressed
+        return {
+            "metrics": len(self._last),
+            "reported": self.reported,
+            "suppressed": self.suppressed,
+            "suppressed_ratio": self.suppressed / total if total else 0.0,
+        }
+
+
+__all__ = ["Deadband", "DeadbandFilter"]
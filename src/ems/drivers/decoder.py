@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import logging
+import math
+import struct
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only on installs without numpy
+    np = None  # type: ignore[assignment]
+
+from ..io.mbap import REGISTER_STRUCTS
+from ..utils.models import Quality
+from .pointmap import PointDefinition, PointMap
+from .readplan import BIT_FUNCTION_CODES, ReadBlock, ReadPlan
+
+# Decode strategies, chosen once per point when the map is compiled.
+DIRECT = 0  # value is the first register as-is
+PACKED = 1  # unpack straight out of the block's big-endian byte image
+SWAPPED = 2  # two-register value with its words swapped before unpacking
+LEGACY = 3  # unusual shapes go through decode_point()
+INVALID = 4  # too few registers for the type; always BAD instead of failing the poll
+
+_FORMATS = {"int16": "h", "uint32": "I", "int32": "i", "float": "f", "float64": "d"}
+_DTYPES = {"h": ">i2", "I": ">u4", "i": ">i4", "f": ">f4", "d": ">f8"}
+
+BACKENDS = ("auto", "python", "numpy")
+# Below this many vectorisable points per poll, array setup costs more than it saves.
+VECTOR_MIN_POINTS = 16
+
+logger = logging.getLogger(__name__)
+
+
+def decode_point(point: PointDefinition, registers: List[int]) -> Tuple[float | None, Quality]:
+    """Decode one point from its registers, re-reading the definition on every call.
+
+    This is the reference behaviour the compiled decoder reproduces; it is only used for
+    point shapes the compiler does not specialise.
+    """
+    ptype = point.type
+    value: float | None
+    endianness: Literal["big", "little"] = "little" if point.endianness == "little" else "big"
+    regs = list(registers)
+    if len(regs) > 1 and point.word_order == "little":
+        regs = list(reversed(regs))
+    if ptype == "bool":
+        value = float(regs[0])
+    elif ptype == "uint16":
+        value = float(regs[0])
+    elif ptype == "int16":
+        value = float(
+            struct.unpack(">h" if endianness == "big" else "<h", regs[0].to_bytes(2, endianness))[0]
+        )
+    elif ptype in {"uint32", "int32", "float", "float64"}:
+        raw_bytes = b"".join(r.to_bytes(2, endianness) for r in regs)
+        if ptype in ("float", "float64"):
+            fmt = "f" if ptype == "float" else "d"
+            value = float(struct.unpack((">" if endianness == "big" else "<") + fmt, raw_bytes)[0])
+        elif ptype == "uint32":
+            value = float(int.from_bytes(raw_bytes, endianness, signed=False))
+        else:
+            value = float(int.from_bytes(raw_bytes, endianness, signed=True))
+    elif ptype.startswith("bitfield"):
+        value = float(registers[0])
+    else:
+        value = float(registers[0])
+    value = value * point.scale + point.offset
+    quality = Quality.GOOD
+    if point.min_value is not None and value < point.min_value:
+        quality = Quality.BAD
+    if point.max_value is not None and value > point.max_value:
+        quality = Quality.BAD
+    return value, quality
+
+
+def _strategy(point: PointDefinition, fc: int, count: int) -> Tuple[int, struct.Struct | None]:
+    ptype = point.type
+    fmt = _FORMATS.get(ptype)
+    words_swapped = count > 1 and point.word_order == "little"
+    if fmt is None:
+        # bool/uint16 take the first register after the word swap, everything else before it.
+        return (LEGACY if words_swapped and ptype in ("bool", "uint16") else DIRECT), None
+    if fc in BIT_FUNCTION_CODES:
+        return LEGACY, None
+    if ptype == "int16":
+        # Both byte orders round-trip the register to the same signed value.
+        return (LEGACY if words_swapped else PACKED), struct.Struct(">h")
+    width = struct.calcsize(fmt) // 2
+    if count < width:
+        return INVALID, None
+    # Little-endian bytes across the whole value is the same as reversing its words.
+    swap = words_swapped != (point.endianness == "little")
+    if count != width or (swap and width != 2):
+        return LEGACY, None
+    return (SWAPPED if swap else PACKED), struct.Struct(">" + fmt)
+
+
+class BlockDecoder:
+    """Decodes every point of one read block from the block's registers."""
+
+    __slots__ = ("entries", "packed")
+
+    def __init__(self, block: ReadBlock, points: Sequence[PointDefinition]) -> None:
+        entries = []
+        for member in block.points:
+            point = points[member.index]
+            kind, unpacker = _strategy(point, block.fc, member.count)
+            entries.append(
+                (
+                    kind,
+                    member.offset,
+                    member.count,
+                    unpacker.unpack_from if unpacker is not None else None,
+                    point.scale,
+                    point.offset,
+                    -math.inf if point.min_value is None else point.min_value,
+                    math.inf if point.max_value is None else point.max_value,
+                    point,
+                )
+            )
+        self.entries = tuple(entries)
+        # Bit blocks and plain uint16 maps never need the byte image.
+        self.packed = any(entry[0] in (PACKED, SWAPPED) for entry in entries)
+
+    def decode(self, registers: Sequence[int]) -> List[Tuple[float | None, Quality]]:
+        data = REGISTER_STRUCTS[len(registers)].pack(*registers) if self.packed else b""
+        good, bad = Quality.GOOD, Quality.BAD
+        results: List[Tuple[float | None, Quality]] = []
+        append = results.append
+        for kind, offset, count, unpack, scale, bias, low, high, point in self.entries:
+            if kind == DIRECT:
+                value = float(registers[offset])
+            elif kind == PACKED:
+                value = float(unpack(data, 2 * offset)[0])  # type: ignore[misc]
+            elif kind == SWAPPED:
+                start = 2 * offset
+                swapped = data[start + 2 : start + 4] + data[start : start + 2]
+                value = float(unpack(swapped)[0])  # type: ignore[misc]
+            elif kind == LEGACY:
+                append(decode_point(point, list(registers[offset : offset + count])))
+                continue
+            else:
+                append((None, bad))
+                continue
+            value = value * scale + bias
+            append((value, bad if value < low or value > high else good))
+        return results
+
+
+def resolve_backend(backend: str) -> str:
+    """Map a configured backend to one that can run here."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown decode backend {backend!r}; expected one of {BACKENDS}")
+    if backend != "python" and np is None:
+        if backend == "numpy":
+            logger.warning("numpy not available, decoding with the pure-Python backend")
+        return "python"
+    return backend
+
+
+BlockResults = List[Tuple[float | None, Quality]]
+
+
+class PlanDecoder:
+    """Compiled decoders for every block of a read plan, in plan order."""
+
+    __slots__ = ("blocks", "backend")
+
+    def __init__(self, plan: ReadPlan, points: Sequence[PointDefinition]) -> None:
+        self.blocks = tuple(BlockDecoder(block, points) for block in plan.blocks)
+        self.backend = "python"
+
+    def decode(self, block_registers: Sequence[Any]) -> List[BlockResults | None]:
+        """Decode one poll; entries that are exceptions (failed reads) decode to None."""
+        return [
+            None if isinstance(registers, BaseException) else decoder.decode(registers)
+            for decoder, registers in zip(self.blocks, block_registers)
+        ]
+
+
+class VectorPlanDecoder(PlanDecoder):
+    """Decodes all packed points of a poll as NumPy arrays, one gather per value type.
+
+    Every register block of the poll is packed into a single byte image. Each value type
+    keeps a precomputed byte-index matrix into that image (word swaps are folded into the
+    index order), so extraction, byte-order conversion, scaling and the bounds check are a
+    few array operations per poll regardless of point count. Bit blocks and unusual shapes
+    go through the per-block decoders.
+    """
+
+    __slots__ = ("_layout", "_bit_blocks", "_groups", "_scalar", "_image")
+
+    def __init__(self, plan: ReadPlan, points: Sequence[PointDefinition]) -> None:
+        super().__init__(plan, points)
+        self.backend = "numpy"
+        layout = []  # (block index, first register in the image, register count)
+        grouped: Dict[str, List[Tuple[int, int, int, Tuple[Any, ...]]]] = {}
+        scalar: Dict[int, List[Tuple[int, Tuple[Any, ...]]]] = {}
+        bit_blocks = []
+        base = 0
+        for block_index, (block, decoder) in enumerate(zip(plan.blocks, self.blocks)):
+            if block.fc in BIT_FUNCTION_CODES:
+                bit_blocks.append(block_index)
+                continue
+            layout.append((block_index, base, block.count))
+            for position, (member, entry) in enumerate(zip(block.points, decoder.entries)):
+                kind = entry[0]
+                if kind in (PACKED, SWAPPED):
+                    _, unpacker = _strategy(points[member.index], block.fc, member.count)
+                    assert unpacker is not None
+                    fmt = unpacker.format[-1]
+                    grouped.setdefault(fmt, []).append((block_index, position, base, entry))
+                else:
+                    scalar.setdefault(block_index, []).append((position, entry))
+            base += block.count
+        groups = []
+        for fmt, members in grouped.items():
+            width = struct.calcsize(fmt)
+            rows = []
+            for _, _, block_base, entry in members:
+                start = 2 * (block_base + entry[1])
+                order = (2, 3, 0, 1) if entry[0] == SWAPPED else range(width)
+                rows.append([start + i for i in order])
+            groups.append(
+                (
+                    [(block_index, position) for block_index, position, _, _ in members],
+                    np.array(rows, dtype=np.intp),
+                    np.dtype(_DTYPES[fmt]),
+                    np.array([entry[4] for _, _, _, entry in members]),
+                    np.array([entry[5] for _, _, _, entry in members]),
+                    np.array([entry[6] for _, _, _, entry in members]),
+                    np.array([entry[7] for _, _, _, entry in members]),
+                )
+            )
+        self._layout = tuple(layout)
+        self._bit_blocks = tuple(bit_blocks)
+        self._groups = tuple(groups)
+        self._scalar = scalar
+        self._image = struct.Struct(f">{base}H")
+
+    @property
+    def vector_points(self) -> int:
+        return sum(len(group[0]) for group in self._groups)
+
+    def decode(self, block_registers: Sequence[Any]) -> List[BlockResults | None]:
+        results: List[Any] = [None] * len(self.blocks)
+        flat: List[int] = []
+        for block_index, _, count in self._layout:
+            registers = block_registers[block_index]
+            if isinstance(registers, BaseException):
+                flat.extend([0] * count)  # keeps offsets; these results are discarded
+            else:
+                flat.extend(registers)
+                results[block_index] = [None] * len(self.blocks[block_index].entries)
+        for block_index in self._bit_blocks:
+            registers = block_registers[block_index]
+            if not isinstance(registers, BaseException):
+                results[block_index] = self.blocks[block_index].decode(registers)
+        data = np.frombuffer(self._image.pack(*flat), dtype=np.uint8)
+        good, bad = Quality.GOOD, Quality.BAD
+        for targets, index, dtype, scale, bias, low, high in self._groups:
+            values = data[index].view(dtype).ravel() * scale + bias
+            flags = ((values < low) | (values > high)).tolist()
+            for (block_index, position), value, flag in zip(targets, values.tolist(), flags):
+                block_results = results[block_index]
+                if block_results is not None:
+                    block_results[position] = (value, bad if flag else good)
+        for block_index, entries in self._scalar.items():
+            block_results = results[block_index]
+            if block_results is None:
+                continue
+            registers = block_registers[block_index]
+            for position, (kind, offset, count, _, scale_, bias_, low_, high_, point) in entries:
+                if kind == DIRECT:
+                    value = float(registers[offset]) * scale_ + bias_
+                    block_results[position] = (
+                        value,
+                        bad if value < low_ or value > high_ else good,
+                    )
+                elif kind == LEGACY:
+                    block_results[position] = decode_point(
+                        point, list(registers[offset : offset + count])
+                    )
+                else:
+                    block_results[position] = (None, bad)
+        return results
+
+
+def compile_plan(
+    plan: ReadPlan, points: Sequence[PointDefinition], backend: str = "auto"
+) -> PlanDecoder:
+    """Compile ``plan`` for ``backend``: ``numpy`` always vectorises, ``auto`` only when the
+    poll has at least ``VECTOR_MIN_POINTS`` packed points, ``python`` never."""
+    backend = resolve_backend(backend)
+    if backend == "python":
+        return PlanDecoder(plan, points)
+    vectorised = VectorPlanDecoder(plan, points)
+    if backend == "numpy" or vectorised.vector_points >= VECTOR_MIN_POINTS:
+        return vectorised
+    return PlanDecoder(plan, points)
+
+
+_decoder_cache: dict[Tuple[str, int, int, Optional[str], str], PlanDecoder] = {}
+
+
+def decoder_for(point_map: PointMap, plan: ReadPlan, backend: str = "auto") -> PlanDecoder:
+    key = (point_map.cache_key, plan.max_gap, plan.max_registers, plan.poll_class, backend)
+    decoder = _decoder_cache.get(key)
+    if decoder is None:
+        decoder = compile_plan(plan, point_map.points, backend=backend)
+        _decoder_cache[key] = decoder
+    return decoder
+
+
+__all__ = [
+    "BACKENDS",
+    "BlockDecoder",
+    "PlanDecoder",
+    "VectorPlanDecoder",
+    "compile_plan",
+    "decode_point",
+    "decoder_for",
+    "resolve_backend",
+]
@@ -1,12 +1,41 @@
 from __future__ import annotations
 
-import struct
-from typing import Any, Dict, List
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
-from ..io.modbus import ModbusClientProtocol, create_client
-from ..utils.models import Measurement, Quality
+from ..io.modbus import ModbusClientProtocol, ModbusReadError, create_client
+from ..utils.models import BAD_CODE, GOOD_CODE, QUALITY_CODES, Measurement, MeasurementBatch
 from .base import BaseDriver
-from .pointmap import PointMap, load_point_map
+from .bitfield import BIT_TRANSITION_TOPIC, BitfieldTracker, BitTransition, bitfield_value
+from .blockcache import UNCHANGED, BlockChangeCache
+from .decoder import PlanDecoder, decoder_for
+from .pointmap import POLL_CLASSES, PointMap, load_point_map
+from .readplan import MAX_READ_REGISTERS, ReadPlan, plan_for
+
+FAST_POLL_INTERVAL_S = 5
+SLOW_POLL_FACTOR = 10
+
+
+def poll_intervals(device_config: Any) -> Dict[str, float]:
+    """Interval per poll class for one device.
+
+    Normal points follow ``poll_interval_s``; fast defaults to 5 s and slow/on-change to ten
+    normal cycles. The device's ``poll_classes`` mapping overrides any of them.
+    """
+    base = float(device_config.poll_interval_s)
+    intervals = {
+        "fast": min(float(FAST_POLL_INTERVAL_S), base),
+        "normal": base,
+        "slow": base * SLOW_POLL_FACTOR,
+        "on_change": base * SLOW_POLL_FACTOR,
+    }
+    for name, interval in (getattr(device_config, "poll_classes", None) or {}).items():
+        key = name.lower().replace("-", "_")
+        if key not in POLL_CLASSES:
+            raise ValueError(f"Device {device_config.id}: unknown poll class {name!r}")
+        intervals[key] = float(interval)
+    return intervals
 
 
 class GenericModbusDriver(BaseDriver):
@@ -16,71 +45,125 @@ class GenericModbusDriver(BaseDriver):
             raise ValueError("Generic Modbus device requires point_map")
         self.point_map: PointMap = load_point_map(device_config.point_map)
         self.client = client or create_client(device_config.protocol, device_config.connection)
-
-    async def read_points(self) -> List[Measurement]:
-        measurements: list[Measurement] = []
-        for point in self.point_map.points:
-            fc = int(point.get("fc", 3))
-            address = int(point.get("address"))
-            count = int(point.get("count", 1))
-            registers = await self.client.read(fc=fc, address=address, count=count)
-            value, quality = self._decode_point(point, registers)
-            measurements.append(
-                self._measurement(
-                    metric=point["name"],
-                    value=value,
-                    unit=point.get("unit"),
-                    quality=quality,
-                    raw={"registers": registers},
+        connection = device_config.connection
+        max_gap = int(getattr(connection, "max_read_gap", None) or 0)
+        max_registers = int(getattr(connection, "max_read_registers", None) or MAX_READ_REGISTERS)
+        backend = getattr(device_config, "decode_backend", None) or "auto"
+        self.read_plan: ReadPlan = plan_for(
+            self.point_map, max_gap=max_gap, max_registers=max_registers
+        )
+        self.decoder: PlanDecoder = decoder_for(self.point_map, self.read_plan, backend=backend)
+        # Maps that tag points with poll classes get one coalesced plan and rate per class;
+        # an untagged map keeps the single whole-device poll.
+        classes = {p.poll_class for p in self.point_map.points if p.readable}
+        self.poll_intervals: Dict[str, float] = {}
+        self._class_plans: Dict[str, tuple[ReadPlan, PlanDecoder]] = {}
+        if classes - {"normal"}:
+            intervals = poll_intervals(device_config)
+            for poll_class in sorted(classes, key=POLL_CLASSES.index):
+                plan = plan_for(
+                    self.point_map,
+                    max_gap=max_gap,
+                    max_registers=max_registers,
+                    poll_class=poll_class,
                 )
-            )
-        return measurements
+                decoder = decoder_for(self.point_map, plan, backend=backend)
+                self._class_plans[poll_class] = (plan, decoder)
+                self.poll_intervals[poll_class] = intervals[poll_class]
+        # Metric tables shared by every batch this driver produces; ids are point indexes.
+        self._metrics = tuple(point.name for point in self.point_map.points)
+        self._units = tuple(point.unit for point in self.point_map.points)
+        self.bitfields = BitfieldTracker(self.point_map.points)
+        keepalive = getattr(device_config, "unchanged_keepalive_s", None)
+        self.block_cache = BlockChangeCache(float(keepalive)) if keepalive else None
+
+    async def read_points(self, poll_class: Optional[str] = None) -> List[Measurement]:
+        """Poll every point, or only the points of ``poll_class``."""
+        return (await self.read_batch(poll_class)).to_measurements()
 
-    def _decode_point(
-        self, point: Dict[str, Any], registers: List[int]
-    ) -> tuple[float | None, Quality]:
-        ptype = point.get("type", "uint16")
-        scale = float(point.get("scale", 1.0))
-        value: float | None
-        byte_order = point.get("word_order", "big")
-        endianness = point.get("endianness", "big")
-        regs = list(registers)
-        if len(regs) > 1 and byte_order == "little":
-            regs = list(reversed(regs))
-        if ptype == "bool":
-            value = float(regs[0])
-        elif ptype == "uint16":
-            value = float(regs[0])
-        elif ptype == "int16":
-            value = float(
-                struct.unpack(
-                    ">h" if endianness == "big" else "<h", regs[0].to_bytes(2, endianness)
-                )[0]
-            )
-        elif ptype in {"uint32", "int32", "float"}:
-            raw_bytes = b"".join(r.to_bytes(2, endianness) for r in regs)
-            if ptype == "float":
-                fmt = ">f" if endianness == "big" else "<f"
-                value = float(struct.unpack(fmt, raw_bytes)[0])
-            elif ptype == "uint32":
-                value = float(int.from_bytes(raw_bytes, endianness, signed=False))
-            else:
-                value = float(int.from_bytes(raw_bytes, endianness, signed=True))
-        elif ptype.startswith("bitfield"):
-            value = float(registers[0])
+    async def read_batch(self, poll_class: Optional[str] = None) -> MeasurementBatch:
+        if poll_class is None:
+            plan, decoder = self.read_plan, self.decoder
         else:
-            value = float(registers[0])
-        value *= scale
-        quality = Quality.GOOD
-        rules = point.get("quality_rules")
-        if rules:
-            min_v = rules.get("min")
-            max_v = rules.get("max")
-            if min_v is not None and value < float(min_v):
-                quality = Quality.BAD
-            if max_v is not None and value > float(max_v):
-                quality = Quality.BAD
-        return value, quality
+            plan, decoder = self._class_plans[poll_class]
+        points = self.point_map.points
+        batch = MeasurementBatch(
+            datetime.now(timezone.utc),
+            self.plant_id,
+            self.device_id,
+            self.__class__.__name__,
+            self._metrics,
+            self._units,
+        )
+        raw_all = self.raw_registers == "all"
+        transitions: list[BitTransition] = []
+        blocks = plan.blocks
+        # Issue every block read at once; pipelined and pooled transports overlap them.
+        block_registers = await asyncio.gather(
+            *(self.client.read(fc=b.fc, address=b.address, count=b.count) for b in blocks),
+            return_exceptions=True,
+        )
+        cache = self.block_cache
+        if cache is not None:
+            # Blocks that repeat their last stored bytes are neither decoded nor stored.
+            for position, (block, registers) in enumerate(zip(blocks, block_registers)):
+                key = (poll_class, position)
+                if isinstance(registers, BaseException):
+                    cache.invalidate(key)
+                elif cache.unchanged(key, block.fc, registers):
+                    block_registers[position] = UNCHANGED
+        decoded = decoder.decode(block_registers)
+        append = batch.append
+        for block, registers, values in zip(blocks, block_registers, decoded):
+            if registers is UNCHANGED:
+                continue
+            if isinstance(registers, BaseException):
+                if not isinstance(registers, ModbusReadError):
+                    raise registers
+                for member in block.points:
+                    append(member.index, None, BAD_CODE)
+                continue
+            assert values is not None  # only failed reads decode to None
+            for member, (value, quality) in zip(block.points, values):
+                code = QUALITY_CODES[quality]
+                if raw_all or code != GOOD_CODE:
+                    end = member.offset + member.count
+                    append(member.index, value, code, list(registers[member.offset : end]))
+                else:
+                    append(member.index, value, code)
+                if code == GOOD_CODE and member.index in self.bitfields:
+                    point = points[member.index]
+                    regs = registers[member.offset : member.offset + member.count]
+                    transitions.extend(
+                        BitTransition(
+                            self.device_id, point.name, bit, label, state, batch.timestamp_utc
+                        )
+                        for bit, label, state in self.bitfields.update(
+                            member.index, point, bitfield_value(point, regs)
+                        )
+                    )
+        if transitions and self.event_bus is not None:
+            for transition in transitions:
+                await self.event_bus.publish(BIT_TRANSITION_TOPIC, transition)
+        return batch
+
+    async def health(self) -> dict[str, Any]:
+        health: dict[str, Any] = {
+            "status": "OK",
+            "read_plan": self.read_plan.summary(),
+            "decode_backend": self.decoder.backend,
+        }
+        if self._class_plans:
+            health["poll_classes"] = {
+                name: {"interval_s": self.poll_intervals[name], **plan.summary()}
+                for name, (plan, _) in self._class_plans.items()
+            }
+        if self.block_cache is not None:
+            health["block_cache"] = self.block_cache.stats()
+        breaker = getattr(self.client, "breaker", None)
+        if breaker is not None:
+            health["breaker"] = breaker.stats()
+        return health
 
 
-__all__ = ["GenericModbusDriver"]
+__all__ = ["GenericModbusDriver", "poll_intervals"]
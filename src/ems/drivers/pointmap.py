@@ -2,33 +2,375 @@ from __future__ import annotations
 
 import hashlib
 import json
+import logging
+import os
+import re
+from dataclasses import astuple, dataclass, fields
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 import yaml
 
+# CSafeLoader only exists when PyYAML was built with libyaml.
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+logger = logging.getLogger(__name__)
+
+READ_FUNCTION_CODES = frozenset({1, 2, 3, 4})
+FUNCTION_CODES = READ_FUNCTION_CODES | {5, 6, 15, 16}
+
+TYPE_ALIASES = {"float32": "float", "boolean": "bool"}
+TYPE_REGISTERS = {
+    "uint16": 1,
+    "int16": 1,
+    "bool": 1,
+    "uint32": 2,
+    "int32": 2,
+    "float": 2,
+    "float64": 4,
+}
+POLL_CLASSES = ("fast", "normal", "slow", "on_change")
+_BITFIELD = re.compile(r"bitfield(\d*)$")
+_ORDERS = {"big": "big", "big_endian": "big", "little": "little", "little_endian": "little"}
+
+
+class PointMapError(ValueError):
+    """A point map file does not describe a valid set of points."""
+
+
+@dataclass(frozen=True, slots=True)
+class PointDefinition:
+    """One point of a map, normalised from either YAML layout."""
+
+    name: str
+    type: str = "uint16"
+    fc: Optional[int] = None
+    address: Optional[int] = None
+    count: int = 1
+    scale: float = 1.0
+    offset: float = 0.0
+    unit: Optional[str] = None
+    word_order: str = "big"
+    endianness: str = "big"
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    read_only: bool = True
+    metric: Optional[str] = None
+    parser: Optional[str] = None
+    index: Optional[int] = None
+    decode: Tuple[Tuple[int, str], ...] = ()
+    description: Optional[str] = None
+    deadband: Optional[float] = None
+    deadband_pct: Optional[float] = None
+    max_silence_s: Optional[float] = None
+    poll_class: str = "normal"
+
+    @property
+    def readable(self) -> bool:
+        """True for Modbus points that are polled with a read function code."""
+        return self.fc in READ_FUNCTION_CODES and self.address is not None
+
+
+def _order(value: Any, default: str, where: str) -> str:
+    if value is None:
+        return default
+    try:
+        return _ORDERS[str(value).lower()]
+    except KeyError:
+        raise PointMapError(f"{where}: unknown byte/word order {value!r}") from None
+
+
+def _number(
+    value: Any, where: str, field: str, default: Optional[float] = None
+) -> Optional[float]:
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise PointMapError(f"{where}: {field} must be a number, got {value!r}") from None
+
+
+def _point(name: str, raw: Mapping[str, Any], settings: Mapping[str, Any]) -> PointDefinition:
+    where = f"point {name!r}"
+    ptype = str(raw.get("type", raw.get("data_type", "uint16"))).lower()
+    ptype = TYPE_ALIASES.get(ptype, ptype)
+    bitfield = _BITFIELD.match(ptype)
+    if ptype not in TYPE_REGISTERS and not bitfield:
+        raise PointMapError(f"{where}: unsupported type {ptype!r}")
+
+    address = raw.get("address")
+    fc = raw.get("fc", raw.get("function_code", 3 if address is not None else None))
+    if fc is not None:
+        if address is None:
+            raise PointMapError(f"{where}: Modbus point without address")
+        fc, address = int(fc), int(address)
+        if fc not in FUNCTION_CODES:
+            raise PointMapError(f"{where}: unsupported function code {fc}")
+        if not 0 <= address <= 0xFFFF:
+            raise PointMapError(f"{where}: address {address} out of range")
+
+    # Dict-layout maps call the register count ``register_count`` or (historically)
+    # ``byte_count``; both count 16-bit registers.
+    count = raw.get("count", raw.get("register_count", raw.get("byte_count")))
+    if count is not None:
+        count = int(count)
+    elif bitfield:
+        count = max(int(bitfield.group(1) or 16) // 16, 1)  # bitfield32: two registers
+    else:
+        count = TYPE_REGISTERS[ptype]
+    if count < 1:
+        raise PointMapError(f"{where}: invalid count {count}")
+
+    rules = raw.get("quality_rules") or {}
+    # Dict-layout maps name the bit labels ``bit_definitions``.
+    decode = raw.get("decode") or raw.get("bit_definitions") or {}
+    if not isinstance(decode, Mapping):
+        raise PointMapError(f"{where}: decode must map bit numbers to labels")
+    bits = {}
+    for bit, label in decode.items():
+        try:
+            bit = int(bit)
+        except (TypeError, ValueError):
+            raise PointMapError(f"{where}: decode bit {bit!r} is not a number") from None
+        if not 0 <= bit < 16 * count:
+            raise PointMapError(f"{where}: decode bit {bit} outside the point's registers")
+        bits[bit] = str(label)
+    index = raw.get("index")
+    deadband = {
+        field: _number(raw.get(field), where, field)
+        for field in ("deadband", "deadband_pct", "max_silence_s")
+    }
+    if any(value is not None and value < 0 for value in deadband.values()):
+        raise PointMapError(f"{where}: deadband settings must not be negative")
+    poll_class = str(raw.get("poll_class") or "normal").lower().replace("-", "_")
+    if poll_class not in POLL_CLASSES:
+        raise PointMapError(f"{where}: unknown poll_class {poll_class!r}")
+    return PointDefinition(
+        name=name,
+        type=ptype,
+        fc=fc,
+        address=address,
+        count=count,
+        scale=_number(raw.get("scale"), where, "scale", 1.0),  # type: ignore[arg-type]
+        offset=_number(raw.get("offset"), where, "offset", 0.0),  # type: ignore[arg-type]
+        unit=raw.get("unit"),
+        word_order=_order(raw.get("word_order"), settings["word_order"], where),
+        endianness=_order(
+            raw.get("endianness", raw.get("byte_order")), settings["endianness"], where
+        ),
+        min_value=_number(raw.get("min_value", rules.get("min")), where, "min"),
+        max_value=_number(raw.get("max_value", rules.get("max")), where, "max"),
+        read_only=bool(raw.get("read_only", True)),
+        metric=raw.get("metric") or name,
+        parser=raw.get("parser"),
+        index=int(index) if index is not None else None,
+        decode=tuple(sorted(bits.items())),
+        description=raw.get("description"),
+        poll_class=poll_class,
+        **deadband,
+    )
+
+
+def normalize_points(
+    points: Any, modbus_settings: Optional[Mapping[str, Any]] = None
+) -> Tuple[PointDefinition, ...]:
+    """Turn a list-layout or dict-layout ``points`` section into point definitions.
+
+    ``modbus_settings`` supplies map-wide ``byte_order``/``word_order`` defaults, which a
+    point's own ``endianness``/``byte_order``/``word_order`` override.
+    """
+    settings_in = modbus_settings or {}
+    settings = {
+        "endianness": _order(settings_in.get("byte_order"), "big", "modbus_settings"),
+        "word_order": _order(settings_in.get("word_order"), "big", "modbus_settings"),
+    }
+    items: Iterable[Tuple[Optional[str], Any]]
+    if points is None:
+        items = ()
+    elif isinstance(points, Mapping):
+        items = ((str(name), raw) for name, raw in points.items())
+    elif isinstance(points, list):
+        items = ((raw.get("name") if isinstance(raw, Mapping) else None, raw) for raw in points)
+    else:
+        raise PointMapError("points must be a list or a mapping")
+
+    definitions: List[PointDefinition] = []
+    seen: set[str] = set()
+    for position, (name, raw) in enumerate(items):
+        if not isinstance(raw, Mapping):
+            raise PointMapError(f"point #{position} is not a mapping")
+        if not name:
+            raise PointMapError(f"point #{position} has no name")
+        if name in seen:
+            raise PointMapError(f"duplicate point name {name!r}")
+        seen.add(name)
+        definitions.append(_point(name, raw, settings))
+    return tuple(definitions)
+
 
 class PointMap:
-    def __init__(self, path: Path, payload: Dict[str, Any]) -> None:
+    def __init__(
+        self,
+        path: Path,
+        payload: Optional[Dict[str, Any]],
+        points: Optional[Tuple[PointDefinition, ...]] = None,
+        fingerprint: Optional[str] = None,
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+        modbus_settings: Optional[Dict[str, Any]] = None,
+        content_hash: Optional[str] = None,
+    ) -> None:
+        """``payload`` may be ``None`` for a map restored from the compiled cache; the YAML
+        is then only read again if :attr:`payload` is asked for."""
         self.path = path
-        self.payload = payload
-        self.metadata = payload.get("metadata", {})
-        self.points = payload.get("points", [])
-        raw = json.dumps(payload, sort_keys=True).encode()
-        self.hash = hashlib.sha256(raw).hexdigest()
+        if payload is not None:
+            self.payload = payload
+            metadata = payload.get("metadata") or payload.get("device_info")
+            modbus_settings = payload.get("modbus_settings")
+        self.metadata: Dict[str, Any] = metadata or {}
+        self.modbus_settings: Dict[str, Any] = modbus_settings or {}
+        if points is None:
+            try:
+                points = normalize_points(self.payload.get("points"), self.modbus_settings)
+            except PointMapError as e:
+                raise PointMapError(f"{path}: {e}") from None
+        self.points = points
+        self._fingerprint = fingerprint
+        if content_hash is not None:
+            self.hash = content_hash
+
+    @cached_property
+    def payload(self) -> Dict[str, Any]:
+        """The parsed YAML document; re-read from ``path`` for cache-restored maps."""
+        return _parse(self.path)
+
+    @cached_property
+    def hash(self) -> str:
+        """Content hash of the payload, reported with exported register maps."""
+        raw = json.dumps(self.payload, sort_keys=True).encode()
+        return hashlib.sha256(raw).hexdigest()
+
+    @property
+    def cache_key(self) -> str:
+        """Identity for derived caches: the file fingerprint, or the content hash."""
+        return self._fingerprint or self.hash
+
+
+def _parse(path: Path) -> Dict[str, Any]:
+    payload = yaml.load(path.read_bytes(), Loader=_SafeLoader)
+    if not isinstance(payload, dict):
+        raise PointMapError(f"{path}: point map must be a mapping")
+    return payload
+
+
+# Bump when normalisation or the cached layout changes; the field names below also
+# invalidate old entries.
+CACHE_VERSION = 4
+_POINT_FIELDS = tuple(f.name for f in fields(PointDefinition))
+
+
+def cache_dir() -> Optional[Path]:
+    """Where compiled point maps are kept; ``EMS_POINTMAP_CACHE_DIR=""`` disables the cache."""
+    configured = os.environ.get("EMS_POINTMAP_CACHE_DIR")
+    if configured is not None:
+        return Path(configured) if configured else None
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "ems" / "pointmaps"
+
+
+def _cache_file(directory: Path, source: str) -> Path:
+    digest = hashlib.sha1(source.encode()).hexdigest()[:16]
+    return directory / f"{Path(source).stem}-{digest}.json"
+
+
+def _header(source: str, stamp: Tuple[int, int]) -> List[Any]:
+    return [CACHE_VERSION, list(_POINT_FIELDS), source, list(stamp)]
+
+
+def _point_from_row(row: List[Any]) -> PointDefinition:
+    values = dict(zip(_POINT_FIELDS, row))
+    values["decode"] = tuple((int(bit), str(label)) for bit, label in values["decode"])
+    return PointDefinition(**values)
+
+
+def _read_cache(
+    file: Path, path: Path, source: str, stamp: Tuple[int, int]
+) -> Optional[PointMap]:
+    # Plain JSON: a tampered cache file can at worst produce wrong points, never run code.
+    try:
+        entry = json.loads(file.read_bytes())
+        if entry["header"] != _header(source, stamp):
+            return None
+        points = tuple(_point_from_row(row) for row in entry["points"])
+        return PointMap(
+            path,
+            None,
+            points,
+            fingerprint=f"{source}:{stamp[0]}:{stamp[1]}",
+            metadata=entry["metadata"],
+            modbus_settings=entry["modbus_settings"],
+            content_hash=entry["hash"],
+        )
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # corrupt or written by an incompatible version
+        logger.debug(f"Ignoring point map cache {file}: {e}")
+        return None
+
+
+def _write_cache(file: Path, source: str, stamp: Tuple[int, int], point_map: PointMap) -> None:
+    entry = {
+        "header": _header(source, stamp),
+        "metadata": point_map.metadata,
+        "modbus_settings": point_map.modbus_settings,
+        "hash": point_map.hash,
+        "points": [astuple(point) for point in point_map.points],
+    }
+    tmp = file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        data = json.dumps(entry, separators=(",", ":")).encode()
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(data)
+        os.replace(tmp, file)
+    except (OSError, TypeError, ValueError) as e:  # TypeError: YAML dates in metadata
+        logger.debug(f"Could not write point map cache {file}: {e}")
+        tmp.unlink(missing_ok=True)
 
 
 _pointmap_cache: dict[Path, PointMap] = {}
 
 
 def load_point_map(path: str | Path) -> PointMap:
+    """Load and normalise a point map, reusing the on-disk compiled copy when it is current.
+
+    Cache entries are keyed by the file's resolved path, mtime and size, so editing a map
+    recompiles it on the next start.
+    """
     p = Path(path)
     if p in _pointmap_cache:
         return _pointmap_cache[p]
-    payload = yaml.safe_load(p.read_text(encoding="utf-8"))
-    point_map = PointMap(p, payload)
+    source = str(p.resolve())
+    st = p.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    directory = cache_dir()
+    cache_file = _cache_file(directory, source) if directory is not None else None
+    point_map = _read_cache(cache_file, p, source, stamp) if cache_file is not None else None
+    if point_map is None:
+        point_map = PointMap(p, _parse(p), fingerprint=f"{source}:{stamp[0]}:{stamp[1]}")
+        if cache_file is not None:
+            _write_cache(cache_file, source, stamp, point_map)
     _pointmap_cache[p] = point_map
     return point_map
 
 
-__all__ = ["PointMap", "load_point_map"]
+__all__ = [
+    "POLL_CLASSES",
+    "PointDefinition",
+    "PointMap",
+    "PointMapError",
+    "cache_dir",
+    "load_point_map",
+    "normalize_points",
+]
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .pointmap import PointDefinition, PointMap
+
+# Protocol limits for a single read request (Modbus Application Protocol v1.1b3, section 6).
+MAX_READ_REGISTERS = 125
+MAX_READ_BITS = 2000
+BIT_FUNCTION_CODES = frozenset({1, 2})
+
+
+def max_read_count(fc: int, register_limit: int = MAX_READ_REGISTERS) -> int:
+    if fc in BIT_FUNCTION_CODES:
+        return MAX_READ_BITS
+    return min(register_limit, MAX_READ_REGISTERS)
+
+
+@dataclass(frozen=True, slots=True)
+class PointSlice:
+    """Location of one point's registers inside a read block."""
+
+    index: int
+    offset: int
+    count: int
+
+
+@dataclass(frozen=True, slots=True)
+class ReadBlock:
+    fc: int
+    address: int
+    count: int
+    points: Tuple[PointSlice, ...]
+
+    @property
+    def used(self) -> int:
+        covered: set[int] = set()
+        for point in self.points:
+            covered.update(range(point.offset, point.offset + point.count))
+        return len(covered)
+
+    @property
+    def wasted(self) -> int:
+        return self.count - self.used
+
+
+@dataclass(frozen=True, slots=True)
+class ReadPlan:
+    blocks: Tuple[ReadBlock, ...]
+    point_count: int
+    max_gap: int
+    max_registers: int
+    poll_class: Optional[str] = None
+
+    @property
+    def block_count(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def registers_read(self) -> int:
+        return sum(block.count for block in self.blocks)
+
+    @property
+    def registers_wasted(self) -> int:
+        return sum(block.wasted for block in self.blocks)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "points": self.point_count,
+            "blocks": self.block_count,
+            "registers_read": self.registers_read,
+            "registers_wasted": self.registers_wasted,
+            "max_gap": self.max_gap,
+            "max_registers": self.max_registers,
+        }
+
+
+def build_read_plan(
+    points: Sequence[PointDefinition],
+    max_gap: int = 0,
+    max_registers: int = MAX_READ_REGISTERS,
+    poll_class: Optional[str] = None,
+) -> ReadPlan:
+    """Coalesce points into the fewest contiguous reads per function code.
+
+    Points are merged into a block while the hole between them is at most ``max_gap``
+    registers and the block stays within the per-request PDU limit. Overlapping points
+    share registers. Points that are not polled (write-only or non-Modbus) are skipped, as
+    are points outside ``poll_class`` when one is given; block members keep their index into
+    the full ``points`` sequence either way.
+    """
+    if max_gap < 0:
+        raise ValueError("max_gap must be >= 0")
+    by_fc: Dict[int, List[Tuple[int, int, int]]] = {}
+    planned = 0
+    for index, point in enumerate(points):
+        if not point.readable or (poll_class is not None and point.poll_class != poll_class):
+            continue
+        fc, address, count = point.fc, point.address, point.count
+        assert fc is not None and address is not None
+        if count > max_read_count(fc, max_registers):
+            raise ValueError(f"Point {point.name} exceeds the read limit for FC {fc}")
+        by_fc.setdefault(fc, []).append((address, count, index))
+        planned += 1
+
+    blocks: List[ReadBlock] = []
+    for fc in sorted(by_fc):
+        limit = max_read_count(fc, max_registers)
+        spans = sorted(by_fc[fc])
+        members: List[Tuple[int, int, int]] = []
+        start = end = 0
+        for address, count, index in spans:
+            span_end = address + count
+            if members and address - end <= max_gap and max(end, span_end) - start <= limit:
+                members.append((address, count, index))
+                end = max(end, span_end)
+                continue
+            if members:
+                blocks.append(_make_block(fc, start, end, members))
+            members = [(address, count, index)]
+            start, end = address, span_end
+        if members:
+            blocks.append(_make_block(fc, start, end, members))
+    return ReadPlan(
+        blocks=tuple(blocks),
+        point_count=planned,
+        max_gap=max_gap,
+        max_registers=max_registers,
+        poll_class=poll_class,
+    )
+
+
+def _make_block(
+    fc: int, start: int, end: int, members: Iterable[Tuple[int, int, int]]
+) -> ReadBlock:
+    return ReadBlock(
+        fc=fc,
+        address=start,
+        count=end - start,
+        points=tuple(
+            PointSlice(index=index, offset=address - start, count=count)
+            for address, count, index in members
+        ),
+    )
+
+
+_plan_cache: dict[Tuple[str, int, int, Optional[str]], ReadPlan] = {}
+
+
+def plan_for(
+    point_map: PointMap,
+    max_gap: int = 0,
+    max_registers: int = MAX_READ_REGISTERS,
+    poll_class: Optional[str] = None,
+) -> ReadPlan:
+    key = (point_map.cache_key, max_gap, max_registers, poll_class)
+    plan = _plan_cache.get(key)
+    if plan is None:
+        plan = build_read_plan(
+            point_map.points,
+            max_gap=max_gap,
+            max_registers=max_registers,
+            poll_class=poll_class,
+        )
+        _plan_cache[key] = plan
+    return plan
+
+
+__all__ = [
+    "MAX_READ_REGISTERS",
+    "MAX_READ_BITS",
+    "PointSlice",
+    "ReadBlock",
+    "ReadPlan",
+    "build_read_plan",
+    "plan_for",
+]
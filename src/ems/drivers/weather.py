@@ -18,12 +18,12 @@ class WeatherStationDriver(BaseDriver):
     async def read_points(self) -> List[Measurement]:
         measurements: list[Measurement] = []
         for point in self.point_map.points:
-            if point.get("parser") == "csv":
+            if point.parser == "csv":
                 value = random.uniform(0, 1000)
             else:
                 value = random.uniform(0, 1)
             measurements.append(
-                self._measurement(metric=point["name"], value=value, unit=point.get("unit"))
+                self._measurement(metric=point.name, value=value, unit=point.unit)
             )
         return measurements
 
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import time
+from enum import Enum
+from typing import Any, Dict
+
+from .transport import ModbusReadError
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ModbusReadError):
+    """Raised without touching the wire while an endpoint's circuit is open."""
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker.
+
+    ``failure_threshold`` consecutive failures open the circuit; requests then fail fast
+    until ``reset_timeout_s`` has passed. The next request becomes the single half-open
+    probe: success closes the circuit, failure re-opens it with the reset timeout doubled
+    (up to ``max_reset_timeout_s``).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout_s: float = 30.0,
+        max_reset_timeout_s: float = 300.0,
+    ) -> None:
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout_s = reset_timeout_s
+        self.max_reset_timeout_s = max(max_reset_timeout_s, reset_timeout_s)
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._current_reset_s = reset_timeout_s
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> BreakerState:
+        if (
+            self._state is BreakerState.OPEN
+            and time.monotonic() - self._opened_at >= self._current_reset_s
+        ):
+            self._state = BreakerState.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def before_request(self) -> bool:
+        """Admit a request; returns True when the caller carries the half-open probe."""
+        state = self.state
+        if state is BreakerState.CLOSED:
+            return False
+        if state is BreakerState.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        raise CircuitOpenError(f"Circuit {state.value}; retry in {self.retry_in_s:.1f}s")
+
+    def admit(self) -> None:
+        """Re-check a request admitted while closed, just before it goes on the wire.
+
+        Reads queued behind a bus or pool slot were all admitted before the first of them
+        failed; once the circuit has opened they are dropped instead of each timing out.
+        """
+        if self.state is not BreakerState.CLOSED:
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit {self.state.value}; retry in {self.retry_in_s:.1f}s")
+
+    @property
+    def retry_in_s(self) -> float:
+        if self._state is not BreakerState.OPEN:
+            return 0.0
+        return max(self._opened_at + self._current_reset_s - time.monotonic(), 0.0)
+
+    def record_success(self) -> None:
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._probing = False
+        self._current_reset_s = self.reset_timeout_s
+
+    def record_failure(self) -> None:
+        if self._state is BreakerState.HALF_OPEN:
+            self._current_reset_s = min(self._current_reset_s * 2, self.max_reset_timeout_s)
+            self._open()
+            return
+        self._failures += 1
+        if self._state is BreakerState.CLOSED and self._failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self._state = BreakerState.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self.trips += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "retry_in_s": round(self.retry_in_s, 3),
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(
+    endpoint: str, failure_threshold: int = 3, reset_timeout_s: float = 30.0
+) -> CircuitBreaker:
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        breaker = CircuitBreaker(failure_threshold, reset_timeout_s)
+        _breakers[endpoint] = breaker
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    return {endpoint: breaker.stats() for endpoint, breaker in _breakers.items()}
+
+
+__all__ = [
+    "BreakerState",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "breaker_stats",
+    "get_breaker",
+]
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from .latency import RTTEstimator
+from .transport import ModbusReadError, pymodbus_read
+
+logger = logging.getLogger(__name__)
+
+
+def character_time_s(
+    baudrate: int, bytesize: int = 8, parity: str = "N", stopbits: int = 1
+) -> float:
+    """Duration of one character on the line: start bit + data + parity + stop bits."""
+    bits = 1 + bytesize + (0 if parity.upper() == "N" else 1) + stopbits
+    return bits / float(baudrate)
+
+
+def frame_gap_s(baudrate: int, bytesize: int = 8, parity: str = "N", stopbits: int = 1) -> float:
+    """Minimum silent interval between RTU frames (t3.5).
+
+    The Modbus serial line spec fixes t3.5 at 1.75 ms above 19200 baud.
+    """
+    if baudrate > 19200:
+        return 0.00175
+    return 3.5 * character_time_s(baudrate, bytesize, parity, stopbits)
+
+
+@dataclass(frozen=True)
+class SerialSettings:
+    port: str
+    baudrate: int = 9600
+    bytesize: int = 8
+    parity: str = "N"
+    stopbits: int = 1
+
+    @property
+    def frame_gap_s(self) -> float:
+        return frame_gap_s(self.baudrate, self.bytesize, self.parity, self.stopbits)
+
+
+@dataclass
+class _BusRequest:
+    unit_id: int
+    fc: int
+    address: int
+    count: int
+    future: asyncio.Future[list[int]]
+    rtt: Optional[RTTEstimator] = None
+    admit: Optional[Callable[[], None]] = None
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class SerialBus:
+    """Owns one serial connection and serialises requests from every unit on the line.
+
+    Requests are executed strictly in arrival order by a single worker, which also keeps
+    the line silent for at least t3.5 between frames. With ``native`` set the line is driven
+    by the raw RTU transport, which detects end-of-frame itself instead of waiting out
+    pymodbus' fixed timeouts.
+    """
+
+    def __init__(
+        self, settings: SerialSettings, timeout_s: float = 1.0, native: bool = False
+    ) -> None:
+        self.settings = settings
+        self.timeout_s = timeout_s
+        self.native = native
+        self.units: set[int] = set()
+        self._client: Optional[Any] = None
+        self._connect_lock: asyncio.Lock | None = None
+        self._queue: asyncio.Queue[_BusRequest] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._last_frame_end = 0.0
+        self._started = time.monotonic()
+        self._busy_s = 0.0
+        self._wait_s = 0.0
+        self._frames = 0
+        self._errors = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None and bool(getattr(self._client, "connected", True))
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Queues, locks and the worker are bound to the loop that first used them.
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._connect_lock = asyncio.Lock()
+        self._worker = None
+        self._client = None
+
+    async def connect(self) -> None:
+        self._bind_loop()
+        assert self._connect_lock is not None
+        async with self._connect_lock:
+            if self.connected:
+                return
+            s = self.settings
+            if self.native:
+                from .rtu import RTUConnection
+
+                rtu = RTUConnection(s, timeout_s=self.timeout_s)
+                await rtu.connect()
+                self._client = rtu
+                logger.info(f"Opened raw RTU line: {s.port} ({s.baudrate} baud)")
+                return
+            from pymodbus.client import AsyncModbusSerialClient
+
+            client = AsyncModbusSerialClient(
+                port=s.port,
+                baudrate=s.baudrate,
+                bytesize=s.bytesize,
+                parity=s.parity,
+                stopbits=s.stopbits,
+                timeout=self.timeout_s,
+            )
+            await client.connect()
+            self._client = client
+            logger.info(f"Connected to serial bus: {s.port} ({s.baudrate} baud)")
+
+    async def read(
+        self,
+        unit_id: int,
+        fc: int,
+        address: int,
+        count: int,
+        rtt: Optional[RTTEstimator] = None,
+        admit: Optional[Callable[[], None]] = None,
+    ) -> list[int]:
+        """Queue a read; ``rtt`` supplies the per-unit timeout and receives the sample.
+
+        ``admit`` runs when the request reaches the head of the queue; if it raises, the
+        request fails with that error without touching the line.
+        """
+        self._bind_loop()
+        assert self._queue is not None and self._loop is not None
+        future: asyncio.Future[list[int]] = self._loop.create_future()
+        self._queue.put_nowait(_BusRequest(unit_id, fc, address, count, future, rtt, admit))
+        if self._worker is None or self._worker.done():
+            self._worker = self._loop.create_task(
+                self._run(), name=f"serial-bus-{self.settings.port}"
+            )
+        return await future
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            request = await self._queue.get()
+            if request.future.done():
+                continue
+            if request.admit is not None:
+                try:
+                    request.admit()
+                except Exception as exc:  # noqa: BLE001
+                    request.future.set_exception(exc)
+                    continue
+            idle = self._last_frame_end + self.settings.frame_gap_s - time.monotonic()
+            if idle > 0:
+                await asyncio.sleep(idle)
+            started = time.monotonic()
+            self._wait_s += started - request.enqueued
+            try:
+                if not self.connected:
+                    await self.connect()
+                assert self._client is not None
+                sent = time.monotonic()
+                timeout_s = self.timeout_s
+                if request.rtt is not None:
+                    timeout_s = min(request.rtt.timeout_s, timeout_s)
+                if self.native:
+                    result = await self._client.read(
+                        request.unit_id,
+                        request.fc,
+                        request.address,
+                        request.count,
+                        timeout_s=timeout_s,
+                    )
+                else:
+                    # A reply arriving after this timeout is discarded by _reset_client().
+                    result = await asyncio.wait_for(
+                        pymodbus_read(
+                            self._client,
+                            request.unit_id,
+                            request.fc,
+                            request.address,
+                            request.count,
+                        ),
+                        timeout=timeout_s,
+                    )
+                if request.rtt is not None:
+                    request.rtt.observe(time.monotonic() - sent)
+            except asyncio.CancelledError:
+                if not request.future.done():
+                    request.future.cancel()
+                raise
+            except Exception as exc:  # noqa: BLE001
+                self._errors += 1
+                if isinstance(exc, TimeoutError) and request.rtt is not None:
+                    request.rtt.on_timeout()
+                if not self.native and not isinstance(exc, ModbusReadError):
+                    self._reset_client()
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            else:
+                if not request.future.done():
+                    request.future.set_result(result)
+            finally:
+                self._last_frame_end = time.monotonic()
+                self._busy_s += self._last_frame_end - started
+                self._frames += 1
+
+    def _reset_client(self) -> None:
+        """Drop a pymodbus client whose transaction was abandoned.
+
+        A reply arriving after the timeout would otherwise be read as the answer to the next
+        request, possibly for another unit; reopening the port discards it.
+        """
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        logger.debug(f"Reopening serial bus {self.settings.port} after a failed transaction")
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        stats = {
+            "port": self.settings.port,
+            "transport": "native" if self.native else "pymodbus",
+            "units": len(self.units),
+            "frames": self._frames,
+            "errors": self._errors,
+            "frames_per_s": self._frames / elapsed,
+            "crc_errors": 0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "utilization": min(self._busy_s / elapsed, 1.0),
+            "avg_queue_wait_s": self._wait_s / self._frames if self._frames else 0.0,
+        }
+        if self.native and self._client is not None:
+            stats["crc_errors"] = self._client.crc_errors
+        return stats
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            # A worker left behind by an earlier (closed) loop cannot be awaited here.
+            if self._loop is asyncio.get_running_loop():
+                self._worker.cancel()
+                await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            logger.info(f"Serial bus closed: {self.settings.port}")
+
+
+_buses: dict[str, SerialBus] = {}
+
+
+def get_serial_bus(
+    settings: SerialSettings, unit_id: int, timeout_s: float = 1.0, native: bool = False
+) -> SerialBus:
+    """Return the process-wide bus for ``settings.port``, registering ``unit_id`` on it."""
+    bus = _buses.get(settings.port)
+    if bus is None:
+        bus = SerialBus(settings, timeout_s=timeout_s, native=native)
+        _buses[settings.port] = bus
+    elif bus.settings != settings:
+        raise ValueError(
+            f"Serial port {settings.port} already configured as {bus.settings}, got {settings}"
+        )
+    elif bus.native != native:
+        raise ValueError(f"Serial port {settings.port} mixes native and pymodbus transports")
+    bus.timeout_s = max(bus.timeout_s, timeout_s)
+    bus.units.add(unit_id)
+    return bus
+
+
+def serial_bus_stats() -> list[Dict[str, Any]]:
+    return [bus.stats() for bus in _buses.values()]
+
+
+async def close_serial_buses() -> None:
+    for bus in list(_buses.values()):
+        await bus.close()
+    _buses.clear()
+
+
+__all__ = [
+    "SerialBus",
+    "SerialSettings",
+    "character_time_s",
+    "close_serial_buses",
+    "frame_gap_s",
+    "get_serial_bus",
+    "serial_bus_stats",
+]
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+
+def _build_table() -> tuple[int, ...]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+CRC16_TABLE = _build_table()
+
+
+def crc16(data: bytes | bytearray | memoryview, crc: int = 0xFFFF) -> int:
+    """Modbus RTU CRC-16 (poly 0xA001, init 0xFFFF); pass ``crc`` to continue a running sum."""
+    table = CRC16_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def append_crc(frame: bytes) -> bytes:
+    """Return ``frame`` followed by its CRC, low byte first as sent on the wire."""
+    return frame + crc16(frame).to_bytes(2, "little")
+
+
+__all__ = ["CRC16_TABLE", "append_crc", "crc16"]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+# RFC 6298 gains and variance multiplier.
+ALPHA = 1 / 8
+BETA = 1 / 4
+K = 4
+MIN_TIMEOUT_S = 0.2
+
+
+class RTTEstimator:
+    """Smoothed round-trip time and derived request timeout for one Modbus endpoint.
+
+    The timeout is ``srtt + 4 * rttvar`` (Jacobson/Karels), doubled after each timeout,
+    and always kept between ``min_timeout_s`` and the configured ``max_timeout_s``. Until
+    the first response arrives the configured timeout is used unchanged.
+    """
+
+    def __init__(self, max_timeout_s: float, min_timeout_s: float = MIN_TIMEOUT_S) -> None:
+        self.max_timeout_s = max_timeout_s
+        self.min_timeout_s = min(min_timeout_s, max_timeout_s)
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self.last_rtt: float | None = None
+        self.samples = 0
+        self.timeouts = 0
+        self._backoff = 1.0
+
+    @property
+    def timeout_s(self) -> float:
+        if self.srtt is None:
+            return self.max_timeout_s
+        rto = max(self.srtt + K * self.rttvar, self.min_timeout_s) * self._backoff
+        return min(rto, self.max_timeout_s)
+
+    def observe(self, rtt: float) -> None:
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - BETA) * self.rttvar + BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - ALPHA) * self.srtt + ALPHA * rtt
+        self.last_rtt = rtt
+        self.samples += 1
+        self._backoff = 1.0
+
+    def on_timeout(self) -> None:
+        self.timeouts += 1
+        if self.srtt is not None:
+            self._backoff = min(self._backoff * 2, self.max_timeout_s / self.min_timeout_s)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "srtt_s": self.srtt,
+            "rttvar_s": self.rttvar,
+            "last_rtt_s": self.last_rtt,
+            "timeout_s": self.timeout_s,
+            "max_timeout_s": self.max_timeout_s,
+            "samples": self.samples,
+            "timeouts": self.timeouts,
+        }
+
+
+_estimators: dict[str, RTTEstimator] = {}
+
+
+def get_estimator(endpoint: str, max_timeout_s: float) -> RTTEstimator:
+    estimator = _estimators.get(endpoint)
+    if estimator is None:
+        estimator = RTTEstimator(max_timeout_s)
+        _estimators[endpoint] = estimator
+    return estimator
+
+
+def rtt_stats() -> Dict[str, Dict[str, Any]]:
+    return {endpoint: estimator.stats() for endpoint, estimator in _estimators.items()}
+
+
+__all__ = ["RTTEstimator", "get_estimator", "rtt_stats"]
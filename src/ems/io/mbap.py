@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+from typing import Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Transaction id, protocol id (always 0), length of the remaining bytes, unit id.
+MBAP_HEADER = struct.Struct(">HHHB")
+READ_REQUEST = struct.Struct(">HHHBBHH")
+READ_FUNCTION_CODES = frozenset({1, 2, 3, 4})
+MAX_ADU_SIZE = 260
+RECV_BUFFER_SIZE = 16 * MAX_ADU_SIZE
+
+# Big-endian register unpackers for every legal read size, built once.
+REGISTER_STRUCTS = [struct.Struct(f">{n}H") for n in range(126)]
+
+
+class ModbusExceptionResponse(Exception):
+    def __init__(self, fc: int, code: int) -> None:
+        super().__init__(f"Modbus exception response FC:{fc} code:{code}")
+        self.fc = fc
+        self.code = code
+
+
+def encode_read_request(tid: int, unit_id: int, fc: int, address: int, count: int) -> bytes:
+    if fc not in READ_FUNCTION_CODES:
+        raise ValueError(f"Unsupported function code: {fc}")
+    return READ_REQUEST.pack(tid, 0, 6, unit_id, fc, address, count)
+
+
+def encode_read_response(fc: int, values: list[int]) -> bytes:
+    """Encode a read response PDU (function code onwards) for registers or bits."""
+    if fc in (1, 2):
+        packed = bytearray((len(values) + 7) // 8)
+        for i, bit in enumerate(values):
+            if bit:
+                packed[i >> 3] |= 1 << (i & 7)
+        return bytes((fc, len(packed))) + bytes(packed)
+    return bytes((fc, 2 * len(values))) + REGISTER_STRUCTS[len(values)].pack(*values)
+
+
+def encode_exception_response(fc: int, code: int) -> bytes:
+    return bytes((fc | 0x80, code))
+
+
+def decode_read_response_from(
+    fc: int, count: int, buffer: Buffer, offset: int, length: int
+) -> list[int]:
+    """Decode a read response PDU of ``length`` bytes found at ``buffer[offset:]``."""
+    function = buffer[offset]
+    if function == fc | 0x80:
+        raise ModbusExceptionResponse(fc, buffer[offset + 1])
+    if function != fc:
+        raise ValueError(f"Unexpected function code {function} in response to FC:{fc}")
+    byte_count = buffer[offset + 1]
+    if length - 2 < byte_count:
+        raise ValueError("Truncated Modbus response")
+    start = offset + 2
+    if fc in (1, 2):
+        data = bytes(buffer[start : start + byte_count])
+        return [(data[i >> 3] >> (i & 7)) & 1 for i in range(count)]
+    if byte_count != 2 * count:
+        raise ValueError(f"Expected {2 * count} bytes, got {byte_count}")
+    return list(REGISTER_STRUCTS[count].unpack_from(buffer, start))
+
+
+def decode_read_response(fc: int, count: int, pdu: bytes) -> list[int]:
+    """Decode a read response PDU (function code onwards) into registers or bits."""
+    return decode_read_response_from(fc, count, pdu, 0, len(pdu))
+
+
+class _MBAPProtocol(asyncio.BufferedProtocol):
+    """Receives straight into one preallocated buffer and decodes frames in place."""
+
+    def __init__(self, connection: MBAPConnection) -> None:
+        self._connection = connection
+        self._buffer = bytearray(RECV_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._end = 0
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._view[self._end :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        buffer = self._buffer
+        end = self._end + nbytes
+        pos = 0
+        while end - pos >= MBAP_HEADER.size:
+            tid, _, length, _ = MBAP_HEADER.unpack_from(buffer, pos)
+            if not 2 <= length <= MAX_ADU_SIZE - 6:
+                self._connection._lost(ValueError(f"Invalid MBAP length {length}"))
+                return
+            frame_end = pos + 6 + length
+            if frame_end > end:
+                break
+            self._connection._resolve(tid, buffer, pos + MBAP_HEADER.size, length - 1)
+            pos = frame_end
+        if pos:
+            # Keep a partial frame at the front; equal-size moves leave the view valid.
+            remaining = end - pos
+            buffer[:remaining] = buffer[pos:end]
+            end = remaining
+        self._end = end
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._connection._lost(exc)
+
+
+class MBAPConnection:
+    """Native Modbus TCP socket that keeps several transactions in flight.
+
+    Requests are written as soon as they are issued; responses are matched back to their
+    callers by MBAP transaction id, so replies may arrive in any order. Frames are packed and
+    unpacked with precompiled structs, bypassing pymodbus' framer and PDU objects.
+    """
+
+    def __init__(self, host: str, port: int, timeout_s: float = 3.0) -> None:
+        self.host = host
+        self.port = port
+        self.timeout_s = timeout_s
+        self._transport: Optional[asyncio.Transport] = None
+        self._pending: Dict[int, Tuple[asyncio.Future[list[int]], int, int]] = {}
+        self._next_tid = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._transport is not None and not self._transport.is_closing()
+
+    async def connect(self) -> bool:
+        loop = asyncio.get_running_loop()
+        transport, _ = await asyncio.wait_for(
+            loop.create_connection(lambda: _MBAPProtocol(self), self.host, self.port),
+            timeout=self.timeout_s,
+        )
+        self._transport = transport
+        return True
+
+    def _allocate_tid(self) -> int:
+        for _ in range(0x10000):
+            self._next_tid = (self._next_tid + 1) & 0xFFFF
+            if self._next_tid not in self._pending:
+                return self._next_tid
+        raise RuntimeError("No free Modbus transaction id")
+
+    async def read(
+        self, unit_id: int, fc: int, address: int, count: int, timeout_s: float | None = None
+    ) -> list[int]:
+        if fc not in READ_FUNCTION_CODES:
+            raise ValueError(f"Unsupported function code: {fc}")
+        transport = self._transport
+        if transport is None or transport.is_closing():
+            raise ConnectionError(f"Not connected to {self.host}:{self.port}")
+        tid = self._allocate_tid()
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[int]] = loop.create_future()
+        self._pending[tid] = (future, fc, count)
+        # A timer handle is far cheaper per request than wrapping the wait in wait_for().
+        timer = loop.call_later(timeout_s or self.timeout_s, self._expire, tid)
+        try:
+            transport.write(READ_REQUEST.pack(tid, 0, 6, unit_id, fc, address, count))
+            return await future
+        finally:
+            timer.cancel()
+            self._pending.pop(tid, None)
+
+    def _expire(self, tid: int) -> None:
+        pending = self._pending.pop(tid, None)
+        if pending is not None and not pending[0].done():
+            pending[0].set_exception(TimeoutError(f"No response from {self.host} tid={tid}"))
+
+    def _resolve(self, tid: int, buffer: Buffer, offset: int, length: int) -> None:
+        pending = self._pending.pop(tid, None)
+        if pending is None:
+            logger.debug(f"Dropping late Modbus TCP response tid={tid} from {self.host}")
+            return
+        future, fc, count = pending
+        if future.done():
+            return
+        try:
+            future.set_result(decode_read_response_from(fc, count, buffer, offset, length))
+        except (ModbusExceptionResponse, ValueError, IndexError, struct.error) as e:
+            future.set_exception(e)
+
+    def _lost(self, exc: Exception | None) -> None:
+        if self._transport is not None:
+            self._transport.abort()
+        self._transport = None
+        error = exc or ConnectionError(f"Connection to {self.host}:{self.port} closed")
+        for future, _, _ in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+
+__all__ = [
+    "MBAPConnection",
+    "ModbusExceptionResponse",
+    "decode_read_response",
+    "decode_read_response_from",
+    "encode_exception_response",
+    "encode_read_request",
+    "encode_read_response",
+]
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 import random
-from typing import Protocol, Dict, Any, Optional
+import time
+from collections.abc import Awaitable, Callable
+from typing import Protocol, Dict, Any
 import struct
 
+from .breaker import CircuitBreaker, CircuitOpenError, get_breaker
+from .bus import SerialSettings, get_serial_bus
+from .latency import get_estimator
+from .mbap import ModbusExceptionResponse
+from .pool import PooledConnection, get_tcp_pool
+from .transport import ModbusReadError
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +31,67 @@ class SimulatedModbusClient(ModbusClientProtocol):
         pass
 
 
+def _option(connection: Any, name: str, default: Any = None) -> Any:
+    """Read an optional setting from a connection dict or ProtocolConnectionConfig"""
+    if isinstance(connection, dict):
+        value = connection.get(name)
+    else:
+        value = getattr(connection, name, None)
+    return default if value is None else value
+
+
+def _breaker_for(endpoint: str, connection: Any) -> CircuitBreaker:
+    return get_breaker(
+        endpoint,
+        failure_threshold=int(_option(connection, "breaker_failure_threshold", 3)),
+        reset_timeout_s=float(_option(connection, "breaker_reset_s", 30.0)),
+    )
+
+
+async def _guarded_read(
+    breaker: CircuitBreaker,
+    transact: Callable[[int, int, int, Callable[[], None]], Awaitable[list[int]]],
+    fc: int,
+    address: int,
+    count: int,
+    endpoint: str,
+) -> list[int]:
+    """Run a read through the endpoint's circuit breaker.
+
+    While the circuit is open this raises CircuitOpenError without touching the wire. The
+    half-open probe reads a single register first, so a still-dead device costs one short
+    frame instead of a full block timeout. Exception replies (illegal address and the like)
+    prove the device is alive: they only fail this block and count as a success.
+
+    ``transact`` calls its ``admit`` argument once the request actually starts, so reads
+    queued before the circuit opened fail fast too.
+    """
+    probe = breaker.before_request()
+    # The half-open probe was admitted as the single request allowed through.
+    admit = (lambda: None) if probe else breaker.admit
+    try:
+        if probe and count > 1:
+            await transact(fc, address, 1, admit)
+            breaker.record_success()
+        registers = await transact(fc, address, count, admit)
+    except CircuitOpenError:
+        raise
+    except (ModbusExceptionResponse, ModbusReadError) as e:
+        breaker.record_success()
+        logger.warning(
+            f"Modbus exception reply from {endpoint} (FC:{fc}, Addr:{address}, Count:{count}): {e}"
+        )
+        raise ModbusReadError(f"Exception reply from {endpoint}: {e}") from e
+    except Exception as e:
+        breaker.record_failure()
+        logger.error(
+            f"Modbus read failed on {endpoint} (FC:{fc}, Addr:{address}, Count:{count}): {e!r}"
+        )
+        raise ModbusReadError(f"Read failed on {endpoint}: {e!r}") from e
+    breaker.record_success()
+    return registers
+
+
 class ModbusRTUClient(ModbusClientProtocol):
     """Real Modbus RTU client for RS485 communication"""
     
@@ -44,92 +113,51 @@ class ModbusRTUClient(ModbusClientProtocol):
             self.stopbits = connection.get("stopbits", 1)
             self.timeout_ms = connection.get("timeout_ms", 1000)
             self.unit_id = connection.get("unit_id", 1)
-        self._client: Optional[Any] = None
-        self._connected = False
-        
+        self._bus = get_serial_bus(
+            SerialSettings(
+                port=self.serial_port,
+                baudrate=int(self.baudrate),
+                bytesize=int(self.bytesize),
+                parity=str(self.parity),
+                stopbits=int(self.stopbits),
+            ),
+            unit_id=int(self.unit_id),
+            timeout_s=self.timeout_ms / 1000.0,
+            native=_option(connection, "modbus_transport", "pymodbus") == "native",
+        )
+        self.endpoint = f"{self.serial_port}/{self.unit_id}"
+        self._rtt = get_estimator(self.endpoint, self.timeout_ms / 1000.0)
+        self.breaker = _breaker_for(self.endpoint, connection)
+
     async def _ensure_connected(self) -> None:
-        """Ensure modbus client is connected"""
-        if self._connected and self._client:
+        """Ensure the shared serial bus for this port is connected"""
+        if self._bus.connected:
             return
-            
+
         try:
-            # Import pymodbus here to avoid import errors if not available
-            from pymodbus.client import AsyncModbusSerialClient
-            from pymodbus.exceptions import ModbusException
-            
-            self._client = AsyncModbusSerialClient(
-                port=self.serial_port,
-                baudrate=self.baudrate,
-                bytesize=self.bytesize,
-                parity=self.parity,
-                stopbits=self.stopbits,
-                timeout=self.timeout_ms / 1000.0,  # Convert to seconds
-            )
-            
-            await self._client.connect()
-            self._connected = True
-            logger.info(f"Connected to Modbus RTU device: {self.serial_port}")
-            
+            await self._bus.connect()
         except ImportError:
-            logger.error("pymodbus not available, falling back to simulation")
+            logger.error("pymodbus not available")
             raise
         except Exception as e:
             logger.error(f"Failed to connect to {self.serial_port}: {e}")
             raise
-    
-    async def read(self, fc: int, address: int, count: int) -> list[int]:
-        """Read registers from Modbus RTU device"""
+
+    async def _transact(
+        self, fc: int, address: int, count: int, admit: Callable[[], None]
+    ) -> list[int]:
         await self._ensure_connected()
-        
-        if not self._client or not self._connected:
-            raise Exception("Modbus client not connected")
-        
-        try:
-            if fc == 3:  # Holding registers
-                result = await self._client.read_holding_registers(
-                    address=address, 
-                    count=count, 
-                    slave=self.unit_id  # Use 'slave' instead of 'unit' for pymodbus compatibility
-                )
-            elif fc == 4:  # Input registers
-                result = await self._client.read_input_registers(
-                    address=address, 
-                    count=count, 
-                    slave=self.unit_id
-                )
-            elif fc == 1:  # Coils
-                result = await self._client.read_coils(
-                    address=address, 
-                    count=count, 
-                    slave=self.unit_id
-                )
-            elif fc == 2:  # Discrete inputs
-                result = await self._client.read_discrete_inputs(
-                    address=address, 
-                    count=count, 
-                    slave=self.unit_id
-                )
-            else:
-                raise ValueError(f"Unsupported function code: {fc}")
-            
-            if result.isError():
-                raise Exception(f"Modbus read error: {result}")
-            
-            return result.registers if hasattr(result, 'registers') else result.bits
-            
-        except Exception as e:
-            logger.error(f"Modbus read failed (FC:{fc}, Addr:{address}, Count:{count}): {e}")
-            # Fallback to simulation for development
-            logger.warning("Falling back to simulated data")
-            random.seed(address + count + fc)
-            return [random.randint(0, 65535) for _ in range(count)]
-    
+        return await self._bus.read(self.unit_id, fc, address, count, rtt=self._rtt, admit=admit)
+
+    async def read(self, fc: int, address: int, count: int) -> list[int]:
+        """Read registers from Modbus RTU device through the shared bus"""
+        return await _guarded_read(self.breaker, self._transact, fc, address, count, self.endpoint)
+
     async def close(self) -> None:
-        """Close modbus connection"""
-        if self._client and self._connected:
-            self._client.close()
-            self._connected = False
-            logger.info("Modbus RTU connection closed")
+        """Release this unit; the bus connection is closed when the last unit leaves"""
+        self._bus.units.discard(int(self.unit_id))
+        if not self._bus.units:
+            await self._bus.close()
 
 
 class ModbusTCPClient(ModbusClientProtocol):
@@ -147,78 +175,63 @@ class ModbusTCPClient(ModbusClientProtocol):
             self.port = connection.get("port", 502)
             self.timeout_ms = connection.get("timeout_ms", 3000)
             self.unit_id = connection.get("unit_id", 1)
-        self._client: Optional[Any] = None
-        self._connected = False
-        
-    async def _ensure_connected(self) -> None:
-        """Ensure modbus client is connected"""
-        if self._connected and self._client:
-            return
-            
+        self._pool = get_tcp_pool(
+            self.host,
+            int(self.port),
+            max_connections=_option(connection, "max_connections_per_gateway"),
+            timeout_s=self.timeout_ms / 1000.0,
+            pipeline_depth=_option(connection, "pipeline_depth"),
+            native=_option(connection, "modbus_transport", "pymodbus") == "native",
+        )
+        self.endpoint = f"{self.host}:{self.port}/{self.unit_id}"
+        self._rtt = get_estimator(self.endpoint, self.timeout_ms / 1000.0)
+        self.breaker = _breaker_for(self.endpoint, connection)
+        self._closed = False
+
+    async def _acquire(self) -> PooledConnection:
+        """Lease a pooled connection to the gateway"""
         try:
-            from pymodbus.client import AsyncModbusTcpClient
-            
-            self._client = AsyncModbusTcpClient(
-                host=self.host,
-                port=self.port,
-                timeout=self.timeout_ms / 1000.0,
-            )
-            
-            await self._client.connect()
-            self._connected = True
-            logger.info(f"Connected to Modbus TCP device: {self.host}:{self.port}")
-            
+            return await self._pool.acquire()
         except ImportError:
-            logger.error("pymodbus not available, falling back to simulation")
+            logger.error("pymodbus not available")
             raise
         except Exception as e:
             logger.error(f"Failed to connect to {self.host}:{self.port}: {e}")
             raise
-    
+
+    async def _transact(
+        self, fc: int, address: int, count: int, admit: Callable[[], None]
+    ) -> list[int]:
+        conn = await self._acquire()
+        discard = False
+        started = time.monotonic()
+        try:
+            admit()
+            registers = await conn.read(
+                self.unit_id, fc, address, count, timeout_s=self._rtt.timeout_s
+            )
+        except TimeoutError:
+            self._rtt.on_timeout()
+            # A late reply would be taken as the answer to the next pymodbus request.
+            discard = not conn.pipelined
+            raise
+        finally:
+            await self._pool.release(conn, discard=discard)
+        self._rtt.observe(time.monotonic() - started)
+        return registers
+
     async def read(self, fc: int, address: int, count: int) -> list[int]:
         """Read registers from Modbus TCP device"""
-        await self._ensure_connected()
-        
-        if not self._client or not self._connected:
-            raise Exception("Modbus client not connected")
-        
-        try:
-            if fc == 3:
-                result = await self._client.read_holding_registers(
-                    address=address, count=count, slave=self.unit_id
-                )
-            elif fc == 4:
-                result = await self._client.read_input_registers(
-                    address=address, count=count, slave=self.unit_id
-                )
-            elif fc == 1:
-                result = await self._client.read_coils(
-                    address=address, count=count, slave=self.unit_id
-                )
-            elif fc == 2:
-                result = await self._client.read_discrete_inputs(
-                    address=address, count=count, slave=self.unit_id
-                )
-            else:
-                raise ValueError(f"Unsupported function code: {fc}")
-            
-            if result.isError():
-                raise Exception(f"Modbus read error: {result}")
-            
-            return result.registers if hasattr(result, 'registers') else result.bits
-            
-        except Exception as e:
-            logger.error(f"Modbus TCP read failed (FC:{fc}, Addr:{address}, Count:{count}): {e}")
-            # Fallback to simulation for development
-            logger.warning("Falling back to simulated data")
-            random.seed(address + count + fc)
-            return [random.randint(0, 65535) for _ in range(count)]
-    
+        return await _guarded_read(self.breaker, self._transact, fc, address, count, self.endpoint)
+
     async def close(self) -> None:
-        """Close modbus connection"""
-        if self._client and self._connected:
-            self._client.close()
-            self._connected = False
+        """Release this device; the gateway sockets close when the last device leaves"""
+        if self._closed:
+            return
+        self._closed = True
+        self._pool.users -= 1
+        if self._pool.users <= 0:
+            await self._pool.close()
             logger.info("Modbus TCP connection closed")
 
 
@@ -243,6 +256,8 @@ def create_client(protocol: str, connection: dict[str, object]) -> ModbusClientP
 
 
 __all__ = [
+    "CircuitOpenError",
+    "ModbusReadError",
     "ModbusClientProtocol", 
     "create_client", 
     "SimulatedModbusClient",
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .mbap import MBAPConnection, ModbusExceptionResponse
+from .transport import ModbusReadError, pymodbus_read
+
+logger = logging.getLogger(__name__)
+
+# Gateways and NAT tables drop idle TCP sessions after minutes; device polls default to 60 s.
+IDLE_CHECK_S = 300.0
+
+
+@dataclass(eq=False)
+class PooledConnection:
+    client: Any
+    in_flight: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    capacity: int = 1
+    # (unit_id, fc, address) of the last successful read, replayed as the idle probe.
+    probe: Optional[tuple[int, int, int]] = None
+    # Held while one caller probes or reconnects; others sharing the socket wait for it.
+    checking: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def connected(self) -> bool:
+        return bool(getattr(self.client, "connected", False))
+
+    @property
+    def pipelined(self) -> bool:
+        return isinstance(self.client, MBAPConnection)
+
+    async def read(
+        self, unit_id: int, fc: int, address: int, count: int, timeout_s: float
+    ) -> list[int]:
+        result: list[int]
+        if self.pipelined:
+            result = await self.client.read(unit_id, fc, address, count, timeout_s=timeout_s)
+        else:
+            result = await asyncio.wait_for(
+                pymodbus_read(self.client, unit_id, fc, address, count), timeout=timeout_s
+            )
+        self.probe = (unit_id, fc, address)
+        return result
+
+
+class GatewayPool:
+    """Sockets to one Modbus TCP gateway shared by every unit ID behind it.
+
+    Connections use pymodbus clients, or the native MBAP codec when ``native`` is set or
+    pipelining is enabled. Each connection carries one transaction at a time, or up to
+    ``pipeline_depth`` when the gateway accepts pipelined requests (matched by transaction id).
+    Connections are opened on demand up to ``max_connections``; further requests wait for a
+    free slot. A connection that sat idle longer than ``idle_check_s`` (well above usual poll
+    intervals, so steady polling never pays for it) is probed with a one-register read before
+    reuse and reconnected if the probe gets no reply.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_connections: int = 2,
+        timeout_s: float = 3.0,
+        idle_check_s: float = IDLE_CHECK_S,
+        pipeline_depth: int = 1,
+        native: bool = False,
+    ) -> None:
+        if max_connections < 1:
+            raise ValueError("max_connections must be >= 1")
+        if pipeline_depth < 1:
+            raise ValueError("pipeline_depth must be >= 1")
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.timeout_s = timeout_s
+        self.idle_check_s = idle_check_s
+        self.pipeline_depth = pipeline_depth
+        self.native = native
+        self.users = 0
+        self._connections: List[PooledConnection] = []
+        self._opening = 0
+        self._cond: asyncio.Condition | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._waits = 0
+        self._reconnects = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def _bind_loop(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._cond is None:
+            # Sockets and the condition belong to the loop that created them.
+            self._loop = loop
+            self._cond = asyncio.Condition()
+            self._connections = []
+            self._opening = 0
+        return self._cond
+
+    def _new_client(self) -> Any:
+        if self.native or self.pipeline_depth > 1:
+            return MBAPConnection(self.host, self.port, timeout_s=self.timeout_s)
+        from pymodbus.client import AsyncModbusTcpClient
+
+        return AsyncModbusTcpClient(host=self.host, port=self.port, timeout=self.timeout_s)
+
+    async def _connect(self, client: Any) -> None:
+        await client.connect()
+        if not getattr(client, "connected", False):
+            raise ConnectionError(f"Unable to connect to {self.name}")
+
+    async def acquire(self) -> PooledConnection:
+        cond = self._bind_loop()
+        conn: Optional[PooledConnection]
+        async with cond:
+            while True:
+                free = [c for c in self._connections if c.in_flight < c.capacity]
+                if free:
+                    conn = min(free, key=lambda c: (c.in_flight, c.last_used))
+                    conn.in_flight += 1
+                    break
+                if len(self._connections) + self._opening < self.max_connections:
+                    self._opening += 1
+                    conn = None
+                    break
+                self._waits += 1
+                await cond.wait()
+
+        if conn is None:
+            client = self._new_client()
+            try:
+                await self._connect(client)
+            except BaseException:
+                async with cond:
+                    self._opening -= 1
+                    cond.notify()
+                raise
+            conn = PooledConnection(client=client, in_flight=1, capacity=self.pipeline_depth)
+            async with cond:
+                self._opening -= 1
+                self._connections.append(conn)
+                # Pipelined sockets have spare slots for requests queued while connecting.
+                cond.notify_all()
+            logger.info(f"Opened pooled Modbus TCP connection to {self.name}")
+            return conn
+
+        if not conn.connected or time.monotonic() - conn.last_used > self.idle_check_s:
+            await self._check(conn)
+        return conn
+
+    async def _check(self, conn: PooledConnection) -> None:
+        async with conn.checking:
+            if conn.connected and time.monotonic() - conn.last_used <= self.idle_check_s:
+                return  # checked by another caller while this one waited
+            if conn.connected and (conn.in_flight > 1 or await self._probe(conn)):
+                # Requests already in flight on a pipelined socket vouch for it.
+                conn.last_used = time.monotonic()
+                return
+            if conn.in_flight > 1:
+                # Dropped under other requests: never reconnect a socket they are using.
+                await self.release(conn, discard=True)
+                raise ConnectionError(f"Pooled connection to {self.name} dropped")
+            self._reconnects += 1
+            try:
+                conn.client.close()
+                await self._connect(conn.client)
+            except BaseException:
+                await self.release(conn, discard=True)
+                raise
+            conn.last_used = time.monotonic()
+        logger.info(f"Reconnected pooled Modbus TCP connection to {self.name}")
+
+    async def _probe(self, conn: PooledConnection) -> bool:
+        """Repeat the connection's last read for one register; any reply proves the socket."""
+        if conn.probe is None:
+            return True
+        unit_id, fc, address = conn.probe
+        try:
+            await conn.read(unit_id, fc, address, 1, timeout_s=self.timeout_s)
+        except (ModbusReadError, ModbusExceptionResponse):
+            return True
+        except Exception as exc:  # noqa: BLE001
+            logger.info(f"Idle Modbus TCP connection to {self.name} failed its probe: {exc}")
+            return False
+        return True
+
+    async def release(self, conn: PooledConnection, discard: bool = False) -> None:
+        cond = self._bind_loop()
+        async with cond:
+            conn.in_flight = max(conn.in_flight - 1, 0)
+            conn.last_used = time.monotonic()
+            if (discard or not conn.connected) and conn in self._connections:
+                self._connections.remove(conn)
+                conn.client.close()
+            cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "gateway": self.name,
+            "users": self.users,
+            "connections": len(self._connections),
+            "in_use": sum(1 for c in self._connections if c.in_flight),
+            "max_connections": self.max_connections,
+            "pipeline_depth": self.pipeline_depth,
+            "transport": "native" if self.native or self.pipeline_depth > 1 else "pymodbus",
+            "in_flight": sum(c.in_flight for c in self._connections),
+            "waits": self._waits,
+            "reconnects": self._reconnects,
+        }
+
+    async def close(self) -> None:
+        for conn in self._connections:
+            conn.client.close()
+        self._connections = []
+
+
+_pools: dict[tuple[str, int, bool], GatewayPool] = {}
+
+
+def get_tcp_pool(
+    host: str,
+    port: int,
+    max_connections: Optional[int] = None,
+    timeout_s: float = 3.0,
+    pipeline_depth: Optional[int] = None,
+    native: bool = False,
+) -> GatewayPool:
+    """Return the process-wide pool for ``host:port``, registering one more user on it.
+
+    Connection limits and pipeline depth are gateway properties: the largest value
+    configured by any device behind the gateway wins. Devices that select the native codec
+    get their own pool to the gateway.
+    """
+    key = (host, port, native)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = GatewayPool(
+            host,
+            port,
+            max_connections=max_connections or 2,
+            timeout_s=timeout_s,
+            pipeline_depth=pipeline_depth or 1,
+            native=native,
+        )
+        _pools[key] = pool
+    else:
+        if max_connections:
+            pool.max_connections = max(pool.max_connections, max_connections)
+        if pipeline_depth and pipeline_depth > pool.pipeline_depth:
+            if pool.stats()["connections"]:
+                raise ValueError(f"Cannot enable pipelining on open gateway {pool.name}")
+            pool.pipeline_depth = pipeline_depth
+        pool.timeout_s = max(pool.timeout_s, timeout_s)
+    pool.users += 1
+    return pool
+
+
+def tcp_pool_stats() -> list[Dict[str, Any]]:
+    return [pool.stats() for pool in _pools.values()]
+
+
+async def close_tcp_pools() -> None:
+    for pool in list(_pools.values()):
+        await pool.close()
+    _pools.clear()
+
+
+__all__ = [
+    "GatewayPool",
+    "IDLE_CHECK_S",
+    "PooledConnection",
+    "close_tcp_pools",
+    "get_tcp_pool",
+    "tcp_pool_stats",
+]
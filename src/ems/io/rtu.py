@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+import time
+from typing import Any, Dict, Optional
+
+from .bus import SerialSettings
+from .crc import append_crc, crc16
+from .mbap import READ_FUNCTION_CODES, decode_read_response_from
+
+logger = logging.getLogger(__name__)
+
+READ_REQUEST = struct.Struct(">BBHH")
+EXCEPTION_FRAME_SIZE = 5
+
+
+class CRCError(ValueError):
+    """A complete-looking RTU frame failed its CRC check."""
+
+
+def expected_response_size(fc: int, count: int) -> int:
+    """Size of a normal read response ADU: unit, fc, byte count, data, CRC."""
+    if fc in (1, 2):
+        return 5 + (count + 7) // 8
+    return 5 + 2 * count
+
+
+class _Frame:
+    __slots__ = ("data", "crc", "expected", "future", "silence")
+
+    def __init__(self, expected: int, future: asyncio.Future[bytes]) -> None:
+        self.data = bytearray()
+        self.crc = 0xFFFF
+        self.expected = expected
+        self.future = future
+        self.silence: Optional[asyncio.TimerHandle] = None
+
+
+class RTUConnection:
+    """Raw Modbus RTU master on a serial file descriptor.
+
+    Bytes are read as they arrive and folded into a running CRC, so a frame is known to be
+    complete the moment its last byte lands: either the expected length arrives with a valid
+    CRC, or the line stays silent for t3.5 after a CRC-valid frame. USB adapters deliver
+    bytes in bursts, so silence alone never ends a short frame whose CRC does not yet check
+    out; once a frame reaches its full length with a bad CRC, t3.5 of silence fails it with
+    :class:`CRCError` instead of waiting for the request timeout.
+    """
+
+    def __init__(self, settings: SerialSettings, timeout_s: float = 1.0) -> None:
+        self.settings = settings
+        self.timeout_s = timeout_s
+        self.t35_s = settings.frame_gap_s
+        self._serial: Optional[Any] = None
+        self._fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._frame: Optional[_Frame] = None
+        self._started = time.monotonic()
+        self.frames = 0
+        self.crc_errors = 0
+        self.timeouts = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._fd is not None
+
+    async def connect(self) -> bool:
+        import serial
+
+        s = self.settings
+        self._serial = serial.Serial(
+            port=s.port,
+            baudrate=s.baudrate,
+            bytesize=s.bytesize,
+            parity=s.parity,
+            stopbits=s.stopbits,
+            timeout=0,
+        )
+        fd = self._fd = self._serial.fileno()
+        os.set_blocking(fd, False)
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(fd, self._on_readable)
+        return True
+
+    async def read(
+        self, unit_id: int, fc: int, address: int, count: int, timeout_s: float | None = None
+    ) -> list[int]:
+        if fc not in READ_FUNCTION_CODES:
+            raise ValueError(f"Unsupported function code: {fc}")
+        if self._fd is None:
+            raise ConnectionError(f"Serial port {self.settings.port} not open")
+        loop = asyncio.get_running_loop()
+        self._drain()
+        frame = _Frame(expected_response_size(fc, count), loop.create_future())
+        self._frame = frame
+        timer = loop.call_later(timeout_s or self.timeout_s, self._expire, frame)
+        try:
+            os.write(self._fd, append_crc(READ_REQUEST.pack(unit_id, fc, address, count)))
+            adu = await frame.future
+        finally:
+            timer.cancel()
+            if frame.silence is not None:
+                frame.silence.cancel()
+            self._frame = None
+        if adu[0] != unit_id:
+            raise ValueError(f"Response from unit {adu[0]}, expected {unit_id}")
+        return decode_read_response_from(fc, count, adu, 1, len(adu) - 3)
+
+    def _drain(self) -> None:
+        """Discard anything left on the line by an earlier, abandoned exchange."""
+        assert self._fd is not None
+        try:
+            while os.read(self._fd, 256):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _on_readable(self) -> None:
+        assert self._fd is not None
+        try:
+            chunk = os.read(self._fd, 256)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._fail(ConnectionError(f"Serial port {self.settings.port} failed: {e}"))
+            return
+        frame = self._frame
+        if frame is None or frame.future.done():
+            return  # late bytes; dropped before the next request is sent
+        frame.data += chunk
+        frame.crc = crc16(chunk, frame.crc)
+        if frame.silence is not None:
+            frame.silence.cancel()
+            frame.silence = None
+        if len(frame.data) < EXCEPTION_FRAME_SIZE:
+            return
+        loop = asyncio.get_running_loop()
+        full = len(frame.data) >= frame.expected or frame.data[1] & 0x80
+        if frame.crc == 0:
+            if full:
+                self._complete(frame)
+            else:
+                frame.silence = loop.call_later(self.t35_s, self._complete, frame)
+        elif full:
+            # Nothing more is due; let any trailing bytes finish, then report the bad frame.
+            frame.silence = loop.call_later(self.t35_s, self._reject, frame)
+
+    def _complete(self, frame: _Frame) -> None:
+        if not frame.future.done():
+            self.frames += 1
+            frame.future.set_result(bytes(frame.data))
+
+    def _reject(self, frame: _Frame) -> None:
+        if not frame.future.done():
+            self.crc_errors += 1
+            frame.future.set_exception(
+                CRCError(f"Bad or incomplete RTU frame ({len(frame.data)} bytes)")
+            )
+
+    def _expire(self, frame: _Frame) -> None:
+        if frame.future.done():
+            return
+        if frame.data:
+            self._reject(frame)
+        else:
+            self.timeouts += 1
+            frame.future.set_exception(TimeoutError(f"No response on {self.settings.port}"))
+
+    def _fail(self, error: Exception) -> None:
+        frame = self._frame
+        self.close()
+        if frame is not None and not frame.future.done():
+            frame.future.set_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return {
+            "frames_per_s": self.frames / elapsed,
+            "crc_errors": self.crc_errors,
+            "timeouts": self.timeouts,
+            "t3_5_s": self.t35_s,
+        }
+
+    def close(self) -> None:
+        if self._fd is not None:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self._fd)
+            self._fd = None
+        if self._serial is not None:
+            self._serial.close()
+            self._serial = None
+
+
+__all__ = [
+    "CRCError",
+    "RTUConnection",
+    "expected_response_size",
+]
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+class ModbusReadError(Exception):
+    """A read failed on the wire, timed out, or was refused by the device."""
+
+
+async def pymodbus_read(client: Any, unit_id: int, fc: int, address: int, count: int) -> list[int]:
+    """Issue a read on a connected pymodbus client and return registers or bits."""
+    if fc == 3:  # Holding registers
+        result = await client.read_holding_registers(address, count=count, device_id=unit_id)
+    elif fc == 4:  # Input registers
+        result = await client.read_input_registers(address, count=count, device_id=unit_id)
+    elif fc == 1:  # Coils
+        result = await client.read_coils(address, count=count, device_id=unit_id)
+    elif fc == 2:  # Discrete inputs
+        result = await client.read_discrete_inputs(address, count=count, device_id=unit_id)
+    else:
+        raise ValueError(f"Unsupported function code: {fc}")
+
+    if result.isError():
+        raise ModbusReadError(f"Modbus read error: {result}")
+
+    if fc in (1, 2):
+        return [int(bit) for bit in result.bits[:count]]
+    return list(result.registers)
+
+
+__all__ = ["ModbusReadError", "pymodbus_read"]
@@ -0,0 +1,5 @@
+"""Local Modbus TCP/RTU device simulator for load and soak testing."""
+
+from .server import ModbusSimulator, SimConfig, load_sim_config, plant_from_app_config
+
+__all__ = ["ModbusSimulator", "SimConfig", "load_sim_config", "plant_from_app_config"]
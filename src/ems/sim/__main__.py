@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+import yaml
+
+from .server import ModbusSimulator, SimConfig, load_sim_config, plant_from_app_config
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local Modbus TCP/RTU device simulator")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--config", help="Path to simulator YAML")
+    source.add_argument("--from-app-config", help="Simulate every Modbus device in an EMS config")
+    parser.add_argument("--base-port", type=int, default=15020, help="First TCP gateway port")
+    parser.add_argument("--link-dir", default="/tmp/ems-sim", help="Directory for pty symlinks")
+    parser.add_argument("--write-config", help="Write the EMS config rewritten to the simulator")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--exception-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--stats-interval", type=float, default=30.0, help="Seconds between stats")
+    return parser.parse_args()
+
+
+async def run(config: SimConfig, stats_interval_s: float) -> None:
+    simulator = ModbusSimulator(config)
+    await simulator.start()
+    try:
+        while True:
+            await asyncio.sleep(stats_interval_s)
+            for stats in simulator.stats():
+                logging.info(f"sim {stats}")
+    finally:
+        await simulator.close()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args()
+    if args.config:
+        config = load_sim_config(Path(args.config))
+    else:
+        app_config = yaml.safe_load(Path(args.from_app_config).read_text(encoding="utf-8"))
+        config, rewritten = plant_from_app_config(
+            app_config,
+            base_port=args.base_port,
+            link_dir=args.link_dir,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            exception_rate=args.exception_rate,
+            drop_rate=args.drop_rate,
+        )
+        if args.write_config:
+            Path(args.write_config).write_text(yaml.safe_dump(rewritten, sort_keys=False))
+    try:
+        asyncio.run(run(config, args.stats_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
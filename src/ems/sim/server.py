@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import struct
+import time
+import tty
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from pydantic import BaseModel, Field
+
+from ..drivers.pointmap import PointDefinition, load_point_map
+from ..io.bus import character_time_s, frame_gap_s
+from ..io.crc import append_crc, crc16
+from ..io.mbap import (
+    MBAP_HEADER,
+    READ_FUNCTION_CODES,
+    encode_exception_response,
+    encode_read_response,
+)
+
+logger = logging.getLogger(__name__)
+
+ILLEGAL_FUNCTION = 1
+ILLEGAL_DATA_ADDRESS = 2
+SERVER_DEVICE_FAILURE = 4
+SERVER_DEVICE_BUSY = 6
+
+# Fallback ranges for points without quality bounds, keyed by unit.
+UNIT_RANGES: Dict[str, Tuple[float, float]] = {
+    "V": (225.0, 235.0),
+    "A": (5.0, 50.0),
+    "Hz": (49.95, 50.05),
+    "kW": (10.0, 90.0),
+    "kVar": (-10.0, 10.0),
+    "C": (25.0, 45.0),
+    "%": (20.0, 80.0),
+    "deg": (0.0, 90.0),
+}
+DEFAULT_RANGE = (0.0, 100.0)
+
+
+class SimUnitConfig(BaseModel):
+    unit_ids: List[int]
+    point_map: str
+
+
+class SimServerConfig(BaseModel):
+    transport: str = "tcp"  # tcp, rtu
+    host: str = "127.0.0.1"
+    port: int = 5020
+    link: Optional[str] = None  # rtu: symlink created to the pty slave
+    baudrate: int = 9600
+    bytesize: int = 8
+    parity: str = "N"
+    stopbits: int = 1
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    exception_rate: float = 0.0
+    drop_rate: float = 0.0
+    units: List[SimUnitConfig] = Field(default_factory=list)
+
+
+class SimConfig(BaseModel):
+    seed: Optional[int] = None
+    servers: List[SimServerConfig] = Field(default_factory=list)
+
+
+def _encode_value(point: PointDefinition, value: float) -> List[int]:
+    raw = (value - point.offset) / (point.scale or 1.0)
+    ptype = point.type
+    if ptype == "float":
+        data = struct.pack(">f", raw)
+    elif ptype == "float64":
+        data = struct.pack(">d", raw)
+    elif ptype == "int32":
+        data = struct.pack(">i", int(raw))
+    elif ptype == "uint32":
+        data = struct.pack(">I", max(int(raw), 0) & 0xFFFFFFFF)
+    elif ptype == "int16":
+        data = struct.pack(">h", max(min(int(raw), 32767), -32768))
+    elif ptype == "bool":
+        data = struct.pack(">H", 1 if raw >= 0.5 else 0)
+    elif ptype.startswith("bitfield"):
+        data = struct.pack(">H", random.getrandbits(3))
+    else:
+        data = struct.pack(">H", max(min(int(raw), 0xFFFF), 0))
+    registers = list(struct.unpack(f">{len(data) // 2}H", data))
+    if point.word_order == "little":
+        registers.reverse()
+    registers += [0] * (point.count - len(registers))
+    return registers[: point.count]
+
+
+class SimUnit:
+    """Register image for one simulated unit, refreshed with a bounded random walk."""
+
+    def __init__(self, unit_id: int, point_map: str | Path, refresh_s: float = 1.0) -> None:
+        self.unit_id = unit_id
+        self.refresh_s = refresh_s
+        self._points: List[Tuple[PointDefinition, float, float]] = []
+        self._values: List[float] = []
+        self._images: Dict[int, Dict[int, int]] = {fc: {} for fc in READ_FUNCTION_CODES}
+        for point in load_point_map(point_map).points:
+            if not point.readable:
+                continue
+            low, high = UNIT_RANGES.get(str(point.unit), DEFAULT_RANGE)
+            if point.min_value is not None and point.max_value is not None:
+                span = point.max_value - point.min_value
+                low = point.min_value + 0.2 * span
+                high = point.max_value - 0.2 * span
+            self._points.append((point, low, high))
+            self._values.append(random.uniform(low, high))
+        self._updated = 0.0
+        self._refresh()
+
+    def _refresh(self) -> None:
+        for i, (point, low, high) in enumerate(self._points):
+            step = (high - low) * 0.01
+            self._values[i] = min(max(self._values[i] + random.uniform(-step, step), low), high)
+            image = self._images[point.fc]  # type: ignore[index]
+            for offset, register in enumerate(_encode_value(point, self._values[i])):
+                image[point.address + offset] = register  # type: ignore[operator]
+        self._updated = time.monotonic()
+
+    def read(self, fc: int, address: int, count: int) -> List[int]:
+        if time.monotonic() - self._updated > self.refresh_s:
+            self._refresh()
+        image = self._images[fc]
+        if fc in (1, 2):
+            return [1 if image.get(address + i, 0) else 0 for i in range(count)]
+        return [image.get(address + i, 0) for i in range(count)]
+
+
+class SimServer:
+    """One simulated gateway (TCP) or serial line (RTU) serving many unit ids."""
+
+    def __init__(self, config: SimServerConfig) -> None:
+        self.config = config
+        self.units: Dict[int, SimUnit] = {}
+        for unit_config in config.units:
+            for unit_id in unit_config.unit_ids:
+                self.units[unit_id] = SimUnit(unit_id, unit_config.point_map)
+        self.requests = 0
+        self.exceptions = 0
+        self.dropped = 0
+        self.slave_path: Optional[str] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: set[asyncio.Task[Any]] = set()
+        self._master_fd: Optional[int] = None
+        self._slave_fd: Optional[int] = None
+
+    def respond(self, unit_id: int, pdu: bytes) -> Optional[bytes]:
+        """Return the response PDU for a request PDU, or None to drop it."""
+        self.requests += 1
+        cfg = self.config
+        if random.random() < cfg.drop_rate:
+            self.dropped += 1
+            return None
+        fc = pdu[0]
+        if fc not in READ_FUNCTION_CODES or len(pdu) < 5:
+            self.exceptions += 1
+            return encode_exception_response(fc, ILLEGAL_FUNCTION)
+        unit = self.units.get(unit_id)
+        if unit is None:
+            self.dropped += 1  # no device answers an unknown address
+            return None
+        if random.random() < cfg.exception_rate:
+            self.exceptions += 1
+            return encode_exception_response(
+                fc, random.choice((SERVER_DEVICE_FAILURE, SERVER_DEVICE_BUSY))
+            )
+        address, count = struct.unpack_from(">HH", pdu, 1)
+        limit = 2000 if fc in (1, 2) else 125
+        if not 1 <= count <= limit:
+            self.exceptions += 1
+            return encode_exception_response(fc, ILLEGAL_DATA_ADDRESS)
+        return encode_read_response(fc, unit.read(fc, address, count))
+
+    def _delay_s(self) -> float:
+        cfg = self.config
+        return max(cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms), 0.0) / 1000.0
+
+    async def start(self) -> None:
+        if self.config.transport == "tcp":
+            self._server = await asyncio.start_server(
+                self._handle_tcp, self.config.host, self.config.port
+            )
+            self.config.port = self._server.sockets[0].getsockname()[1]
+            logger.info(f"Simulator listening on {self.config.host}:{self.config.port}")
+        elif self.config.transport == "rtu":
+            await self._start_rtu()
+        else:
+            raise ValueError(f"Unsupported simulator transport {self.config.transport}")
+
+    async def _handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks: set[asyncio.Task[None]] = set()
+        current = asyncio.current_task()
+        assert current is not None
+        self._clients.add(current)
+        try:
+            while True:
+                header = await reader.readexactly(MBAP_HEADER.size)
+                tid, _, length, unit_id = MBAP_HEADER.unpack(header)
+                pdu = await reader.readexactly(length - 1)
+                # Answer each transaction independently so pipelined clients see overlap.
+                task = asyncio.create_task(self._answer_tcp(writer, tid, unit_id, pdu))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(current)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _answer_tcp(
+        self, writer: asyncio.StreamWriter, tid: int, unit_id: int, pdu: bytes
+    ) -> None:
+        delay = self._delay_s()
+        if delay:
+            await asyncio.sleep(delay)
+        response = self.respond(unit_id, pdu)
+        if response is None or writer.is_closing():
+            return
+        writer.write(MBAP_HEADER.pack(tid, 0, len(response) + 1, unit_id) + response)
+
+    async def _start_rtu(self) -> None:
+        master, slave = os.openpty()
+        tty.setraw(master)
+        tty.setraw(slave)
+        self._master_fd, self._slave_fd = master, slave
+        self.slave_path = os.ttyname(slave)
+        if self.config.link:
+            link = Path(self.config.link)
+            link.parent.mkdir(parents=True, exist_ok=True)
+            if link.is_symlink() or link.exists():
+                link.unlink()
+            link.symlink_to(self.slave_path)
+        os.set_blocking(master, False)
+        self._rtu_buffer = bytearray()
+        self._rtu_queue: asyncio.Queue[bytes] = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        loop.add_reader(master, self._on_rtu_readable)
+        self._rtu_task = asyncio.create_task(self._serve_rtu())
+        logger.info(f"Simulator serving RTU on {self.config.link or self.slave_path}")
+
+    def _on_rtu_readable(self) -> None:
+        assert self._master_fd is not None
+        try:
+            data = os.read(self._master_fd, 4096)
+        except BlockingIOError:
+            return
+        buffer = self._rtu_buffer
+        buffer.extend(data)
+        # Read requests are fixed 8-byte frames; resynchronise on CRC mismatch.
+        while len(buffer) >= 8:
+            frame = bytes(buffer[:8])
+            if crc16(frame) == 0:
+                del buffer[:8]
+                self._rtu_queue.put_nowait(frame)
+            else:
+                del buffer[:1]
+
+    async def _serve_rtu(self) -> None:
+        cfg = self.config
+        char_s = character_time_s(cfg.baudrate, cfg.bytesize, cfg.parity, cfg.stopbits)
+        gap_s = frame_gap_s(cfg.baudrate, cfg.bytesize, cfg.parity, cfg.stopbits)
+        while True:
+            frame = await self._rtu_queue.get()
+            unit_id = frame[0]
+            response = self.respond(unit_id, frame[1:-2])
+            # Emulate line time: request + turnaround + response at the configured baud rate.
+            wire = 8 + (len(response) + 3 if response else 0)
+            await asyncio.sleep(self._delay_s() + wire * char_s + gap_s)
+            if response is None or self._master_fd is None:
+                continue
+            os.write(self._master_fd, append_crc(bytes((unit_id,)) + response))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "transport": self.config.transport,
+            "endpoint": (
+                f"{self.config.host}:{self.config.port}"
+                if self.config.transport == "tcp"
+                else self.config.link or self.slave_path
+            ),
+            "units": len(self.units),
+            "requests": self.requests,
+            "exceptions": self.exceptions,
+            "dropped": self.dropped,
+        }
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for client in list(self._clients):
+                client.cancel()
+            await asyncio.gather(*self._clients, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._master_fd is not None:
+            asyncio.get_running_loop().remove_reader(self._master_fd)
+            self._rtu_task.cancel()
+            await asyncio.gather(self._rtu_task, return_exceptions=True)
+            os.close(self._master_fd)
+            self._master_fd = None
+        if self._slave_fd is not None:
+            os.close(self._slave_fd)
+            self._slave_fd = None
+        if self.config.link and Path(self.config.link).is_symlink():
+            Path(self.config.link).unlink()
+
+
+class ModbusSimulator:
+    def __init__(self, config: SimConfig) -> None:
+        if config.seed is not None:
+            random.seed(config.seed)
+        self.servers = [SimServer(server) for server in config.servers]
+
+    async def start(self) -> None:
+        for server in self.servers:
+            await server.start()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [server.stats() for server in self.servers]
+
+    async def close(self) -> None:
+        for server in self.servers:
+            await server.close()
+
+
+def load_sim_config(path: str | Path) -> SimConfig:
+    data = yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+    return SimConfig.model_validate(data or {})
+
+
+def plant_from_app_config(
+    app_config: Dict[str, Any],
+    base_port: int = 15020,
+    link_dir: str = "/tmp/ems-sim",
+    **faults: Any,
+) -> Tuple[SimConfig, Dict[str, Any]]:
+    """Build a simulator for every Modbus device in an EMS config.
+
+    Each TCP gateway (host:port) becomes a local TCP server and each serial port a pty-backed
+    RTU line. Returns the simulator config and a copy of ``app_config`` rewritten to poll the
+    simulator instead of the field devices.
+    """
+    servers: Dict[Tuple[str, str], SimServerConfig] = {}
+    units: Dict[Tuple[str, str], Dict[str, List[int]]] = {}
+    rewritten = yaml.safe_load(yaml.safe_dump(app_config))
+    for device in rewritten.get("devices", []):
+        point_map = device.get("point_map")
+        connection = device.setdefault("connection", {})
+        protocol = device.get("protocol")
+        if not point_map or protocol not in {"modbus_tcp", "modbus_rtu", "rs485"}:
+            continue
+        if protocol == "modbus_tcp":
+            key = ("tcp", f"{connection.get('host')}:{connection.get('port', 502)}")
+            if key not in servers:
+                servers[key] = SimServerConfig(
+                    transport="tcp", port=base_port + len(servers), **faults
+                )
+            connection["host"] = servers[key].host
+            connection["port"] = servers[key].port
+        else:
+            key = ("rtu", str(connection.get("serial_port")))
+            if key not in servers:
+                name = Path(key[1]).name or f"line{len(servers)}"
+                servers[key] = SimServerConfig(
+                    transport="rtu",
+                    link=str(Path(link_dir) / name),
+                    baudrate=connection.get("baudrate", 9600),
+                    parity=connection.get("parity", "N"),
+                    stopbits=connection.get("stopbits", 1),
+                    **faults,
+                )
+            connection["serial_port"] = servers[key].link
+        units.setdefault(key, {}).setdefault(point_map, []).append(
+            int(connection.get("unit_id", 1))
+        )
+    for key, server in servers.items():
+        server.units = [
+            SimUnitConfig(unit_ids=sorted(set(ids)), point_map=point_map)
+            for point_map, ids in units[key].items()
+        ]
+    return SimConfig(servers=list(servers.values())), rewritten
+
+
+__all__ = [
+    "ModbusSimulator",
+    "SimConfig",
+    "SimServer",
+    "SimServerConfig",
+    "SimUnit",
+    "SimUnitConfig",
+    "load_sim_config",
+    "plant_from_app_config",
+]
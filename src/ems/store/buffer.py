@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from ..utils.models import MeasurementBatch
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL_MS = 1000
+DEFAULT_FLUSH_ROWS = 5000
+DEFAULT_MAX_ROWS = 50000
+
+
+class WriteBuffer:
+    """Write-behind queue that group-commits poll batches from every device.
+
+    Pollers ``put()`` batches without touching the database; one flusher stores everything
+    pending with a single ``insert_batches`` call once ``flush_interval_ms`` has passed since
+    the first pending row, or as soon as ``flush_rows`` rows are waiting. At ``max_rows``
+    pending (including a flush in progress) ``put()`` waits for the next successful flush.
+    A failed flush keeps its rows and is retried on the next interval.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        flush_rows: int = DEFAULT_FLUSH_ROWS,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        name: str = "samples",
+    ) -> None:
+        if not 0 < flush_rows <= max_rows:
+            raise ValueError("flush_rows must be positive and no larger than max_rows")
+        self.db = db
+        self.name = name
+        self.flush_interval_s = flush_interval_ms / 1000.0
+        self.flush_rows = flush_rows
+        self.max_rows = max_rows
+        self._pending: List[MeasurementBatch] = []
+        self._rows = 0
+        self._in_flight = 0
+        self._has_rows = asyncio.Event()
+        self._full = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._worker: asyncio.Task[None] | None = None
+        self._closing = False
+        self._flushes = 0
+        self._rows_flushed = 0
+        self._errors = 0
+        self._blocked = 0
+        self._last_flush_s = 0.0
+        self._max_flush_s = 0.0
+        self._flush_s = 0.0
+        _buffers.append(self)
+
+    @property
+    def depth(self) -> int:
+        """Rows accepted but not yet committed."""
+        return self._rows + self._in_flight
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._closing = False
+            self._worker = asyncio.get_running_loop().create_task(self._run(), name="write-buffer")
+
+    async def put(self, batch: MeasurementBatch) -> None:
+        if self._closing:
+            raise RuntimeError("Write buffer is closed")
+        # A single oversized batch is still accepted into an empty buffer.
+        while self.depth and self.depth + len(batch) > self.max_rows:
+            self._blocked += 1
+            self._full.set()
+            self._drained.clear()
+            await self._drained.wait()
+        self._pending.append(batch)
+        self._rows += len(batch)
+        self._has_rows.set()
+        if self._rows >= self.flush_rows:
+            self._full.set()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            await self._has_rows.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            if not await self.flush():
+                # Back off for one interval rather than retrying a failing database at once.
+                await asyncio.sleep(self.flush_interval_s)
+
+    async def flush(self) -> bool:
+        """Commit everything pending; returns ``False`` if the insert failed."""
+        async with self._flush_lock:
+            batches, rows = self._pending, self._rows
+            self._pending, self._rows = [], 0
+            self._has_rows.clear()
+            self._full.clear()
+            if not batches:
+                return True
+            self._in_flight = rows
+            started = time.monotonic()
+            try:
+                await self.db.insert_batches(batches)
+            except Exception as exc:  # noqa: BLE001
+                self._errors += 1
+                logger.warning(f"Write buffer flush of {rows} rows failed: {exc}")
+                self._pending[:0] = batches
+                self._rows += rows
+                self._has_rows.set()
+                return False
+            finally:
+                self._in_flight = 0
+            elapsed = time.monotonic() - started
+            self._flushes += 1
+            self._rows_flushed += rows
+            self._last_flush_s = elapsed
+            self._max_flush_s = max(self._max_flush_s, elapsed)
+            self._flush_s += elapsed
+            self._drained.set()
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "queue_depth": self.depth,
+            "queued_batches": len(self._pending),
+            "max_rows": self.max_rows,
+            "flushes": self._flushes,
+            "rows_flushed": self._rows_flushed,
+            "errors": self._errors,
+            "blocked_puts": self._blocked,
+            "last_flush_s": self._last_flush_s,
+            "max_flush_s": self._max_flush_s,
+            "flush_s_total": self._flush_s,
+            "avg_flush_s": self._flush_s / self._flushes if self._flushes else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Stop the flusher and commit whatever is still pending."""
+        self._closing = True
+        if self._worker is not None:
+            # Holding the lock lets a flush in progress finish instead of being cancelled.
+            async with self._flush_lock:
+                self._worker.cancel()
+                await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        await self.flush()
+        if self in _buffers:
+            _buffers.remove(self)
+
+
+_buffers: List[WriteBuffer] = []
+
+
+def write_buffer_stats() -> List[Dict[str, Any]]:
+    return [buffer.stats() for buffer in _buffers]
+
+
+__all__ = ["WriteBuffer", "write_buffer_stats"]
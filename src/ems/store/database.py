@@ -1,44 +1,252 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import sqlite3
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, cast
 
-from sqlalchemy import JSON, Boolean, DateTime, Float, Index, Integer, MetaData, String, select
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    ColumnElement,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    SmallInteger,
+    String,
+    Table,
+    UniqueConstraint,
+    distinct,
+    inspect,
+    select,
+    type_coerce,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.types import TypeDecorator
+
+from ..utils.models import GOOD_CODE, QUALITIES, QUALITY_CODES, Measurement, MeasurementBatch
+from .partitions import MAX_MS, MIN_MS, UNPARTITIONED, Partition, PartitionCatalog
+from .writer import SQLiteWriter
 
-from ..utils.models import Measurement
+RAW_REGISTER_MODES = ("non_good", "all", "none")
+WRITERS = ("aiosqlite", "thread")
+AUTO_VACUUM_MODES = ("none", "full", "incremental")
+# Receives a snapshot of retention or vacuum progress after every step.
+ProgressCallback = Callable[[Dict[str, Any]], None]
+PURGE_CHUNK_ROWS = 5000
+MIGRATION_CHUNK_ROWS = 5000
+VACUUM_STEP_PAGES = 2000
+MAINTENANCE_PAUSE_S = 0.05
 
 metadata = MetaData()
+# Sample partitions are created on demand, so they live outside the declarative metadata.
+sample_metadata = MetaData()
 
 
 class Base(DeclarativeBase):
     metadata = metadata
 
 
-class MeasurementRecord(Base):
-    __tablename__ = "measurements"
+class EpochMillis(TypeDecorator[datetime]):
+    """UTC datetimes stored as integer milliseconds since the epoch."""
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value: datetime | int | None, dialect: Any) -> Optional[int]:
+        if value is None or isinstance(value, int):
+            return value
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return round(value.timestamp() * 1000)
+
+    def process_result_value(self, value: Optional[int], dialect: Any) -> Optional[datetime]:
+        if value is None:
+            return None
+        return datetime.fromtimestamp(value / 1000, timezone.utc)
+
+
+class SeriesRecord(Base):
+    """One measured quantity; samples refer to it by integer id."""
+
+    __tablename__ = "series"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    timestamp_utc: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
-    plant_id: Mapped[str] = mapped_column(String(64), index=True)
-    device_id: Mapped[str] = mapped_column(String(64), index=True)
-    metric: Mapped[str] = mapped_column(String(128), index=True)
-    value: Mapped[float | None] = mapped_column(Float)
-    unit: Mapped[str | None] = mapped_column(String(32))
-    quality: Mapped[str] = mapped_column(String(16))
+    plant_id: Mapped[str] = mapped_column(String(64))
+    device_id: Mapped[str] = mapped_column(String(64))
+    metric: Mapped[str] = mapped_column(String(128))
+    # Stored as "" rather than NULL so the unique constraint also covers unitless series.
+    unit: Mapped[str] = mapped_column(String(32), default="")
     source: Mapped[str] = mapped_column(String(64))
-    raw: Mapped[dict | None] = mapped_column(JSON, nullable=True)
 
-    __table_args__ = (
-        Index("idx_measurements_device_metric_ts", "device_id", "metric", "timestamp_utc"),
+    __table_args__ = (UniqueConstraint("plant_id", "device_id", "metric", "unit"),)
+
+
+class PartitionRecord(Base):
+    """Catalog of sample tables and the ``[start_ms, end_ms)`` range each one holds."""
+
+    __tablename__ = "sample_partitions"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    start_ms: Mapped[int] = mapped_column(Integer)
+    end_ms: Mapped[int] = mapped_column(Integer)
+
+
+# Declarative ``__table__`` is typed as a FromClause, which has no insert()/delete().
+_CATALOG = cast(Table, PartitionRecord.__table__)
+
+
+def sample_table(name: str) -> Table:
+    """The table definition of one sample partition."""
+    table = sample_metadata.tables.get(name)
+    if table is None:
+        table = Table(
+            name,
+            sample_metadata,
+            Column("id", Integer, primary_key=True, autoincrement=True),
+            Column("series_id", Integer, nullable=False),
+            Column("timestamp_utc", EpochMillis, nullable=False),
+            Column("value", Float),
+            Column("quality", SmallInteger, nullable=False),
+            Column("raw", JSON(none_as_null=True), nullable=True),
+            Index(f"idx_{name}_series_ts", "series_id", "timestamp_utc"),
+            Index(f"idx_{name}_ts", "timestamp_utc"),
+        )
+    return table
+
+
+def epoch_ms(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return round(timestamp.timestamp() * 1000)
+
+
+SeriesKey = Tuple[str, str, str, Optional[str]]
+
+
+class SeriesInfo:
+    __slots__ = ("plant_id", "device_id", "metric", "unit", "source")
+
+    def __init__(
+        self, plant_id: str, device_id: str, metric: str, unit: Optional[str], source: str
+    ) -> None:
+        self.plant_id = plant_id
+        self.device_id = device_id
+        self.metric = metric
+        self.unit = unit
+        self.source = source
+
+
+class MeasurementRecord:
+    """A stored sample joined with its series, as returned by the query methods."""
+
+    __slots__ = ("timestamp_utc", "value", "quality", "raw", "series")
+
+    def __init__(
+        self,
+        timestamp_utc: datetime,
+        value: Optional[float],
+        quality: int,
+        raw: Optional[Dict[str, Any]],
+        series: SeriesInfo,
+    ) -> None:
+        self.timestamp_utc = timestamp_utc
+        self.value = value
+        self.quality = QUALITIES[quality].value
+        self.raw = raw
+        self.series = series
+
+    @property
+    def plant_id(self) -> str:
+        return self.series.plant_id
+
+    @property
+    def device_id(self) -> str:
+        return self.series.device_id
+
+    @property
+    def metric(self) -> str:
+        return self.series.metric
+
+    @property
+    def unit(self) -> Optional[str]:
+        return self.series.unit
+
+    @property
+    def source(self) -> str:
+        return self.series.source
+
+
+_SAMPLE_COLUMNS = ("series_id", "timestamp_utc", "value", "quality", "raw")
+_SAMPLES_INSERT_SQL = (
+    "INSERT INTO {} (series_id, timestamp_utc, value, quality, raw) VALUES (?, ?, ?, ?, ?)"
+)
+
+
+def _sample_params(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Driver-level parameters for the writer thread, bound as EpochMillis/JSON would."""
+    raw = row["raw"]
+    return (
+        row["series_id"],
+        epoch_ms(row["timestamp_utc"]),
+        row["value"],
+        row["quality"],
+        None if raw is None else json.dumps(raw),
+    )
+
+
+def _create_series(
+    conn: sqlite3.Connection, rows: Sequence[Tuple[str, str, str, str, str]]
+) -> List[int]:
+    conn.executemany(
+        "INSERT OR IGNORE INTO series (plant_id, device_id, metric, unit, source)"
+        " VALUES (?, ?, ?, ?, ?)",
+        rows,
     )
+    return [
+        conn.execute(
+            "SELECT id FROM series WHERE plant_id = ? AND device_id = ? AND metric = ?"
+            " AND unit = ?",
+            row[:4],
+        ).fetchone()[0]
+        for row in rows
+    ]
+
+
+# The pre-series ``measurements`` table is migrated chunk by chunk, oldest rowid first,
+# straight into the sample partitions; its timestamps are text.
+_LEGACY_SERIES_SQL = """
+    INSERT OR IGNORE INTO series (plant_id, device_id, metric, unit, source)
+    SELECT plant_id, device_id, metric, COALESCE(unit, ''), MIN(source)
+    FROM measurements GROUP BY plant_id, device_id, metric, COALESCE(unit, '')
+"""
+_LEGACY_CHUNK_SQL = """
+    SELECT m.id, s.id,
+           CAST(strftime('%s', m.timestamp_utc) AS INTEGER) * 1000
+             + CAST(substr(m.timestamp_utc, 21, 3) AS INTEGER),
+           m.value,
+           CASE m.quality WHEN 'GOOD' THEN 0 WHEN 'BAD' THEN 1 ELSE 2 END,
+           m.raw
+    FROM measurements AS m
+    JOIN series AS s ON s.plant_id = m.plant_id AND s.device_id = m.device_id
+      AND s.metric = m.metric AND s.unit = COALESCE(m.unit, '')
+    ORDER BY m.id
+    LIMIT ?
+"""
 
 
 class UplinkQueueRecord(Base):
@@ -55,19 +263,77 @@ class UplinkQueueRecord(Base):
 
 
 class Database:
-    def __init__(self, path: str) -> None:
+    """SQLite store for samples and the uplink queue.
+
+    With ``writer="thread"`` samples and new series are written by a dedicated
+    :class:`SQLiteWriter` thread, and sample queries use a separate read-only engine, so
+    under WAL an API query never waits for an ingest transaction. The uplink queue and
+    retention still go through the aiosqlite engine.
+
+    With ``partition_span_s`` set, samples go to one table per span of time (see
+    :class:`PartitionCatalog`); queries visit only the partitions their time range touches
+    and retention drops whole partitions. Tables written under a different setting are
+    repartitioned at connect.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        raw_registers: str = "non_good",
+        writer: str = "aiosqlite",
+        partition_span_s: Optional[int] = None,
+    ) -> None:
+        if raw_registers not in RAW_REGISTER_MODES:
+            raise ValueError(f"raw_registers must be one of {RAW_REGISTER_MODES}")
+        if writer not in WRITERS:
+            raise ValueError(f"writer must be one of {WRITERS}")
+        if writer == "thread" and path == ":memory:":
+            raise ValueError("The thread writer needs a database file, not :memory:")
         self._path = Path(path)
+        # Raw registers explain a bad value; for GOOD rows they only double the row size.
+        self.raw_registers = raw_registers
         self._engine: AsyncEngine | None = None
         self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._reader: AsyncEngine | None = None
+        self._read_session_factory: async_sessionmaker[AsyncSession] | None = None
+        self.writer = SQLiteWriter(str(self._path)) if writer == "thread" else None
+        self.partitions = PartitionCatalog(partition_span_s * 1000 if partition_span_s else None)
+        self._partition_lock = asyncio.Lock()
+        # Series are interned once; samples carry only the integer id.
+        self._series_ids: Dict[SeriesKey, int] = {}
+        self._series: Dict[int, SeriesInfo] = {}
+        self._batch_series: Dict[Tuple[str, str], Tuple[Sequence[str], List[int]]] = {}
 
     async def connect(self) -> None:
         self._path.parent.mkdir(parents=True, exist_ok=True)
         db_url = f"sqlite+aiosqlite:///{self._path}"
         self._engine = create_async_engine(db_url, echo=False, pool_pre_ping=True)
         async with self._engine.begin() as conn:
+            # Only takes effect before the first table exists; older files need one VACUUM.
+            await conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
             await conn.run_sync(Base.metadata.create_all)
+            legacy = await conn.run_sync(lambda c: inspect(c).has_table("measurements"))
+            await self._load_partitions(conn)
         self._session_factory = async_sessionmaker(self._engine, expire_on_commit=False)
         await self._enable_wal()
+        if legacy:
+            await self._migrate_legacy(MIGRATION_CHUNK_ROWS)
+        await self._load_series()
+        if self.writer is not None:
+            self.writer.start()
+            self._reader = create_async_engine(
+                f"sqlite+aiosqlite:///file:{self._path.resolve()}?mode=ro&uri=true", echo=False
+            )
+            self._read_session_factory = async_sessionmaker(self._reader, expire_on_commit=False)
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            await self.writer.close()
+        for engine in (self._reader, self._engine):
+            if engine is not None:
+                await engine.dispose()
+        self._engine = self._reader = None
+        self._session_factory = self._read_session_factory = None
 
     async def _enable_wal(self) -> None:
         assert self._engine is not None
@@ -81,37 +347,310 @@ class Database:
             raise RuntimeError("Database not connected")
         return self._session_factory
 
-    async def insert_measurements(self, measurements: Sequence[Measurement]) -> None:
+    @property
+    def read_session(self) -> async_sessionmaker[AsyncSession]:
+        """Sessions for sample queries; read-only connections with the thread writer."""
+        return self._read_session_factory or self.session
+
+    async def _load_partitions(self, conn: AsyncConnection) -> None:
+        partitions = [
+            Partition(row.name, row.start_ms, row.end_ms)
+            for row in await conn.execute(select(_CATALOG))
+        ]
+        has_unpartitioned = await conn.run_sync(lambda c: inspect(c).has_table(UNPARTITIONED))
+        if has_unpartitioned and UNPARTITIONED not in {p.name for p in partitions}:
+            # Sample table created before partitions were catalogued.
+            await conn.execute(
+                _CATALOG.insert().values(name=UNPARTITIONED, start_ms=MIN_MS, end_ms=MAX_MS)
+            )
+            partitions.append(Partition(UNPARTITIONED, MIN_MS, MAX_MS))
+        partitioned = self.partitions.span_ms is not None
+        for partition in partitions:
+            if partition.bounded == partitioned:
+                self.partitions.add(partition)
+        for partition in partitions:
+            if partition.bounded != partitioned:
+                await self._repartition(conn, partition)
+
+    async def _ensure_partition(self, conn: AsyncConnection, ms: int) -> Partition:
+        partition = self.partitions.find(ms)
+        if partition is not None:
+            return partition
+        partition = self.partitions.plan(ms)
+        await conn.run_sync(sample_table(partition.name).create, checkfirst=True)
+        await conn.execute(
+            _CATALOG.insert().values(
+                name=partition.name, start_ms=partition.start_ms, end_ms=partition.end_ms
+            )
+        )
+        self.partitions.add(partition)
+        return partition
+
+    async def _drop_partition(self, conn: AsyncConnection, partition: Partition) -> None:
+        if partition in self.partitions:
+            self.partitions.remove(partition)
+        await conn.exec_driver_sql(f"DROP TABLE IF EXISTS {partition.name}")
+        await conn.execute(_CATALOG.delete().where(_CATALOG.c.name == partition.name))
+        sample_metadata.remove(sample_table(partition.name))
+
+    async def _repartition(self, conn: AsyncConnection, source: Partition) -> None:
+        """Move the rows of a table written under another span into current partitions."""
+        table = sample_table(source.name)
+        span = self.partitions.span_ms
+        if span is None:
+            ranges = [(MIN_MS, MAX_MS)]
+        else:
+            ms = type_coerce(table.c.timestamp_utc, Integer)
+            bucket = ms - ms % span
+            starts = (await conn.execute(select(distinct(bucket)).order_by(bucket))).scalars()
+            ranges = [(start, start + span) for start in starts]
+        for low, high in ranges:
+            while low < high:
+                target = await self._ensure_partition(conn, low)
+                upper = min(target.end_ms, high)
+                columns = [table.c[name] for name in _SAMPLE_COLUMNS]
+                await conn.execute(
+                    sample_table(target.name)
+                    .insert()
+                    .from_select(
+                        list(_SAMPLE_COLUMNS),
+                        select(*columns)
+                        .where(table.c.timestamp_utc >= low, table.c.timestamp_utc < upper)
+                        .order_by(table.c.id),
+                    )
+                )
+                low = upper
+        await self._drop_partition(conn, source)
+
+    async def _migrate_legacy(self, chunk_rows: int) -> int:
+        """Move the pre-series ``measurements`` table into sample partitions; returns the rows.
+
+        Each transaction copies at most ``chunk_rows`` rows, oldest rowid first, and deletes
+        them from the legacy table, so an interrupted migration resumes where it stopped.
+        """
+        assert self._engine is not None
+        async with self._engine.begin() as conn:
+            await conn.exec_driver_sql(_LEGACY_SERIES_SQL)
+        moved = 0
+        while True:
+            async with self._engine.begin() as conn:
+                rows = (await conn.exec_driver_sql(_LEGACY_CHUNK_SQL, (chunk_rows,))).fetchall()
+                if not rows:
+                    await conn.exec_driver_sql("DROP TABLE measurements")
+                    return moved
+                groups: Dict[str, List[Tuple[Any, ...]]] = {}
+                for row in rows:
+                    partition = await self._ensure_partition(conn, row[2])
+                    groups.setdefault(partition.name, []).append(tuple(row[1:]))
+                for name, params in groups.items():
+                    await conn.exec_driver_sql(_SAMPLES_INSERT_SQL.format(name), params)
+                # Also clears rows whose series could not be matched, as the copy skips them.
+                await conn.exec_driver_sql("DELETE FROM measurements WHERE id <= ?", (rows[-1][0],))
+            moved += len(rows)
+
+    async def _partition_for(self, timestamp: datetime) -> Partition:
+        ms = epoch_ms(timestamp)
+        partition = self.partitions.find(ms)
+        if partition is not None:
+            return partition
+        if self._engine is None:
+            raise RuntimeError("Database not connected")
+        async with self._partition_lock, self._engine.begin() as conn:
+            return await self._ensure_partition(conn, ms)
+
+    def _remember(
+        self, series_id: int, plant_id: str, device_id: str, metric: str, unit: str, source: str
+    ) -> None:
+        key = (plant_id, device_id, metric, unit or None)
+        self._series_ids[key] = series_id
+        self._series[series_id] = SeriesInfo(plant_id, device_id, metric, unit or None, source)
+
+    async def _load_series(self) -> None:
         async with self.session() as session:
-            session.add_all(
-                [
-                    MeasurementRecord(
-                        timestamp_utc=m.timestamp_utc,
-                        plant_id=m.plant_id,
-                        device_id=m.device_id,
-                        metric=m.metric,
-                        value=m.value,
-                        unit=m.unit,
-                        quality=m.quality.value,
-                        source=m.source,
-                        raw=m.raw,
+            for row in (await session.execute(select(SeriesRecord))).scalars():
+                self._remember(
+                    row.id, row.plant_id, row.device_id, row.metric, row.unit, row.source
+                )
+
+    async def series_ids(self, keys: Sequence[SeriesKey], source: str) -> List[int]:
+        """Integer ids for ``(plant, device, metric, unit)`` keys, creating missing series."""
+        missing = [key for key in dict.fromkeys(keys) if key not in self._series_ids]
+        if missing and self.writer is not None:
+            rows = [
+                (plant, device, metric, unit or "", source)
+                for plant, device, metric, unit in missing
+            ]
+            created = await self.writer.run(lambda conn: _create_series(conn, rows))
+            for series_id, row in zip(created, rows):
+                self._remember(series_id, *row)
+        elif missing:
+            async with self.session() as session:
+                await session.execute(
+                    sqlite_insert(SeriesRecord)
+                    .values(
+                        [
+                            {
+                                "plant_id": plant_id,
+                                "device_id": device_id,
+                                "metric": metric,
+                                "unit": unit or "",
+                                "source": source,
+                            }
+                            for plant_id, device_id, metric, unit in missing
+                        ]
+                    )
+                    .on_conflict_do_nothing()
+                )
+                await session.commit()
+                for plant_id, device_id, metric, unit in missing:
+                    record = (
+                        await session.execute(
+                            select(SeriesRecord).where(
+                                SeriesRecord.plant_id == plant_id,
+                                SeriesRecord.device_id == device_id,
+                                SeriesRecord.metric == metric,
+                                SeriesRecord.unit == (unit or ""),
+                            )
+                        )
+                    ).scalar_one()
+                    self._remember(
+                        record.id,
+                        record.plant_id,
+                        record.device_id,
+                        record.metric,
+                        record.unit,
+                        record.source,
                     )
-                    for m in measurements
-                ]
+        return [self._series_ids[key] for key in keys]
+
+    async def _batch_series_ids(self, batch: MeasurementBatch) -> List[int]:
+        """Series id per batch metric id, resolved once per driver point table."""
+        cached = self._batch_series.get((batch.plant_id, batch.device_id))
+        if cached is not None and cached[0] is batch.metrics:
+            return cached[1]
+        ids = await self.series_ids(
+            [
+                (batch.plant_id, batch.device_id, metric, unit)
+                for metric, unit in zip(batch.metrics, batch.units)
+            ],
+            batch.source,
+        )
+        self._batch_series[(batch.plant_id, batch.device_id)] = (batch.metrics, ids)
+        return ids
+
+    def _raw(self, m: Measurement) -> dict | None:
+        if self.raw_registers == "all" or (
+            self.raw_registers == "non_good" and QUALITY_CODES[m.quality] != GOOD_CODE
+        ):
+            return m.raw
+        return None
+
+    async def insert_measurements(self, measurements: Sequence[Measurement]) -> None:
+        if not measurements:
+            return
+        series = await self.series_ids(
+            [(m.plant_id, m.device_id, m.metric, m.unit) for m in measurements],
+            measurements[0].source,
+        )
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for series_id, m in zip(series, measurements):
+            partition = await self._partition_for(m.timestamp_utc)
+            groups.setdefault(partition.name, []).append(
+                {
+                    "series_id": series_id,
+                    "timestamp_utc": m.timestamp_utc,
+                    "value": m.value,
+                    "quality": QUALITY_CODES[m.quality],
+                    "raw": self._raw(m),
+                }
             )
-            await session.commit()
+        await self._insert_rows(groups)
 
-    async def latest_measurements(self, since: datetime | None = None) -> list[MeasurementRecord]:
-        async with self.session() as session:
-            stmt = (
-                select(MeasurementRecord)
-                .order_by(MeasurementRecord.timestamp_utc.desc())
-                .limit(500)
+    async def _batch_rows(self, batch: MeasurementBatch) -> List[Dict[str, Any]]:
+        mode = self.raw_registers
+        raw = batch.raw if mode != "none" else {}
+        series = await self._batch_series_ids(batch)
+        timestamp = batch.timestamp_utc
+        return [
+            {
+                "series_id": series[metric_id],
+                "timestamp_utc": timestamp,
+                "value": value,
+                "quality": quality,
+                "raw": (
+                    {"registers": raw[metric_id]}
+                    if metric_id in raw and (mode == "all" or quality != GOOD_CODE)
+                    else None
+                ),
+            }
+            for metric_id, value, quality in zip(batch.ids, batch.values, batch.qualities)
+        ]
+
+    async def _insert_rows(self, groups: Dict[str, List[Dict[str, Any]]]) -> int:
+        """Insert rows grouped by partition name in one transaction."""
+        total = sum(len(rows) for rows in groups.values())
+        if not total:
+            return 0
+        if self.writer is not None:
+            statements = [
+                (_SAMPLES_INSERT_SQL.format(name), [_sample_params(r) for r in rows])
+                for name, rows in groups.items()
+            ]
+            await self.writer.run(
+                lambda conn: [conn.executemany(sql, params) for sql, params in statements],
+                rows=total,
             )
-            if since:
-                stmt = stmt.where(MeasurementRecord.timestamp_utc >= since)
-            result = await session.execute(stmt)
-            return list(result.scalars())
+            return total
+        if self._engine is None:
+            raise RuntimeError("Database not connected")
+        # One Core executemany per partition in one transaction; no ORM identity map.
+        async with self._engine.begin() as conn:
+            for name, rows in groups.items():
+                await conn.execute(sample_table(name).insert(), rows)
+        return total
+
+    async def insert_batch(self, batch: MeasurementBatch) -> None:
+        """Store one columnar poll batch."""
+        await self.insert_batches([batch])
+
+    async def insert_batches(self, batches: Sequence[MeasurementBatch]) -> int:
+        """Store several poll batches with a single executemany; returns the row count."""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for batch in batches:
+            partition = await self._partition_for(batch.timestamp_utc)
+            groups.setdefault(partition.name, []).extend(await self._batch_rows(batch))
+        return await self._insert_rows(groups)
+
+    def _records(self, rows: Sequence[Any]) -> list[MeasurementRecord]:
+        series = self._series
+        return [
+            MeasurementRecord(r.timestamp_utc, r.value, r.quality, r.raw, series[r.series_id])
+            for r in rows
+        ]
+
+    async def _select_samples(
+        self,
+        where: Callable[[Table], List[ColumnElement[bool]]],
+        since: datetime | None,
+        limit: int,
+    ) -> list[MeasurementRecord]:
+        """Newest samples first, visiting partitions newest first until ``limit`` is met."""
+        since_ms = epoch_ms(since) if since else None
+        records: list[MeasurementRecord] = []
+        async with self.read_session() as session:
+            for partition in self.partitions.between(since_ms):
+                table = sample_table(partition.name)
+                stmt = select(*[table.c[name] for name in _SAMPLE_COLUMNS]).where(*where(table))
+                if since_ms is not None:
+                    stmt = stmt.where(table.c.timestamp_utc >= since_ms)
+                stmt = stmt.order_by(table.c.timestamp_utc.desc()).limit(limit - len(records))
+                records.extend(self._records((await session.execute(stmt)).all()))
+                if len(records) >= limit:
+                    break
+        return records
+
+    async def latest_measurements(self, since: datetime | None = None) -> list[MeasurementRecord]:
+        return await self._select_samples(lambda table: [], since, 500)
 
     async def measurements_for_device(
         self,
@@ -120,15 +659,16 @@ class Database:
         since: datetime | None = None,
         limit: int = 500,
     ) -> list[MeasurementRecord]:
-        async with self.session() as session:
-            stmt = select(MeasurementRecord).where(MeasurementRecord.device_id == device_id)
-            if metric:
-                stmt = stmt.where(MeasurementRecord.metric == metric)
-            if since:
-                stmt = stmt.where(MeasurementRecord.timestamp_utc >= since)
-            stmt = stmt.order_by(MeasurementRecord.timestamp_utc.desc()).limit(limit)
-            result = await session.execute(stmt)
-            return list(result.scalars())
+        series_ids = [
+            series_id
+            for key, series_id in self._series_ids.items()
+            if key[1] == device_id and (metric is None or key[2] == metric)
+        ]
+        if not series_ids:
+            return []
+        return await self._select_samples(
+            lambda table: [table.c.series_id.in_(series_ids)], since, limit
+        )
 
     async def enqueue_uplink(
         self, payload: dict[str, Any], ts_start: datetime, ts_end: datetime
@@ -159,13 +699,143 @@ class Database:
             record.delivered = True
             await session.commit()
 
-    async def purge_old_measurements(self, retention_days: int) -> None:
+    async def purge_old_measurements(
+        self,
+        retention_days: int,
+        chunk_rows: int = PURGE_CHUNK_ROWS,
+        pause_s: float = MAINTENANCE_PAUSE_S,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """Drop partitions older than the cutoff and trim the one that straddles it.
+
+        The trim deletes at most ``chunk_rows`` rows per transaction, oldest rowid first, and
+        sleeps ``pause_s`` between chunks so ingest commits can interleave. ``on_progress``
+        receives the running totals after the partition drop and after every chunk.
+        """
+        if self._engine is None:
+            raise RuntimeError("Database not connected")
+        started = time.monotonic()
         cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
-        async with self.session() as session:
-            await session.execute(
-                MeasurementRecord.__table__.delete().where(MeasurementRecord.timestamp_utc < cutoff)
+        cutoff_ms = epoch_ms(cutoff)
+        report = on_progress or (lambda progress: None)
+        progress: Dict[str, Any] = {
+            "state": "purging",
+            "cutoff_utc": cutoff.isoformat(),
+            "partitions_dropped": 0,
+            "rows_deleted": 0,
+            "chunks": 0,
+            "purge_s": 0.0,
+        }
+        async with self._partition_lock:
+            expired, straddling = self.partitions.expired(cutoff_ms)
+            if expired:
+                async with self._engine.begin() as conn:
+                    for partition in expired:
+                        await self._drop_partition(conn, partition)
+                progress["partitions_dropped"] = len(expired)
+                report(dict(progress))
+        if straddling is not None:
+            table = sample_table(straddling.name)
+            oldest = (
+                select(table.c.id)
+                .where(table.c.timestamp_utc < cutoff_ms)
+                .order_by(table.c.id)
+                .limit(chunk_rows)
             )
-            await session.commit()
+            while True:
+                async with self._engine.begin() as conn:
+                    result = await conn.execute(table.delete().where(table.c.id.in_(oldest)))
+                progress["rows_deleted"] += result.rowcount
+                progress["chunks"] += 1
+                progress["purge_s"] = time.monotonic() - started
+                report(dict(progress))
+                if result.rowcount < chunk_rows:
+                    break
+                await asyncio.sleep(pause_s)
+        progress["state"] = "purged"
+        progress["purge_s"] = time.monotonic() - started
+        report(dict(progress))
+        return progress
+
+    async def vacuum(
+        self,
+        step_pages: int = VACUUM_STEP_PAGES,
+        pause_s: float = MAINTENANCE_PAUSE_S,
+        convert: bool = False,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """Return free pages to the filesystem, then checkpoint and truncate the WAL.
+
+        Runs ``PRAGMA incremental_vacuum`` in steps of ``step_pages``, yielding between steps.
+        A file created before incremental auto-vacuum was enabled only gets the checkpoint,
+        unless ``convert`` is set: it is then switched over with one full ``VACUUM``, which
+        rewrites the whole file and blocks writers while it runs. ``on_progress`` receives
+        the pages freed so far after every step.
+        """
+        if self._engine is None:
+            raise RuntimeError("Database not connected")
+        report = on_progress or (lambda progress: None)
+        started = time.monotonic()
+        async with self._engine.connect() as conn:
+
+            async def pragma(statement: str) -> Any:
+                return (await conn.exec_driver_sql(statement)).fetchall()
+
+            mode = (await pragma("PRAGMA auto_vacuum"))[0][0]
+            page_size = (await pragma("PRAGMA page_size"))[0][0]
+            free_before = free = (await pragma("PRAGMA freelist_count"))[0][0]
+            driver = (await conn.get_raw_connection()).driver_connection
+            assert driver is not None
+            converted = convert and AUTO_VACUUM_MODES[mode] != "incremental"
+            report({"state": "converting" if converted else "vacuuming", "free_pages": free})
+            if converted:
+                await driver.executescript("PRAGMA auto_vacuum=INCREMENTAL; VACUUM;")
+                mode = (await pragma("PRAGMA auto_vacuum"))[0][0]
+                free = (await pragma("PRAGMA freelist_count"))[0][0]
+            while free and AUTO_VACUUM_MODES[mode] == "incremental":
+                # execute() steps this pragma once, freeing a single page; a script runs it
+                # to completion.
+                await driver.executescript(f"PRAGMA incremental_vacuum({step_pages});")
+                remaining = (await pragma("PRAGMA freelist_count"))[0][0]
+                if remaining >= free:
+                    break
+                free = remaining
+                report(
+                    {
+                        "state": "vacuuming",
+                        "pages_freed": free_before - free,
+                        "free_pages": free,
+                        "vacuum_s": time.monotonic() - started,
+                    }
+                )
+                await asyncio.sleep(pause_s)
+            busy, wal_pages, checkpointed = (await pragma("PRAGMA wal_checkpoint(TRUNCATE)"))[0]
+            await conn.commit()
+        stats = {
+            "auto_vacuum": AUTO_VACUUM_MODES[mode],
+            "converted": converted,
+            "pages_freed": free_before - free,
+            "bytes_freed": (free_before - free) * page_size,
+            "free_pages": free,
+            "checkpoint_busy": bool(busy),
+            "wal_pages": wal_pages,
+            "wal_pages_checkpointed": checkpointed,
+            "vacuum_s": time.monotonic() - started,
+        }
+        report({"state": "idle", **stats})
+        return stats
 
 
-__all__ = ["Database", "MeasurementRecord", "UplinkQueueRecord"]
+__all__ = [
+    "AUTO_VACUUM_MODES",
+    "WRITERS",
+    "Database",
+    "MeasurementRecord",
+    "PartitionRecord",
+    "ProgressCallback",
+    "SeriesInfo",
+    "SeriesRecord",
+    "UplinkQueueRecord",
+    "epoch_ms",
+    "sample_table",
+]
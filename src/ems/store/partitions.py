@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+
+UNPARTITIONED = "samples"
+# Range of the single table used when partitioning is off; wider than any real timestamp.
+MIN_MS = -(2**62)
+MAX_MS = 2**62
+
+
+@dataclass(frozen=True, slots=True)
+class Partition:
+    """One sample table holding timestamps in ``[start_ms, end_ms)``."""
+
+    name: str
+    start_ms: int
+    end_ms: int
+
+    @property
+    def bounded(self) -> bool:
+        return self.start_ms > MIN_MS or self.end_ms < MAX_MS
+
+
+def partition_name(start_ms: int) -> str:
+    start = datetime.fromtimestamp(start_ms / 1000, timezone.utc)
+    if start.hour == start.minute == start.second == 0:
+        return f"samples_{start:%Y%m%d}"
+    return f"samples_{start:%Y%m%d_%H%M%S}"
+
+
+class PartitionCatalog:
+    """Non-overlapping sample partitions sorted by time, with routing helpers.
+
+    With ``span_ms`` set, a timestamp outside every partition gets a new one aligned to a
+    multiple of the span since the epoch, trimmed so it never overlaps a neighbour (which
+    only happens after the span was changed). Without a span everything lives in the single
+    :data:`UNPARTITIONED` table.
+    """
+
+    def __init__(self, span_ms: Optional[int], partitions: Iterable[Partition] = ()) -> None:
+        if span_ms is not None and span_ms <= 0:
+            raise ValueError("partition span must be positive")
+        self.span_ms = span_ms
+        self._partitions: List[Partition] = sorted(partitions, key=lambda p: p.start_ms)
+        self._starts = [p.start_ms for p in self._partitions]
+
+    def __iter__(self):  # type: ignore[no-untyped-def]
+        return iter(list(self._partitions))
+
+    def __len__(self) -> int:
+        return len(self._partitions)
+
+    def add(self, partition: Partition) -> None:
+        index = bisect.bisect(self._starts, partition.start_ms)
+        self._partitions.insert(index, partition)
+        self._starts.insert(index, partition.start_ms)
+
+    def remove(self, partition: Partition) -> None:
+        index = self._partitions.index(partition)
+        del self._partitions[index]
+        del self._starts[index]
+
+    def find(self, ms: int) -> Optional[Partition]:
+        index = bisect.bisect(self._starts, ms) - 1
+        if index >= 0 and ms < self._partitions[index].end_ms:
+            return self._partitions[index]
+        return None
+
+    def plan(self, ms: int) -> Partition:
+        """The partition a new row at ``ms`` belongs in; not yet added to the catalog."""
+        if self.span_ms is None:
+            return Partition(UNPARTITIONED, MIN_MS, MAX_MS)
+        start = ms - ms % self.span_ms
+        end = start + self.span_ms
+        index = bisect.bisect(self._starts, ms)
+        if index > 0:
+            start = max(start, self._partitions[index - 1].end_ms)
+        if index < len(self._partitions):
+            end = min(end, self._partitions[index].start_ms)
+        return Partition(partition_name(start), start, end)
+
+    def between(self, since_ms: Optional[int] = None) -> List[Partition]:
+        """Partitions that may hold rows at or after ``since_ms``, newest first."""
+        return [p for p in reversed(self._partitions) if since_ms is None or p.end_ms > since_ms]
+
+    def expired(self, cutoff_ms: int) -> Tuple[List[Partition], Optional[Partition]]:
+        """Partitions entirely older than ``cutoff_ms``, and the one straddling it."""
+        whole = [p for p in self._partitions if p.end_ms <= cutoff_ms]
+        return whole, self.find(cutoff_ms)
+
+
+__all__ = [
+    "MAX_MS",
+    "MIN_MS",
+    "UNPARTITIONED",
+    "Partition",
+    "PartitionCatalog",
+    "partition_name",
+]
@@ -161,6 +161,13 @@ class ProtocolConnectionConfig(BaseModel):
     unit_id: Optional[int] = 1
     word_order: Optional[str] = "big"  # big, little
     byte_order: Optional[str] = "big"  # big, little
+    max_read_gap: Optional[int] = 0  # unmapped registers bridged when coalescing reads
+    max_read_registers: Optional[int] = 125  # per-request register limit (PDU max 125)
+    max_connections_per_gateway: Optional[int] = 2  # pooled sockets shared per host:port
+    pipeline_depth: Optional[int] = 1  # outstanding Modbus TCP transactions per socket
+    modbus_transport: Optional[str] = "pymodbus"  # pymodbus, native (built-in TCP/RTU codec)
+    breaker_failure_threshold: Optional[int] = 3  # consecutive failures that open the circuit
+    breaker_reset_s: Optional[float] = 30.0  # open time before a half-open probe
     
     # MQTT specific
     topic_prefix: Optional[str] = None
@@ -228,9 +235,12 @@ class DeviceConfig(BaseModel):
     protocol: ProtocolType  # Changed from str to ProtocolType enum 
     connection: ProtocolConnectionConfig = Field(default_factory=ProtocolConnectionConfig)  # Enhanced connection config
     poll_interval_s: int = 60
+    poll_classes: Dict[str, int] = Field(default_factory=dict)  # fast, normal, slow, on_change -> interval (s)
     timeout_ms: int = 2000  # Kept for backward compatibility
     retries: int = 3  # Kept for backward compatibility
     point_map: str | None = None
+    decode_backend: str = "auto"  # auto, python, numpy (vectorised register-block decoding)
+    unchanged_keepalive_s: Optional[int] = None  # skip unchanged register blocks, re-store after N s
     control_capabilities: ControlCapabilities = Field(default_factory=ControlCapabilities)  # Legacy
     capabilities: EnhancedCapabilities = Field(default_factory=EnhancedCapabilities)  # New enhanced capabilities
     profile_id: Optional[str] = None  # Reference to device profile
@@ -241,6 +251,13 @@ class DeviceConfig(BaseModel):
         if value < 5:
             raise ValueError("poll_interval_s must be >= 5 seconds")
         return value
+
+    @validator("poll_classes")
+    def _min_class_poll(cls, value: Dict[str, int]) -> Dict[str, int]:
+        for name, interval in value.items():
+            if interval < 1:
+                raise ValueError(f"poll_classes.{name} must be >= 1 second")
+        return value
     
     @validator("timeout_ms", pre=True)
     def _sync_timeout(cls, value: int, values: Dict[str, Any]) -> int:
@@ -276,6 +293,15 @@ class ExportConfig(BaseModel):
 class StorageConfig(BaseModel):
     sqlite_path: str
     retention_days: int = 30
+    maintenance_hour_utc: int = 0  # quiet hour for retention, incremental vacuum and checkpoint
+    purge_chunk_rows: int = 5000  # retention deletes at most this many rows per transaction
+    convert_auto_vacuum: bool = False  # one full VACUUM to enable incremental vacuum on old files
+    raw_registers: str = "non_good"  # non_good, all (debug), none: which rows keep raw registers
+    flush_interval_ms: int = 1000  # write-behind group commit: at most one commit per interval
+    flush_rows: int = 5000  # ...or as soon as this many rows are waiting
+    buffer_max_rows: int = 50000  # pollers wait once this many rows are uncommitted
+    writer: str = "thread"  # thread: dedicated sqlite3 writer thread; aiosqlite: engine writes
+    partition_span_s: Optional[int] = 86400  # one sample table per span; null: a single table
     export_parquet_dir: str
     export_interval_s: int = 3600
 
@@ -2,17 +2,17 @@ from __future__ import annotations
 
 import logging
 import os
-from logging import Logger
 from typing import Any
 
 import json
 import structlog
+from structlog.typing import FilteringBoundLogger
 
 DEFAULT_LOG_LEVEL = "INFO"
 LOG_PATH = os.environ.get("EMS_LOG_PATH", "/var/log/ems/ems.jsonl")
 
 
-def setup_logging(level: str = DEFAULT_LOG_LEVEL, json_output: bool = True) -> Logger:
+def setup_logging(level: str = DEFAULT_LOG_LEVEL, json_output: bool = True) -> FilteringBoundLogger:
     log_level = getattr(logging, level.upper(), logging.INFO)
     logging.basicConfig(level=log_level)
     processors: list[structlog.types.Processor] = [
@@ -28,7 +28,8 @@ def setup_logging(level: str = DEFAULT_LOG_LEVEL, json_output: bool = True) -> L
         wrapper_class=structlog.make_filtering_bound_logger(log_level),
         logger_factory=structlog.stdlib.LoggerFactory(),
     )
-    return structlog.get_logger()
+    logger: FilteringBoundLogger = structlog.get_logger()
+    return logger
 
 
 def _json_renderer(logger: Any, name: str, event_dict: dict[str, Any]) -> str:
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -31,6 +31,127 @@ class Measurement(BaseModel):
         json_encoders = {datetime: lambda dt: dt.isoformat()}
 
 
+# Compact quality codes used by batches and storage; the enum stays the API-facing form.
+QUALITY_CODES: Dict[Quality, int] = {Quality.GOOD: 0, Quality.BAD: 1, Quality.UNCERTAIN: 2}
+QUALITIES: Tuple[Quality, ...] = tuple(QUALITY_CODES)
+GOOD_CODE = QUALITY_CODES[Quality.GOOD]
+BAD_CODE = QUALITY_CODES[Quality.BAD]
+
+
+class MeasurementBatch:
+    """One poll of one device, stored as parallel columns.
+
+    The batch shares one timestamp and refers to metrics by index into ``metrics``/``units``,
+    tables a driver builds once and reuses for every poll. Each row is a metric id, a value
+    and a quality code; raw registers are kept sparsely by metric id. ``Measurement`` objects
+    are only built at the API boundary via ``to_measurements()``.
+    """
+
+    __slots__ = (
+        "timestamp_utc",
+        "plant_id",
+        "device_id",
+        "source",
+        "metrics",
+        "units",
+        "ids",
+        "values",
+        "qualities",
+        "raw",
+    )
+
+    def __init__(
+        self,
+        timestamp_utc: datetime,
+        plant_id: str,
+        device_id: str,
+        source: str,
+        metrics: Sequence[str],
+        units: Sequence[Optional[str]],
+    ) -> None:
+        self.timestamp_utc = timestamp_utc
+        self.plant_id = plant_id
+        self.device_id = device_id
+        self.source = source
+        self.metrics = metrics
+        self.units = units
+        self.ids: List[int] = []
+        self.values: List[Optional[float]] = []
+        self.qualities = bytearray()
+        self.raw: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(
+        self, metric_id: int, value: Optional[float], quality: int, raw: Optional[List[int]] = None
+    ) -> None:
+        self.ids.append(metric_id)
+        self.values.append(value)
+        self.qualities.append(quality)
+        if raw is not None:
+            self.raw[metric_id] = raw
+
+    def take(self, positions: Iterable[int]) -> MeasurementBatch:
+        """A batch with only the rows at ``positions``, sharing this batch's metric tables."""
+        batch = MeasurementBatch(
+            self.timestamp_utc, self.plant_id, self.device_id, self.source, self.metrics, self.units
+        )
+        for position in positions:
+            metric_id = self.ids[position]
+            batch.append(
+                metric_id, self.values[position], self.qualities[position], self.raw.get(metric_id)
+            )
+        return batch
+
+    def to_measurements(self) -> List[Measurement]:
+        """Materialise pydantic measurements, in metric-table order."""
+        rows = sorted(range(len(self.ids)), key=self.ids.__getitem__)
+        measurements = []
+        for position in rows:
+            metric_id = self.ids[position]
+            raw = self.raw.get(metric_id)
+            measurements.append(
+                Measurement(
+                    timestamp_utc=self.timestamp_utc,
+                    plant_id=self.plant_id,
+                    device_id=self.device_id,
+                    metric=self.metrics[metric_id],
+                    value=self.values[position],
+                    unit=self.units[metric_id],
+                    quality=QUALITIES[self.qualities[position]],
+                    source=self.source,
+                    raw={"registers": raw} if raw is not None else None,
+                )
+            )
+        return measurements
+
+    @classmethod
+    def from_measurements(
+        cls,
+        measurements: Sequence[Measurement],
+        timestamp_utc: datetime,
+        plant_id: str,
+        device_id: str,
+        source: str,
+    ) -> MeasurementBatch:
+        """Adapt a driver that still returns ``Measurement`` lists."""
+        if measurements:
+            timestamp_utc = measurements[0].timestamp_utc
+        batch = cls(
+            timestamp_utc,
+            plant_id,
+            device_id,
+            source,
+            [m.metric for m in measurements],
+            [m.unit for m in measurements],
+        )
+        for metric_id, m in enumerate(measurements):
+            raw = m.raw.get("registers") if m.raw else None
+            batch.append(metric_id, m.value, QUALITY_CODES[m.quality], raw)
+        return batch
+
+
 class ControlResult(BaseModel):
     accepted: bool
     message: str
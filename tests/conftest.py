@@ -1,4 +1,14 @@
+import os
 import sys
 from pathlib import Path
 
+import pytest
+
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _pointmap_cache_dir(tmp_path_factory):
+    """Keep compiled point-map caches out of the user's home directory."""
+    os.environ.setdefault("EMS_POINTMAP_CACHE_DIR", str(tmp_path_factory.mktemp("pointmaps")))
+    yield
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from ems.drivers.generic_modbus import GenericModbusDriver
+from ems.io.breaker import BreakerState, CircuitBreaker, CircuitOpenError
+from ems.io.mbap import ModbusExceptionResponse
+from ems.io.modbus import ModbusReadError, ModbusTCPClient
+from ems.utils.config import DeviceConfig
+from ems.utils.models import Quality
+
+
+def test_breaker_opens_then_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=0.0)
+    breaker.record_failure()
+    assert breaker.state is BreakerState.CLOSED
+    breaker.record_failure()
+    assert breaker._state is BreakerState.OPEN
+    assert breaker.before_request() is True  # reset elapsed: this caller is the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.trips == 1
+
+
+def test_failed_probe_doubles_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=10.0)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker._state = BreakerState.HALF_OPEN
+    breaker.record_failure()
+    assert breaker._state is BreakerState.OPEN
+    assert breaker._current_reset_s == 20.0
+
+
+class DeadTCPClient(ModbusTCPClient):
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.attempts = []
+
+    async def _transact(self, fc, address, count, admit):
+        admit()
+        self.attempts.append((fc, address, count))
+        raise TimeoutError()
+
+
+class PartialTCPClient(ModbusTCPClient):
+    """Answers FC3 and rejects FC4 with an illegal-address exception reply."""
+
+    async def _transact(self, fc, address, count, admit):
+        admit()
+        if fc == 4:
+            raise ModbusExceptionResponse(fc, 2)
+        return [0] * count
+
+
+def make_config(tmp_path, device_id, host):
+    pointmap = tmp_path / "map.yaml"
+    pointmap.write_text(
+        """
+points:
+  - {name: A, fc: 3, address: 0, type: float, count: 2}
+  - {name: B, fc: 4, address: 0, type: uint16, count: 1}
+"""
+    )
+    return DeviceConfig.model_validate(
+        {
+            "id": device_id,
+            "plant_id": "plant",
+            "type": "generic_modbus",
+            "make": "X",
+            "model": "Y",
+            "protocol": "modbus_tcp",
+            "connection": {"host": host, "breaker_failure_threshold": 2},
+            "point_map": str(pointmap),
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_dead_device_yields_bad_quality_and_fails_fast(tmp_path):
+    device_config = make_config(tmp_path, "dead", "10.255.0.1")
+    client = DeadTCPClient(device_config.connection)
+    driver = GenericModbusDriver(device_config, client=client)
+    first = await driver.read_points()
+    assert [m.quality for m in first] == [Quality.BAD, Quality.BAD]
+    assert all(m.value is None for m in first)
+    assert client.breaker.state is BreakerState.OPEN
+    second = await driver.read_points()
+    assert [m.quality for m in second] == [Quality.BAD, Quality.BAD]
+    assert len(client.attempts) == 2  # the open circuit never touched the wire
+
+
+@pytest.mark.asyncio
+async def test_exception_replies_do_not_trip_the_breaker(tmp_path):
+    config = make_config(tmp_path, "partial", "10.255.0.2")
+    client = PartialTCPClient(config.connection)
+    driver = GenericModbusDriver(config, client=client)
+    for _ in range(3):
+        points = await driver.read_points()
+        assert [m.quality for m in points] == [Quality.GOOD, Quality.BAD]
+    assert client.breaker.state is BreakerState.CLOSED and client.breaker.trips == 0
+
+
+class SlotTCPClient(DeadTCPClient):
+    """A dead device behind a single connection slot: each read waits for the previous one."""
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.slot = asyncio.Lock()
+
+    async def _transact(self, fc, address, count, admit):
+        async with self.slot:
+            await asyncio.sleep(0.001)
+            return await super()._transact(fc, address, count, admit)
+
+
+@pytest.mark.asyncio
+async def test_queued_reads_stop_once_the_breaker_opens(tmp_path):
+    config = make_config(tmp_path, "queued", "10.255.0.3")
+    client = SlotTCPClient(config.connection)
+    results = await asyncio.gather(
+        *(client.read(3, 10 * n, 2) for n in range(20)), return_exceptions=True
+    )
+    assert all(isinstance(r, ModbusReadError) for r in results)
+    assert len(client.attempts) == 2  # the threshold; the other 18 never reached the wire
+    assert sum(isinstance(r, CircuitOpenError) for r in results) == 18
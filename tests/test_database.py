@@ -0,0 +1,344 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from ems.store import database
+from ems.store.database import Database
+from ems.store.partitions import Partition, PartitionCatalog
+from ems.store.writer import SQLiteWriter
+from ems.utils.models import QUALITY_CODES, MeasurementBatch, Quality
+
+GOOD = QUALITY_CODES[Quality.GOOD]
+
+
+def batch_at(timestamp, device_id="dev", value=1.0):
+    batch = MeasurementBatch(timestamp, "plant", device_id, "test", ("AC_P", "DC_V"), ("kW", "V"))
+    batch.append(0, value, GOOD, None)
+    batch.append(1, value * 2, GOOD, None)
+    return batch
+
+
+@pytest.mark.asyncio
+async def test_series_are_interned_once_and_reloaded(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    db = Database(path)
+    await db.connect()
+    now = datetime.now(timezone.utc)
+    await db.insert_batch(batch_at(now))
+    await db.insert_batch(batch_at(now + timedelta(seconds=5), value=3.0))
+    ids = await db.series_ids([("plant", "dev", "AC_P", "kW"), ("plant", "dev", "DC_V", "V")], "x")
+    assert len(set(ids)) == 2
+
+    reopened = Database(path)
+    await reopened.connect()
+    assert await reopened.series_ids([("plant", "dev", "AC_P", "kW")], "x") == ids[:1]
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM series").fetchone() == (2,)
+        assert conn.execute("SELECT COUNT(*) FROM samples").fetchone() == (4,)
+
+
+@pytest.mark.asyncio
+async def test_device_queries_filter_by_series(tmp_path):
+    db = Database(str(tmp_path / "db.sqlite"))
+    await db.connect()
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    await db.insert_batch(batch_at(now - timedelta(minutes=10)))
+    await db.insert_batch(batch_at(now, value=5.0))
+    await db.insert_batch(batch_at(now, device_id="other"))
+
+    records = await db.measurements_for_device("dev", metric="AC_P")
+    assert [(r.device_id, r.metric, r.value) for r in records] == [
+        ("dev", "AC_P", 5.0),
+        ("dev", "AC_P", 1.0),
+    ]
+    assert records[0].timestamp_utc == now
+    recent = await db.measurements_for_device("dev", since=now - timedelta(minutes=1))
+    assert {r.metric for r in recent} == {"AC_P", "DC_V"}
+    assert await db.measurements_for_device("missing") == []
+
+
+@pytest.mark.asyncio
+async def test_legacy_measurements_table_is_migrated(tmp_path):
+    path = tmp_path / "db.sqlite"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE measurements (id INTEGER PRIMARY KEY, timestamp_utc DATETIME,"
+            " plant_id VARCHAR, device_id VARCHAR, metric VARCHAR, value FLOAT, unit VARCHAR,"
+            " quality VARCHAR, source VARCHAR, raw JSON)"
+        )
+        conn.executemany(
+            "INSERT INTO measurements (timestamp_utc, plant_id, device_id, metric, value, unit,"
+            " quality, source, raw) VALUES (?, 'plant', 'dev', ?, ?, ?, ?, 'modbus', ?)",
+            [
+                ("2024-05-01 12:00:00.250000", "AC_P", 10.0, "kW", "GOOD", None),
+                ("2024-05-01 12:00:05.000000", "AC_P", 11.0, "kW", "GOOD", None),
+                ("2024-05-01 12:00:06.000000", "STATE", None, None, "BAD", '{"registers": [1]}'),
+            ],
+        )
+    db = Database(str(path))
+    await db.connect()
+    records = await db.measurements_for_device("dev")
+    assert [(r.metric, r.value, r.unit, r.quality) for r in records[1:]] == [
+        ("AC_P", 11.0, "kW", "GOOD"),
+        ("AC_P", 10.0, "kW", "GOOD"),
+    ]
+    assert records[0].raw == {"registers": [1]} and records[0].unit is None
+    assert records[-1].timestamp_utc == datetime(2024, 5, 1, 12, 0, 0, 250000, timezone.utc)
+    with sqlite3.connect(path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    assert "measurements" not in tables
+
+
+@pytest.mark.asyncio
+async def test_legacy_rows_move_into_partitions_in_chunks(tmp_path, monkeypatch):
+    path = tmp_path / "db.sqlite"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE measurements (id INTEGER PRIMARY KEY, timestamp_utc DATETIME,"
+            " plant_id VARCHAR, device_id VARCHAR, metric VARCHAR, value FLOAT, unit VARCHAR,"
+            " quality VARCHAR, source VARCHAR, raw JSON)"
+        )
+        conn.executemany(
+            "INSERT INTO measurements (timestamp_utc, plant_id, device_id, metric, value, unit,"
+            " quality, source, raw) VALUES (?, 'plant', 'dev', 'AC_P', ?, 'kW', 'GOOD',"
+            " 'modbus', NULL)",
+            [(f"2024-05-0{1 + i % 2} 12:00:0{i}.000000", float(i)) for i in range(5)],
+        )
+        conn.execute("UPDATE measurements SET timestamp_utc = 'garbled' WHERE id = 4")
+    monkeypatch.setattr(database, "MIGRATION_CHUNK_ROWS", 2)
+    with pytest.raises(TypeError):
+        await Database(str(path), partition_span_s=86400).connect()
+    with sqlite3.connect(path) as conn:
+        # The first chunk was committed before the second one failed.
+        assert conn.execute("SELECT MIN(id) FROM measurements").fetchone() == (3,)
+        conn.execute(
+            "UPDATE measurements SET timestamp_utc = '2024-05-02 12:00:03.000000' WHERE id = 4"
+        )
+
+    db = Database(str(path), partition_span_s=86400)
+    await db.connect()
+    records = await db.measurements_for_device("dev")
+    assert sorted(r.value for r in records) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert len(db.partitions) == 2
+    assert "samples" not in tables(path) and "measurements" not in tables(path)
+    with sqlite3.connect(path) as conn:
+        counts = [
+            conn.execute(f"SELECT COUNT(*) FROM {p.name}").fetchone()[0] for p in db.partitions
+        ]
+    assert sorted(counts) == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_insert_batches_writes_all_devices_at_once(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    db = Database(path)
+    await db.connect()
+    now = datetime.now(timezone.utc)
+    batches = [batch_at(now, device_id=f"dev{i}") for i in range(3)]
+    assert await db.insert_batches(batches) == 6
+    assert await db.insert_batches([]) == 0
+    records = await db.measurements_for_device("dev2", metric="DC_V")
+    assert [(r.value, r.unit, r.raw) for r in records] == [(2.0, "V", None)]
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM samples WHERE raw IS NULL").fetchone() == (6,)
+
+
+@pytest.mark.asyncio
+async def test_thread_writer_keeps_the_database_api(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    db = Database(path, writer="thread")
+    await db.connect()
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    batch = batch_at(now)
+    batch.qualities[1] = QUALITY_CODES[Quality.BAD]
+    batch.raw[1] = [0xFFFF]
+    assert await db.insert_batches([batch, batch_at(now, device_id="other")]) == 4
+    records = await db.measurements_for_device("dev")
+    assert sorted((r.metric, r.quality, r.raw) for r in records) == [
+        ("AC_P", "GOOD", None),
+        ("DC_V", "BAD", {"registers": [0xFFFF]}),
+    ]
+    assert records[0].timestamp_utc == now
+    assert db.writer.stats()["transactions"] == 3  # series for each device, then samples
+    async with db.read_session() as session:
+        with pytest.raises(Exception, match="readonly"):
+            await session.execute(text("DELETE FROM samples"))
+    await db.close()
+
+    reopened = Database(path)
+    await reopened.connect()
+    assert len(await reopened.latest_measurements()) == 4
+    with pytest.raises(ValueError):
+        Database(":memory:", writer="thread")
+
+
+def tables(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def test_partition_catalog_routes_and_trims_new_partitions():
+    day = 86_400_000
+    catalog = PartitionCatalog(day, [Partition("samples_legacy", 5 * day + 3_600_000, 6 * day)])
+    assert catalog.plan(5 * day + 10).end_ms == 5 * day + 3_600_000
+    assert catalog.plan(6 * day + 10) == Partition("samples_19700107", 6 * day, 7 * day)
+    assert catalog.find(5 * day + 3_600_000).name == "samples_legacy"
+    assert catalog.find(4 * day) is None
+
+
+@pytest.mark.asyncio
+async def test_partitions_route_queries_and_retention(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    db = Database(path, partition_span_s=86_400)
+    await db.connect()
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    for days in (40, 35, 1, 0):
+        await db.insert_batch(batch_at(now - timedelta(days=days), value=float(days)))
+    partitions = sorted(name for name in tables(path) if name.startswith("samples_"))
+    assert len(partitions) == 4 and "samples" not in tables(path)
+
+    records = await db.measurements_for_device("dev", metric="AC_P", limit=3)
+    assert [r.value for r in records] == [0.0, 1.0, 35.0]
+    recent = await db.measurements_for_device("dev", since=now - timedelta(days=2))
+    assert len(recent) == 4 and {r.value for r in recent if r.metric == "AC_P"} == {0.0, 1.0}
+
+    await db.purge_old_measurements(retention_days=30)
+    assert len([name for name in tables(path) if name.startswith("samples_")]) == 2
+    assert {r.value for r in await db.latest_measurements() if r.metric == "AC_P"} == {0.0, 1.0}
+
+
+@pytest.mark.asyncio
+async def test_samples_are_repartitioned_when_the_span_changes(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    db = Database(path)
+    await db.connect()
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    for days in (3, 2, 0):
+        await db.insert_batch(batch_at(now - timedelta(days=days), value=float(days)))
+    await db.close()
+
+    partitioned = Database(path, partition_span_s=86_400)
+    await partitioned.connect()
+    assert "samples" not in tables(path)
+    assert len(partitioned.partitions) == 3
+    assert [r.value for r in await partitioned.measurements_for_device("dev", "AC_P")] == [
+        0.0,
+        2.0,
+        3.0,
+    ]
+    await partitioned.close()
+
+    merged = Database(path)
+    await merged.connect()
+    assert {name for name in tables(path) if name.startswith("samples")} == {"samples"}
+    assert len(await merged.latest_measurements()) == 6
+
+
+@pytest.mark.asyncio
+async def test_retention_deletes_in_chunks_and_vacuum_frees_pages(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    db = Database(path, raw_registers="all")
+    await db.connect()
+    now = datetime.now(timezone.utc)
+    old = []
+    for n in range(50):
+        b = batch_at(now - timedelta(days=40, seconds=n))
+        b.raw.update({0: list(range(120)), 1: list(range(120))})
+        old.append(b)
+    await db.insert_batches(old)
+    await db.insert_batch(batch_at(now))
+
+    reports = []
+    progress = await db.purge_old_measurements(
+        retention_days=30, chunk_rows=40, pause_s=0, on_progress=reports.append
+    )
+    assert (progress["rows_deleted"], progress["chunks"]) == (100, 3)
+    assert [(r["state"], r["rows_deleted"]) for r in reports] == [
+        ("purging", 40),
+        ("purging", 80),
+        ("purging", 100),
+        ("purged", 100),
+    ]
+    assert len(await db.latest_measurements()) == 2
+
+    reports.clear()
+    stats = await db.vacuum(step_pages=5, pause_s=0, on_progress=reports.append)
+    assert stats["auto_vacuum"] == "incremental"
+    assert stats["pages_freed"] > 0 and stats["free_pages"] == 0
+    assert not stats["checkpoint_busy"]
+    steps = [r["pages_freed"] for r in reports if "pages_freed" in r]
+    assert len(steps) > 2 and steps == sorted(steps) and steps[-1] == stats["pages_freed"]
+    assert reports[0]["state"] == "vacuuming" and reports[-1]["state"] == "idle"
+
+
+@pytest.mark.asyncio
+async def test_vacuum_converts_an_old_file_only_when_asked(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE legacy (x BLOB)")
+        conn.executemany("INSERT INTO legacy VALUES (zeroblob(4000))", [()] * 50)
+        conn.execute("DELETE FROM legacy")
+    db = Database(path)
+    await db.connect()
+    stats = await db.vacuum(pause_s=0)
+    assert stats["auto_vacuum"] == "none" and not stats["converted"]
+    assert stats["free_pages"] > 0
+
+    stats = await db.vacuum(pause_s=0, convert=True)
+    assert stats["auto_vacuum"] == "incremental" and stats["converted"]
+    assert stats["pages_freed"] > 0 and stats["free_pages"] == 0
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone() == (2,)
+
+
+class FullDiskOnce(sqlite3.Connection):
+    fail_commits = 1
+
+    def execute(self, sql, *args):
+        if sql == "COMMIT" and FullDiskOnce.fail_commits:
+            FullDiskOnce.fail_commits -= 1
+            raise sqlite3.OperationalError("database or disk is full")
+        return super().execute(sql, *args)
+
+
+class FullDiskWriter(SQLiteWriter):
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False, factory=FullDiskOnce
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+
+@pytest.mark.asyncio
+async def test_writer_rolls_back_a_failed_commit(tmp_path):
+    path = str(tmp_path / "db.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    writer = FullDiskWriter(path)
+    writer.start()
+    with pytest.raises(sqlite3.OperationalError, match="disk is full"):
+        await writer.executemany("INSERT INTO t VALUES (?)", [(1,)])
+    await writer.executemany("INSERT INTO t VALUES (?)", [(2,)])
+    await writer.close()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(2,)]
+    assert writer.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+async def test_writer_fails_queued_jobs_when_the_thread_dies(tmp_path):
+    writer = SQLiteWriter(str(tmp_path / "db.sqlite"))
+    writer.start()
+
+    def die(conn):
+        raise SystemExit
+
+    with pytest.raises(RuntimeError, match="writer stopped"):
+        await asyncio.wait_for(writer.run(die), 1)
+    with pytest.raises(RuntimeError):
+        await writer.run(lambda conn: None)
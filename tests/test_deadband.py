@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+
+from ems.drivers.deadband import DeadbandFilter
+from ems.drivers.pointmap import normalize_points
+from ems.utils.models import GOOD_CODE, Measurement, MeasurementBatch, Quality
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def sample(metric, value, seconds, quality=Quality.GOOD):
+    return Measurement(
+        timestamp_utc=START + timedelta(seconds=seconds),
+        plant_id="plant",
+        device_id="dev1",
+        metric=metric,
+        value=value,
+        quality=quality,
+        source="test",
+    )
+
+
+def make_filter():
+    return DeadbandFilter.for_points(
+        normalize_points(
+            [
+                {"name": "P", "fc": 3, "address": 0, "deadband": 1.0, "max_silence_s": 300},
+                {"name": "V", "fc": 3, "address": 1, "deadband_pct": 1.0},
+                {"name": "F", "fc": 3, "address": 2},
+            ]
+        )
+    )
+
+
+def test_reports_against_last_reported_value_with_heartbeat():
+    deadband = make_filter()
+    values = [10.0, 10.6, 10.9, 11.2, 11.4, 11.4, 11.4]
+    times = [0, 30, 60, 90, 120, 400, 430]
+    kept = [deadband.filter([sample("P", v, t)]) for v, t in zip(values, times)]
+    # 11.2 breaks the band around the reported 10.0; 400 s of silence forces a heartbeat.
+    assert [bool(k) for k in kept] == [True, False, False, True, False, True, False]
+    reported = [k[0].value for k in kept if k]
+    assert reported == [10.0, 11.2, 11.4]
+    # Replay what a reader sees: every polled value stays within the band of the held value.
+    held = None
+    for value, k in zip(values, kept):
+        if k:
+            held = k[0].value
+        assert abs(value - held) <= 1.0
+    assert deadband.stats()["suppressed"] == 4
+
+
+def test_percent_band_quality_changes_and_unfiltered_points():
+    deadband = make_filter()
+    assert deadband.filter([sample("V", 230.0, 0), sample("F", 50.0, 0)])
+    assert deadband.filter([sample("V", 232.0, 30), sample("F", 50.0, 30)]) == [
+        sample("F", 50.0, 30)
+    ]
+    assert deadband.filter([sample("V", 233.0, 60)]) == [sample("V", 233.0, 60)]
+    bad = sample("V", None, 90, Quality.BAD)
+    assert deadband.filter([bad]) == [bad]
+    assert deadband.filter([sample("V", 233.0, 120)]) == [sample("V", 233.0, 120)]
+
+
+def test_no_filter_without_deadband_settings():
+    points = normalize_points([{"name": "P", "fc": 3, "address": 0}])
+    assert DeadbandFilter.for_points(points) is None
+
+
+def test_on_change_points_store_only_changes():
+    points = normalize_points([{"name": "FW", "fc": 3, "address": 0, "poll_class": "on_change"}])
+    deadband = DeadbandFilter.for_points(points)
+    kept = [deadband.filter([sample("FW", v, 600 * i)]) for i, v in enumerate([3, 3, 3, 4])]
+    assert [bool(k) for k in kept] == [True, False, False, True]
+
+
+def test_batches_are_filtered_without_materialising_measurements():
+    deadband = make_filter()
+    metrics, units = ("P", "V", "F"), ("kW", "V", "Hz")
+
+    def poll(seconds, p, v, f):
+        batch = MeasurementBatch(
+            START + timedelta(seconds=seconds), "plant", "dev1", "t", metrics, units
+        )
+        for metric_id, value in enumerate((p, v, f)):
+            batch.append(metric_id, value, GOOD_CODE)
+        return deadband.filter_batch(batch)
+
+    assert len(poll(0, 10.0, 230.0, 50.0)) == 3
+    kept = poll(30, 10.5, 240.0, 50.0)
+    assert [m.metric for m in kept.to_measurements()] == ["V", "F"]
+    assert kept.metrics is metrics
@@ -0,0 +1,111 @@
+import math
+import random
+import struct
+from pathlib import Path
+
+import pytest
+
+from ems.drivers.decoder import VECTOR_MIN_POINTS, VectorPlanDecoder, compile_plan, decode_point
+from ems.io.modbus import ModbusReadError
+from ems.drivers.pointmap import load_point_map, normalize_points
+from ems.drivers.readplan import build_read_plan
+from ems.utils.models import Quality
+
+
+def decode_both(points, registers_for, backend="python"):
+    plan = build_read_plan(points, max_gap=4)
+    decoder = compile_plan(plan, points, backend=backend)
+    block_registers = [registers_for(block) for block in plan.blocks]
+    for block, registers, compiled in zip(
+        plan.blocks, block_registers, decoder.decode(block_registers)
+    ):
+        for member, got in zip(block.points, compiled):
+            regs = registers[member.offset : member.offset + member.count]
+            try:
+                expected = decode_point(points[member.index], list(regs))
+            except struct.error:
+                expected = (None, Quality.BAD)
+            yield got, expected
+
+
+def assert_same(got, expected):
+    assert got[1] == expected[1]
+    if expected[0] is None:
+        assert got[0] is None
+    elif math.isnan(expected[0]):
+        assert math.isnan(got[0])
+    else:
+        assert got[0] == expected[0]
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_compiled_decoder_matches_reference_for_every_shape(backend):
+    points = []
+    address = 0
+    for ptype in ("uint16", "int16", "bool", "bitfield16", "uint32", "int32", "float", "float32"):
+        for word_order in ("big", "little"):
+            for endianness in ("big", "little"):
+                count = 2 if ptype in ("uint32", "int32", "float") else 1
+                points.append(
+                    {
+                        "name": f"{ptype}-{word_order}-{endianness}",
+                        "fc": 3,
+                        "address": address,
+                        "count": count,
+                        "type": ptype,
+                        "scale": 0.1,
+                        "word_order": word_order,
+                        "endianness": endianness,
+                        "quality_rules": {"min": -1000, "max": 1000},
+                    }
+                )
+                address += count + 1
+    points.append({"name": "wide", "fc": 3, "address": address, "count": 3, "type": "uint32"})
+    points = normalize_points(points)
+    rng = random.Random(7)
+    for _ in range(50):
+        for got, expected in decode_both(
+            points, lambda block: [rng.randrange(0x10000) for _ in range(block.count)], backend
+        ):
+            assert_same(got, expected)
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+@pytest.mark.parametrize("path", sorted(Path("pointmaps").glob("*.yaml")))
+def test_compiled_decoder_matches_reference_on_shipped_maps(path, backend):
+    points = load_point_map(path).points
+    rng = random.Random(3)
+    for got, expected in decode_both(
+        points, lambda block: [rng.randrange(0x10000) for _ in range(block.count)], backend
+    ):
+        assert_same(got, expected)
+
+
+def test_vector_decoder_skips_failed_blocks_and_auto_needs_wide_polls():
+    points = [
+        {"name": f"P{i}", "fc": 3, "address": 2 * i, "count": 2, "type": "float"}
+        for i in range(VECTOR_MIN_POINTS)
+    ]
+    points.append({"name": "FAR", "fc": 3, "address": 500, "count": 2, "type": "float"})
+    points.append({"name": "FLAG", "fc": 1, "address": 0, "count": 1, "type": "bool"})
+    points = normalize_points(points)
+    plan = build_read_plan(points)
+    decoder = compile_plan(plan, points, backend="auto")
+    assert isinstance(decoder, VectorPlanDecoder)
+    block_registers = [
+        [1] if block.fc == 1 else [0x3F80, 0] * (block.count // 2) for block in plan.blocks
+    ]
+    failed = next(i for i, block in enumerate(plan.blocks) if block.address == 500)
+    block_registers[failed] = ModbusReadError("timeout")
+    for block, registers, results in zip(
+        plan.blocks, block_registers, decoder.decode(block_registers)
+    ):
+        if isinstance(registers, BaseException):
+            assert results is None
+        else:
+            assert results == [(1.0, Quality.GOOD)] * len(block.points)
+
+    narrow = points[-2:]
+    assert compile_plan(build_read_plan(narrow), narrow, backend="auto").backend == "python"
+    with pytest.raises(ValueError):
+        compile_plan(plan, points, backend="gpu")
@@ -5,7 +5,7 @@ import pytest
 from ems.export.service import ExportService
 from ems.store.database import Database
 from ems.utils.config import ExportConfig
-from ems.utils.models import Measurement
+from ems.utils.models import QUALITY_CODES, Measurement, MeasurementBatch, Quality
 
 
 @pytest.mark.asyncio
@@ -34,3 +34,53 @@ async def test_snapshot_payload(tmp_path):
     snapshot = await service.snapshot(window_s=60)
     assert snapshot["devices"]
     await service.close()
+
+
+def reading(metric, quality):
+    return Measurement(
+        timestamp_utc=datetime.now(timezone.utc),
+        plant_id="plant",
+        device_id="dev",
+        metric=metric,
+        value=1.0,
+        quality=quality,
+        source="test",
+        raw={"registers": [1, 2]},
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "mode, stored", [("non_good", {"BAD_P"}), ("all", {"AC_P", "BAD_P"}), ("none", set())]
+)
+async def test_raw_registers_are_kept_per_storage_mode(tmp_path, mode, stored):
+    db = Database(str(tmp_path / "db.sqlite"), raw_registers=mode)
+    await db.connect()
+    await db.insert_measurements([reading("AC_P", Quality.GOOD), reading("BAD_P", Quality.BAD)])
+    export_config = ExportConfig(
+        enable=False,
+        snapshot_url="https://example.com/snapshot",
+        registermap_url="https://example.com/maps",
+        auth_token="token",
+        include_raw_registers=True,
+    )
+    service = ExportService(db, export_config, devices=[])
+    snapshot = await service.snapshot(window_s=60)
+    assert set(snapshot["devices"][0]["raw"]) == stored
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_batches_store_one_row_per_point(tmp_path):
+    db = Database(str(tmp_path / "db.sqlite"))
+    await db.connect()
+    batch = MeasurementBatch(
+        datetime.now(timezone.utc), "plant", "dev", "test", ("AC_P", "DC_V"), ("kW", "V")
+    )
+    batch.append(0, 12.5, QUALITY_CODES[Quality.GOOD], [1, 2])
+    batch.append(1, None, QUALITY_CODES[Quality.BAD], [0xFFFF])
+    await db.insert_batch(batch)
+    records = {r.metric: r for r in await db.latest_measurements()}
+    assert (records["AC_P"].value, records["AC_P"].unit, records["AC_P"].raw) == (12.5, "kW", None)
+    assert records["DC_V"].quality == "BAD"
+    assert records["DC_V"].raw == {"registers": [0xFFFF]}
@@ -51,3 +51,139 @@ points:
     measurements = await driver.read_points()
     assert measurements[0].value == pytest.approx(10.0)
     assert measurements[1].value == 1.0
+
+
+@pytest.mark.asyncio
+async def test_generic_modbus_reads_dict_layout_maps(tmp_path):
+    pointmap = tmp_path / "map.yaml"
+    pointmap.write_text(
+        """
+device_info:
+  name: test
+modbus_settings:
+  word_order: little_endian
+points:
+  P_Total:
+    function_code: 4
+    address: 0
+    data_type: float32
+    register_count: 2
+    unit: W
+  Status:
+    function_code: 3
+    address: 8
+    data_type: uint16
+    register_count: 1
+"""
+    )
+    device_config = DeviceConfig.model_validate(
+        {
+            "id": "dev1",
+            "plant_id": "plant",
+            "type": "generic_modbus",
+            "make": "X",
+            "model": "Y",
+            "protocol": "modbus_tcp",
+            "connection": {},
+            "point_map": str(pointmap),
+        }
+    )
+    client = DummyClient({(4, 0, 2): [0x0000, 0x4120], (3, 8, 1): [7]})
+    driver = GenericModbusDriver(device_config, client=client)
+    measurements = {m.metric: m for m in await driver.read_points()}
+    assert measurements["P_Total"].value == pytest.approx(10.0)
+    assert measurements["P_Total"].unit == "W"
+    assert measurements["Status"].value == 7.0
+
+
+class RecordingBus:
+    def __init__(self):
+        self.messages = []
+
+    async def publish(self, topic, message):
+        self.messages.append((topic, message))
+
+
+@pytest.mark.asyncio
+async def test_bitfield_points_publish_only_transitions(tmp_path):
+    pointmap = tmp_path / "map.yaml"
+    pointmap.write_text(
+        """
+points:
+  - name: ALARMS
+    fc: 3
+    address: 0
+    type: bitfield16
+    count: 1
+    decode: {0: COMM_LOSS, 1: OVERVOLT, 9: FAN}
+"""
+    )
+    device_config = DeviceConfig.model_validate(
+        {
+            "id": "dev1",
+            "plant_id": "plant",
+            "type": "generic_modbus",
+            "make": "X",
+            "model": "Y",
+            "protocol": "modbus_tcp",
+            "connection": {},
+            "point_map": str(pointmap),
+        }
+    )
+    client = DummyClient({(3, 0, 1): [0b10]})
+    driver = GenericModbusDriver(device_config, client=client)
+    driver.event_bus = RecordingBus()
+
+    async def poll(register):
+        client.responses[(3, 0, 1)] = [register]
+        driver.event_bus.messages.clear()
+        await driver.read_points()
+        return [(m.label, m.state) for _, m in driver.event_bus.messages]
+
+    assert await poll(0b10) == [("OVERVOLT", True)]
+    assert await poll(0b10) == []
+    assert await poll(0b100) == [("OVERVOLT", False)]  # bit 2 has no label
+    assert await poll(0b1000000001) == [("COMM_LOSS", True), ("FAN", True)]
+    assert {topic for topic, _ in driver.event_bus.messages} == {"bit_transitions"}
+    assert driver.bitfields.states() == {
+        "ALARMS": {"COMM_LOSS": True, "OVERVOLT": False, "FAN": True}
+    }
+
+
+@pytest.mark.asyncio
+async def test_unchanged_blocks_are_skipped_until_keepalive(tmp_path, monkeypatch):
+    from ems.drivers import blockcache
+
+    pointmap = tmp_path / "map.yaml"
+    pointmap.write_text(
+        """
+points:
+  - {name: P, fc: 3, address: 0, type: int16, count: 1}
+  - {name: SN, fc: 3, address: 100, type: uint32, count: 2}
+"""
+    )
+    device_config = DeviceConfig.model_validate(
+        {
+            "id": "dev1",
+            "plant_id": "plant",
+            "type": "generic_modbus",
+            "make": "X",
+            "model": "Y",
+            "protocol": "modbus_tcp",
+            "unchanged_keepalive_s": 600,
+            "point_map": str(pointmap),
+        }
+    )
+    client = DummyClient({(3, 0, 1): [5], (3, 100, 2): [0, 42]})
+    driver = GenericModbusDriver(device_config, client=client)
+    now = [1000.0]
+    monkeypatch.setattr(blockcache.time, "monotonic", lambda: now[0])
+
+    assert [m.metric for m in await driver.read_points()] == ["P", "SN"]
+    now[0] += 300
+    client.responses[(3, 0, 1)] = [6]
+    assert [m.metric for m in await driver.read_points()] == ["P"]
+    now[0] += 300  # SN was last stored 600 s ago: keep-alive
+    assert [m.metric for m in await driver.read_points()] == ["SN"]
+    stats = driver.block_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 4)
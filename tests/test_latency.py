@@ -0,0 +1,41 @@
+import pytest
+
+from ems.api.app import TransportCollector
+from ems.io.latency import RTTEstimator, get_estimator
+
+
+def test_timeout_tracks_measured_latency_within_configured_bound():
+    estimator = RTTEstimator(max_timeout_s=3.0)
+    assert estimator.timeout_s == 3.0
+    for _ in range(50):
+        estimator.observe(0.02)
+    assert estimator.srtt == pytest.approx(0.02)
+    assert estimator.timeout_s == pytest.approx(estimator.min_timeout_s)
+    for _ in range(50):
+        estimator.observe(5.0)
+    assert estimator.timeout_s == 3.0
+
+
+def test_timeouts_back_off_until_next_sample():
+    estimator = RTTEstimator(max_timeout_s=3.0)
+    for _ in range(10):
+        estimator.observe(0.3)
+    base = estimator.timeout_s
+    estimator.on_timeout()
+    assert estimator.timeout_s == pytest.approx(min(base * 2, 3.0))
+    for _ in range(4):
+        estimator.on_timeout()
+    assert estimator.timeout_s == 3.0
+    estimator.observe(0.3)
+    assert estimator.timeout_s < 3.0
+    assert estimator.timeouts == 5
+
+
+def test_estimates_exported_as_metrics():
+    get_estimator("10.9.9.9:502/4", 2.0).observe(0.05)
+    families = {family.name: family for family in TransportCollector().collect()}
+    samples = {
+        sample.labels["endpoint"]: sample.value
+        for sample in families["ems_modbus_srtt_seconds"].samples
+    }
+    assert samples["10.9.9.9:502/4"] == pytest.approx(0.05)
@@ -0,0 +1,125 @@
+import asyncio
+import struct
+
+import pytest
+
+from ems.io.mbap import (
+    MBAPConnection,
+    ModbusExceptionResponse,
+    _MBAPProtocol,
+    decode_read_response,
+    encode_read_request,
+)
+from ems.io.modbus import ModbusTCPClient
+from ems.sim.server import ModbusSimulator, SimConfig, SimServerConfig
+
+
+async def start_reordering_server(batch: int):
+    """Collect ``batch`` requests, then answer them in reverse order."""
+    peak = 0
+
+    async def handle(reader, writer):
+        nonlocal peak
+        pending = []
+        while True:
+            try:
+                frame = await reader.readexactly(12)
+            except asyncio.IncompleteReadError:
+                break
+            tid, _, _, unit, fc, address, count = struct.unpack(">HHHBBHH", frame)
+            pending.append((tid, unit, fc, address, count))
+            peak = max(peak, len(pending))
+            if len(pending) < batch:
+                continue
+            for tid, unit, fc, address, count in reversed(pending):
+                data = struct.pack(f">{count}H", *range(address, address + count))
+                pdu = bytes([fc, len(data)]) + data
+                writer.write(struct.pack(">HHHB", tid, 0, len(pdu) + 1, unit) + pdu)
+            await writer.drain()
+            pending.clear()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1], lambda: peak
+
+
+@pytest.mark.asyncio
+async def test_pipelined_reads_match_out_of_order_responses():
+    server, port, peak = await start_reordering_server(batch=4)
+    client = ModbusTCPClient(
+        {
+            "host": "127.0.0.1",
+            "port": port,
+            "unit_id": 7,
+            "pipeline_depth": 4,
+            "max_connections_per_gateway": 1,
+            "timeout_ms": 2000,
+        }
+    )
+    try:
+        results = await asyncio.gather(
+            *(client.read(fc=3, address=address, count=2) for address in (0, 10, 20, 30))
+        )
+        assert results == [[0, 1], [10, 11], [20, 21], [30, 31]]
+        assert peak() == 4
+    finally:
+        await client.close()
+        server.close()
+        await server.wait_closed()
+
+
+def test_read_codec_round_trip_and_exceptions():
+    request = encode_read_request(tid=5, unit_id=1, fc=4, address=100, count=3)
+    assert request == struct.pack(">HHHBBHH", 5, 0, 6, 1, 4, 100, 3)
+    assert decode_read_response(3, 2, bytes([3, 4, 0, 1, 0xFF, 0xFE])) == [1, 0xFFFE]
+    bits = decode_read_response(1, 10, bytes([1, 2, 0b00000101, 0b10]))
+    assert bits == [1, 0, 1, 0, 0, 0, 0, 0, 0, 1]
+    with pytest.raises(ModbusExceptionResponse) as excinfo:
+        decode_read_response(3, 1, bytes([0x83, 0x02]))
+    assert excinfo.value.code == 2
+
+
+def test_protocol_decodes_frames_split_across_reads():
+    connection = MBAPConnection("127.0.0.1", 502)
+    loop = asyncio.new_event_loop()
+    try:
+        futures = {tid: loop.create_future() for tid in (1, 2)}
+        connection._pending = {tid: (future, 3, 2) for tid, future in futures.items()}
+        protocol = _MBAPProtocol(connection)
+        stream = b"".join(
+            struct.pack(">HHHB", tid, 0, 7, 1) + bytes([3, 4]) + struct.pack(">2H", tid, 9)
+            for tid in (1, 2)
+        )
+        for chunk in (stream[:5], stream[5:15], stream[15:]):
+            buffer = protocol.get_buffer(len(chunk))
+            buffer[: len(chunk)] = chunk
+            protocol.buffer_updated(len(chunk))
+        assert futures[1].result() == [1, 9]
+        assert futures[2].result() == [2, 9]
+    finally:
+        loop.close()
+
+
+@pytest.mark.asyncio
+async def test_native_transport_reads_from_simulator():
+    simulator = ModbusSimulator(
+        SimConfig(
+            servers=[
+                SimServerConfig(
+                    port=0,
+                    units=[{"unit_ids": [3], "point_map": "pointmaps/sunspec_inverter_common.yaml"}],
+                )
+            ]
+        )
+    )
+    await simulator.start()
+    port = simulator.servers[0].config.port
+    client = ModbusTCPClient(
+        {"host": "127.0.0.1", "port": port, "unit_id": 3, "modbus_transport": "native"}
+    )
+    try:
+        assert len(await client.read(fc=3, address=107, count=2)) == 2
+        assert client._pool.stats()["transport"] == "native"
+    finally:
+        await client.close()
+        await simulator.close()
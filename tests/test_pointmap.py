@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+from ems.drivers.pointmap import PointMapError, load_point_map, normalize_points
+
+
+def test_dict_and_list_layouts_normalize_to_the_same_definition():
+    listed = normalize_points(
+        [
+            {
+                "name": "P",
+                "fc": 4,
+                "address": 10,
+                "count": 2,
+                "type": "float",
+                "scale": 0.1,
+                "word_order": "little",
+                "quality_rules": {"min": 0, "max": 100},
+            }
+        ]
+    )
+    mapped = normalize_points(
+        {
+            "P": {
+                "function_code": 4,
+                "address": 10,
+                "register_count": 2,
+                "data_type": "float32",
+                "scale": 0.1,
+                "min_value": 0,
+                "max_value": 100,
+            }
+        },
+        {"byte_order": "big_endian", "word_order": "little_endian"},
+    )
+    assert listed == mapped
+    assert listed[0].readable and listed[0].min_value == 0.0
+
+
+def test_bit_definitions_alias_decode():
+    (point,) = normalize_points(
+        {"S": {"address": 0, "data_type": "bitfield16", "bit_definitions": {"3": "FAULT", 0: "OK"}}}
+    )
+    assert point.decode == ((0, "OK"), (3, "FAULT"))
+
+
+def test_bitfield_width_sets_the_default_register_count():
+    (wide, narrow) = normalize_points(
+        [
+            {"name": "A", "address": 10, "type": "bitfield32", "decode": {20: "x"}},
+            {"name": "B", "address": 12, "type": "bitfield"},
+        ],
+        {},
+    )
+    assert (wide.count, narrow.count) == (2, 1)
+    assert wide.decode == ((20, "x"),)
+
+
+def test_non_modbus_and_write_points_are_not_readable():
+    points = normalize_points(
+        [
+            {"name": "Irradiance", "parser": "float", "unit": "W/m2"},
+            {"name": "Setpoint", "fc": 6, "address": 3, "read_only": False},
+        ]
+    )
+    assert [p.readable for p in points] == [False, False]
+    assert points[0].metric == "Irradiance"
+
+
+@pytest.mark.parametrize(
+    "points, message",
+    [
+        ([{"name": "A", "fc": 3, "address": 0}, {"name": "A", "fc": 3, "address": 1}], "duplicate"),
+        ([{"name": "A", "fc": 7, "address": 0}], "function code"),
+        ([{"name": "A", "fc": 3}], "without address"),
+        ([{"name": "A", "fc": 3, "address": 0, "type": "decimal"}], "unsupported type"),
+        ([{"name": "A", "fc": 3, "address": 0, "scale": "x"}], "scale"),
+        ([{"fc": 3, "address": 0}], "no name"),
+        ([{"name": "A", "fc": 3, "address": 0, "decode": {16: "X"}}], "decode bit 16"),
+    ],
+)
+def test_invalid_points_are_rejected(points, message):
+    with pytest.raises(PointMapError, match=message):
+        normalize_points(points)
+
+
+def test_load_point_map_reports_the_file(tmp_path):
+    path = tmp_path / "bad.yaml"
+    path.write_text("points:\n  A: {function_code: 3, address: -1}\n")
+    with pytest.raises(PointMapError, match="bad.yaml"):
+        load_point_map(path)
+
+
+def test_compiled_cache_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    from ems.drivers import pointmap
+
+    monkeypatch.setenv("EMS_POINTMAP_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "map.yaml"
+    path.write_text(
+        "metadata: {make: X}\n"
+        "points:\n"
+        "  - {name: A, fc: 3, address: 1, type: int16, scale: 0.1}\n"
+        "  - {name: S, fc: 3, address: 2, type: bitfield16, decode: {3: fault}}\n"
+    )
+    first = load_point_map(path)
+    (entry,) = (tmp_path / "cache").glob("*.json")
+    assert "payload" not in json.loads(entry.read_text())
+
+    pointmap._pointmap_cache.clear()
+    monkeypatch.setattr(pointmap.yaml, "load", None)  # a warm start must not parse YAML
+    cached = load_point_map(path)
+    assert cached.points == first.points and cached.path == path
+    assert cached.hash == first.hash and cached.cache_key == first.cache_key
+    assert cached.metadata == {"make": "X"}
+
+    monkeypatch.undo()
+    monkeypatch.setenv("EMS_POINTMAP_CACHE_DIR", str(tmp_path / "cache"))
+    pointmap._pointmap_cache.clear()
+    path.write_text("points:\n  - {name: A, fc: 3, address: 20, type: int16, scale: 0.1}\n")
+    assert load_point_map(path).points[0].address == 20
@@ -0,0 +1,109 @@
+import pytest
+
+from ems.drivers.generic_modbus import GenericModbusDriver
+from ems.drivers.pointmap import normalize_points
+from ems.drivers.readplan import build_read_plan
+from ems.io.modbus import ModbusClientProtocol
+from ems.utils.config import DeviceConfig
+
+
+def test_read_plan_coalesces_contiguous_points():
+    points = normalize_points(
+        [
+            {"name": "A", "fc": 3, "address": 0, "count": 2},
+            {"name": "B", "fc": 3, "address": 2, "count": 2},
+            {"name": "C", "fc": 3, "address": 6, "count": 1},
+            {"name": "D", "fc": 4, "address": 0, "count": 1},
+        ]
+    )
+    plan = build_read_plan(points, max_gap=0)
+    assert [(b.fc, b.address, b.count) for b in plan.blocks] == [(3, 0, 4), (3, 6, 1), (4, 0, 1)]
+    bridged = build_read_plan(points, max_gap=2)
+    assert [(b.fc, b.address, b.count) for b in bridged.blocks] == [(3, 0, 7), (4, 0, 1)]
+    assert bridged.registers_wasted == 2
+
+
+def test_read_plan_respects_pdu_limit():
+    points = normalize_points(
+        [{"name": f"P{i}", "fc": 3, "address": i * 2, "count": 2} for i in range(100)]
+    )
+    plan = build_read_plan(points)
+    assert all(block.count <= 125 for block in plan.blocks)
+    assert plan.block_count == 2
+    assert plan.registers_read == 200
+
+
+class RecordingClient(ModbusClientProtocol):
+    def __init__(self):
+        self.calls = []
+
+    async def read(self, fc: int, address: int, count: int) -> list[int]:  # type: ignore[override]
+        self.calls.append((fc, address, count))
+        return [address + i for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_driver_reads_each_block_once(tmp_path):
+    pointmap = tmp_path / "map.yaml"
+    pointmap.write_text(
+        """
+points:
+  - {name: A, fc: 3, address: 10, type: uint16, count: 1}
+  - {name: B, fc: 3, address: 11, type: uint16, count: 1}
+  - {name: C, fc: 3, address: 14, type: uint16, count: 1}
+"""
+    )
+    device_config = DeviceConfig.model_validate(
+        {
+            "id": "dev1",
+            "plant_id": "plant",
+            "type": "generic_modbus",
+            "make": "X",
+            "model": "Y",
+            "protocol": "modbus_tcp",
+            "connection": {"max_read_gap": 4},
+            "point_map": str(pointmap),
+        }
+    )
+    client = RecordingClient()
+    driver = GenericModbusDriver(device_config, client=client)
+    measurements = await driver.read_points()
+    assert client.calls == [(3, 10, 5)]
+    assert [m.value for m in measurements] == [10.0, 11.0, 14.0]
+    assert driver.read_plan.summary()["registers_wasted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_poll_classes_get_their_own_plans_and_rates(tmp_path):
+    pointmap = tmp_path / "map.yaml"
+    pointmap.write_text(
+        """
+points:
+  - {name: P, fc: 3, address: 0, type: uint16, poll_class: fast}
+  - {name: Q, fc: 3, address: 1, type: uint16, poll_class: fast}
+  - {name: V, fc: 3, address: 2, type: uint16}
+  - {name: E, fc: 3, address: 100, type: uint32, count: 2, poll_class: slow}
+  - {name: FW, fc: 3, address: 200, type: uint16, poll_class: on-change}
+"""
+    )
+    device_config = DeviceConfig.model_validate(
+        {
+            "id": "dev1",
+            "plant_id": "plant",
+            "type": "generic_modbus",
+            "make": "X",
+            "model": "Y",
+            "protocol": "modbus_tcp",
+            "poll_interval_s": 30,
+            "poll_classes": {"slow": 900},
+            "point_map": str(pointmap),
+        }
+    )
+    client = RecordingClient()
+    driver = GenericModbusDriver(device_config, client=client)
+    assert driver.poll_intervals == {"fast": 5, "normal": 30, "slow": 900, "on_change": 300}
+    assert [m.metric for m in await driver.read_points("fast")] == ["P", "Q"]
+    assert client.calls == [(3, 0, 2)]
+    assert [m.metric for m in await driver.read_points()] == ["P", "Q", "V", "E", "FW"]
+    health = await driver.health()
+    assert health["poll_classes"]["slow"]["registers_read"] == 2
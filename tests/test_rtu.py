@@ -0,0 +1,112 @@
+import asyncio
+import os
+import tty
+
+import pytest
+
+from ems.io.bus import SerialSettings, close_serial_buses
+from ems.io.crc import append_crc
+from ems.io.modbus import ModbusReadError, ModbusRTUClient
+from ems.io.rtu import CRCError, RTUConnection, expected_response_size
+from ems.sim.server import ModbusSimulator, SimConfig, SimServerConfig
+
+POINT_MAP = "pointmaps/sunspec_inverter_common.yaml"
+
+
+def test_expected_response_sizes():
+    assert expected_response_size(3, 10) == 25
+    assert expected_response_size(1, 9) == 7
+
+
+@pytest.mark.asyncio
+async def test_native_rtu_reads_from_simulated_line(tmp_path):
+    link = tmp_path / "ttySIM1"
+    server = SimServerConfig(
+        transport="rtu",
+        link=str(link),
+        baudrate=38400,
+        units=[{"unit_ids": [1, 2], "point_map": POINT_MAP}],
+    )
+    simulator = ModbusSimulator(SimConfig(seed=3, servers=[server]))
+    await simulator.start()
+    clients = [
+        ModbusRTUClient(
+            {
+                "serial_port": str(link),
+                "baudrate": 38400,
+                "unit_id": unit,
+                "timeout_ms": 1000,
+                "modbus_transport": "native",
+            }
+        )
+        for unit in (1, 2)
+    ]
+    try:
+        results = await asyncio.gather(
+            *(client.read(fc=3, address=107, count=2) for client in clients for _ in range(3))
+        )
+        assert all(len(registers) == 2 for registers in results)
+        stats = clients[0]._bus.stats()
+        assert stats["transport"] == "native"
+        assert stats["frames"] == 6 and stats["crc_errors"] == 0
+        assert stats["frames_per_s"] > 0
+    finally:
+        for client in clients:
+            await client.close()
+        await close_serial_buses()
+        await simulator.close()
+
+
+@pytest.mark.asyncio
+async def test_corrupted_response_counts_crc_error():
+    master, slave = os.openpty()
+    tty.setraw(master)
+    connection = RTUConnection(SerialSettings(os.ttyname(slave), 115200), timeout_s=5.0)
+    await connection.connect()
+    loop = asyncio.get_running_loop()
+
+    def reply():
+        os.read(master, 64)
+        frame = bytearray(append_crc(bytes([1, 3, 2, 0, 42])))
+        frame[-1] ^= 0xFF
+        os.write(master, bytes(frame))
+
+    loop.add_reader(master, reply)
+    try:
+        # A full-length frame with a bad CRC fails after t3.5, not at the request timeout.
+        with pytest.raises(CRCError):
+            await asyncio.wait_for(connection.read(1, 3, 0, 1), 1.0)
+        assert connection.stats()["crc_errors"] == 1
+
+        loop.remove_reader(master)
+        loop.add_reader(master, lambda: (os.read(master, 64), os.write(master, good)))
+        good = append_crc(bytes([1, 3, 2, 0, 42]))
+        assert await connection.read(1, 3, 0, 1) == [42]
+    finally:
+        loop.remove_reader(master)
+        connection.close()
+        os.close(master)
+        os.close(slave)
+
+
+@pytest.mark.asyncio
+async def test_rtu_client_surfaces_timeout_as_read_error():
+    master, slave = os.openpty()
+    tty.setraw(master)
+    client = ModbusRTUClient(
+        {
+            "serial_port": os.ttyname(slave),
+            "baudrate": 115200,
+            "timeout_ms": 100,
+            "modbus_transport": "native",
+        }
+    )
+    try:
+        with pytest.raises(ModbusReadError):
+            await client.read(fc=3, address=0, count=1)
+        assert client._bus._client.stats()["timeouts"] == 1
+    finally:
+        await client.close()
+        await close_serial_buses()
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from ems.io.bus import SerialBus, SerialSettings, frame_gap_s, get_serial_bus
+from ems.io.latency import RTTEstimator
+
+
+class FakeResult:
+    def __init__(self, registers):
+        self.registers = registers
+
+    def isError(self):
+        return False
+
+
+class FakeSerialClient:
+    connected = True
+
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+
+    async def read_holding_registers(self, address, *, count, device_id):
+        self.active += 1
+        assert self.active == 1, "bus must not overlap transactions"
+        self.calls.append(device_id)
+        await asyncio.sleep(0)
+        self.active -= 1
+        return FakeResult([device_id] * count)
+
+    def close(self):
+        self.connected = False
+
+
+def test_frame_gap_follows_line_settings():
+    assert frame_gap_s(9600) == pytest.approx(3.5 * 10 / 9600)
+    assert frame_gap_s(9600, parity="E") == pytest.approx(3.5 * 11 / 9600)
+    assert frame_gap_s(115200) == pytest.approx(0.00175)
+
+
+@pytest.mark.asyncio
+async def test_bus_serialises_units_in_order():
+    bus = SerialBus(SerialSettings(port="/dev/ttyTEST", baudrate=115200))
+    bus._bind_loop()
+    client = FakeSerialClient()
+    bus._client = client
+    results = await asyncio.gather(*(bus.read(unit, 3, 0, 2) for unit in range(1, 6)))
+    assert client.calls == [1, 2, 3, 4, 5]
+    assert results[2] == [3, 3]
+    stats = bus.stats()
+    assert stats["frames"] == 5
+    assert 0.0 < stats["utilization"] <= 1.0
+    await bus.close()
+
+
+def test_conflicting_line_settings_rejected():
+    get_serial_bus(SerialSettings(port="/dev/ttyCONFLICT", baudrate=9600), unit_id=1)
+    bus = get_serial_bus(SerialSettings(port="/dev/ttyCONFLICT", baudrate=9600), unit_id=2)
+    assert bus.units == {1, 2}
+    with pytest.raises(ValueError):
+        get_serial_bus(SerialSettings(port="/dev/ttyCONFLICT", baudrate=19200), unit_id=3)
+
+
+class SilentSerialClient(FakeSerialClient):
+    async def read_holding_registers(self, address, *, count, device_id):
+        await asyncio.sleep(1)
+
+
+@pytest.mark.asyncio
+async def test_bus_reopens_the_port_after_a_pymodbus_timeout():
+    bus = SerialBus(SerialSettings(port="/dev/ttyTEST", baudrate=115200), timeout_s=0.05)
+    bus._bind_loop()
+    silent, fresh = SilentSerialClient(), FakeSerialClient()
+    bus._client = silent
+
+    async def connect():
+        bus._client = fresh
+
+    bus.connect = connect
+    with pytest.raises(asyncio.TimeoutError):
+        await bus.read(1, 3, 0, 2)
+    assert not silent.connected and bus._client is None
+    assert await bus.read(2, 3, 0, 2) == [2, 2]
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_bus_skips_requests_refused_at_the_head_of_the_queue():
+    bus = SerialBus(SerialSettings(port="/dev/ttyTEST", baudrate=115200))
+    bus._bind_loop()
+    client = FakeSerialClient()
+    bus._client = client
+
+    def refuse():
+        raise RuntimeError("circuit open")
+
+    results = await asyncio.gather(
+        bus.read(1, 3, 0, 1), bus.read(2, 3, 0, 1, admit=refuse), return_exceptions=True
+    )
+    assert results[0] == [1] and isinstance(results[1], RuntimeError)
+    assert client.calls == [1]
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_bus_uses_the_rtt_timeout_for_pymodbus_reads():
+    bus = SerialBus(SerialSettings(port="/dev/ttyTEST", baudrate=115200), timeout_s=5.0)
+    bus._bind_loop()
+    bus._client = SilentSerialClient()
+    rtt = RTTEstimator(max_timeout_s=5.0, min_timeout_s=0.02)
+    for _ in range(4):
+        rtt.observe(0.005)
+
+    async def connect():
+        bus._client = SilentSerialClient()
+
+    bus.connect = connect
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(bus.read(1, 3, 0, 2, rtt=rtt), 1.0)
+    await bus.close()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import struct
+import tty
+from pathlib import Path
+
+import pytest
+import yaml
+
+from ems.io.crc import append_crc, crc16
+from ems.io.modbus import ModbusReadError, ModbusTCPClient
+from ems.sim.server import ModbusSimulator, SimConfig, SimServerConfig, plant_from_app_config
+
+POINT_MAP = "pointmaps/sunspec_inverter_common.yaml"
+
+
+def sim_config(**overrides) -> SimConfig:
+    server = {"port": 0, "units": [{"unit_ids": [1, 2], "point_map": POINT_MAP}], **overrides}
+    return SimConfig(seed=1, servers=[SimServerConfig(**server)])
+
+
+@pytest.mark.asyncio
+async def test_tcp_simulator_serves_plausible_values():
+    simulator = ModbusSimulator(sim_config())
+    await simulator.start()
+    port = simulator.servers[0].config.port
+    client = ModbusTCPClient({"host": "127.0.0.1", "port": port, "unit_id": 2})
+    try:
+        registers = await client.read(fc=3, address=107, count=2)
+        ac_power = struct.unpack(">f", struct.pack(">2H", *registers))[0] * 0.001
+        assert 10.0 <= ac_power <= 90.0
+        assert simulator.stats()[0]["requests"] == 1
+    finally:
+        await client.close()
+        await simulator.close()
+
+
+@pytest.mark.asyncio
+async def test_tcp_simulator_injects_exceptions():
+    simulator = ModbusSimulator(sim_config(exception_rate=1.0))
+    await simulator.start()
+    port = simulator.servers[0].config.port
+    client = ModbusTCPClient({"host": "127.0.0.1", "port": port, "unit_id": 1})
+    try:
+        with pytest.raises(ModbusReadError):
+            await client.read(fc=3, address=107, count=2)
+        assert simulator.stats()[0]["exceptions"] >= 1
+    finally:
+        await client.close()
+        await simulator.close()
+
+
+@pytest.mark.asyncio
+async def test_rtu_simulator_answers_on_pty(tmp_path: Path):
+    link = tmp_path / "ttySIM0"
+    simulator = ModbusSimulator(sim_config(transport="rtu", link=str(link), baudrate=115200))
+    await simulator.start()
+    fd = os.open(link, os.O_RDWR | os.O_NOCTTY)
+    tty.setraw(fd)
+    try:
+        os.write(fd, append_crc(struct.pack(">BBHH", 1, 3, 107, 2)))
+        loop = asyncio.get_running_loop()
+        frame = b""
+        while len(frame) < 9:
+            frame += await loop.run_in_executor(None, os.read, fd, 64)
+        assert frame[:3] == bytes([1, 3, 4])
+        assert crc16(frame) == 0
+    finally:
+        os.close(fd)
+        await simulator.close()
+    assert not link.exists()
+
+
+def test_plant_from_app_config_groups_gateways_and_lines():
+    app_config = yaml.safe_load(Path("config.yaml").read_text(encoding="utf-8"))
+    config, rewritten = plant_from_app_config(app_config, base_port=16000, link_dir="/tmp/sim")
+    tcp = [server for server in config.servers if server.transport == "tcp"]
+    rtu = [server for server in config.servers if server.transport == "rtu"]
+    assert tcp and rtu
+    assert len({server.port for server in tcp}) == len(tcp)
+    for device in rewritten["devices"]:
+        if device.get("protocol") == "modbus_tcp":
+            assert device["connection"]["host"] == "127.0.0.1"
+        elif device.get("protocol") == "modbus_rtu":
+            assert device["connection"]["serial_port"].startswith("/tmp/sim/")
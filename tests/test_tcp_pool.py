@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from ems.io.pool import GatewayPool, get_tcp_pool
+
+
+class FakeResult:
+    registers = [7]
+
+    def isError(self):
+        return False
+
+
+class FakeTcpClient:
+    def __init__(self):
+        self.connected = False
+        self.connects = 0
+        self.reads = 0
+        self.answering = True
+
+    async def read_holding_registers(self, address, *, count, device_id):
+        self.reads += 1
+        if not self.answering:
+            await asyncio.sleep(1)
+        return FakeResult()
+
+    async def connect(self):
+        self.connects += 1
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+
+class FakePool(GatewayPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created = []
+
+    def _new_client(self):
+        client = FakeTcpClient()
+        self.created.append(client)
+        return client
+
+
+@pytest.mark.asyncio
+async def test_pool_caps_connections_per_gateway():
+    pool = FakePool("10.0.0.1", 502, max_connections=2)
+    in_flight = 0
+    peak = 0
+
+    async def request():
+        nonlocal in_flight, peak
+        conn = await pool.acquire()
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        await pool.release(conn)
+
+    await asyncio.gather(*(request() for _ in range(10)))
+    assert len(pool.created) == 2
+    assert peak == 2
+    assert pool.stats()["waits"] > 0
+
+
+@pytest.mark.asyncio
+async def test_pool_reconnects_dropped_socket_lazily():
+    pool = FakePool("10.0.0.2", 502, max_connections=1)
+    conn = await pool.acquire()
+    await pool.release(conn)
+    conn.client.connected = False  # peer closed the idle socket
+    again = await pool.acquire()
+    assert again is conn
+    assert again.connected
+    assert again.client.connects == 2
+    assert pool.stats()["reconnects"] == 1
+    await pool.release(again)
+
+
+@pytest.mark.asyncio
+async def test_pool_probes_idle_socket_before_reuse():
+    pool = FakePool("10.0.0.4", 502, max_connections=1, timeout_s=0.05, idle_check_s=0)
+    conn = await pool.acquire()
+    assert await conn.read(1, 3, 40000, 1, timeout_s=1) == [7]
+    await pool.release(conn)
+
+    again = await pool.acquire()  # peer still answers: the probe read passes
+    assert (again.client.reads, again.client.connects) == (2, 1)
+    await pool.release(again)
+
+    conn.client.answering = False  # half-open socket: still "connected" but silent
+    again = await pool.acquire()
+    assert again.client.reads == 3 and again.client.connects == 2
+    assert pool.stats()["reconnects"] == 1
+    await pool.release(again)
+
+
+@pytest.mark.asyncio
+async def test_shared_idle_socket_is_probed_once():
+    pool = FakePool("10.0.0.5", 502, max_connections=1, pipeline_depth=2, idle_check_s=0.01)
+    conn = await pool.acquire()
+    await conn.read(1, 3, 0, 1, timeout_s=1)
+    await pool.release(conn)
+    await asyncio.sleep(0.02)
+    first, second = await asyncio.gather(pool.acquire(), pool.acquire())
+    assert first is second is conn
+    assert conn.client.reads == 2 and conn.client.connects == 1  # one read, one probe
+    await pool.release(first)
+    await pool.release(second)
+
+
+def test_devices_behind_gateway_share_pool():
+    first = get_tcp_pool("10.0.0.3", 502, max_connections=1)
+    second = get_tcp_pool("10.0.0.3", 502, max_connections=3)
+    assert first is second
+    assert first.users == 2
+    assert first.max_connections == 3
@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from ems.store.buffer import WriteBuffer, write_buffer_stats
+from ems.store.database import Database
+from ems.utils.models import QUALITY_CODES, MeasurementBatch, Quality
+
+
+def batch(device_id, rows=2):
+    metrics = tuple(f"P{i}" for i in range(rows))
+    b = MeasurementBatch(
+        datetime.now(timezone.utc), "plant", device_id, "test", metrics, ("kW",) * rows
+    )
+    for metric_id in range(rows):
+        b.append(metric_id, float(metric_id), QUALITY_CODES[Quality.GOOD], None)
+    return b
+
+
+class RecordingDatabase:
+    def __init__(self, fail=0):
+        self.commits = []
+        self.fail = fail
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def insert_batches(self, batches):
+        await self.release.wait()
+        if self.fail:
+            self.fail -= 1
+            raise OSError("disk I/O error")
+        self.commits.append([b.device_id for b in batches])
+        return sum(len(b) for b in batches)
+
+
+@pytest.mark.asyncio
+async def test_polls_are_group_committed_per_interval():
+    db = RecordingDatabase()
+    buffer = WriteBuffer(db, flush_interval_ms=50, flush_rows=100, max_rows=100)
+    buffer.start()
+    for device in ("a", "b", "c"):
+        await buffer.put(batch(device))
+    assert db.commits == [] and buffer.depth == 6
+    await asyncio.sleep(0.15)
+    assert db.commits == [["a", "b", "c"]]
+    assert buffer.stats()["rows_flushed"] == 6
+    assert any(s["queue_depth"] == 0 for s in write_buffer_stats())
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_flush_rows_triggers_an_early_commit():
+    db = RecordingDatabase()
+    buffer = WriteBuffer(db, flush_interval_ms=10_000, flush_rows=4, max_rows=100)
+    buffer.start()
+    await buffer.put(batch("a"))
+    await buffer.put(batch("b"))
+    await asyncio.sleep(0.05)
+    assert db.commits == [["a", "b"]]
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_blocks_pollers_until_flushed():
+    db = RecordingDatabase()
+    db.release.clear()
+    buffer = WriteBuffer(db, flush_interval_ms=10_000, flush_rows=4, max_rows=4)
+    buffer.start()
+    await buffer.put(batch("a"))
+    await buffer.put(batch("b"))
+    blocked = asyncio.create_task(buffer.put(batch("c")))
+    await asyncio.sleep(0.05)
+    assert not blocked.done() and buffer.depth == 4
+    db.release.set()
+    await asyncio.wait_for(blocked, 1)
+    assert db.commits == [["a", "b"]] and buffer.stats()["blocked_puts"] >= 1
+    await buffer.close()
+    assert db.commits == [["a", "b"], ["c"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_rows_and_close_commits_them():
+    db = RecordingDatabase(fail=1)
+    buffer = WriteBuffer(db, flush_interval_ms=10_000, flush_rows=10, max_rows=10)
+    await buffer.put(batch("a"))
+    assert await buffer.flush() is False
+    assert buffer.depth == 2 and buffer.stats()["errors"] == 1
+    await buffer.close()
+    assert db.commits == [["a"]] and buffer.depth == 0
+    with pytest.raises(RuntimeError):
+        await buffer.put(batch("b"))
+
+
+@pytest.mark.asyncio
+async def test_buffer_stores_into_the_database(tmp_path):
+    db = Database(str(tmp_path / "db.sqlite"))
+    await db.connect()
+    buffer = WriteBuffer(db, flush_interval_ms=10_000)
+    buffer.start()
+    await buffer.put(batch("dev"))
+    assert await db.measurements_for_device("dev") == []
+    await buffer.close()
+    assert len(await db.measurements_for_device("dev")) == 2